@@ -0,0 +1,176 @@
+"""
+Compares rows/second of the BigQuery REST and Storage Read API decode paths.
+
+The REST path is driven through the real `RowIterator` with a local stand-in
+for tabledata.list that serves JSON pages. The Storage path is driven through
+`read_table_with_bqstorage` and the real `ReadRowsStream` with a local
+stand-in for the ReadRows call that serves the same rows as serialized Arrow
+record batches, which is what the Storage Read API streams back. No network
+or credentials are needed, so the numbers isolate the client-side decode
+cost of each path.
+
+Usage:
+    python benchmarks/benchmark_bigquery_read.py --rows 500000
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import RowIterator
+from google.cloud.bigquery_storage_v1 import reader, types
+from cru_dse_utils.bigquery import (
+    arrow_table_to_dataframe,
+    read_table_with_bqstorage,
+    rows_to_dataframe,
+)
+
+SCHEMA = [
+    SchemaField("id", "INTEGER"),
+    SchemaField("name", "STRING"),
+    SchemaField("amount", "FLOAT"),
+    SchemaField("active", "BOOLEAN"),
+    SchemaField("created_at", "TIMESTAMP"),
+]
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows, dtype="int64"),
+            "name": rng.choice(["alpha", "beta", "gamma", "delta"], rows),
+            "amount": rng.random(rows),
+            "active": rng.random(rows) > 0.5,
+            "created_at": pd.Timestamp("2024-01-01", tz="UTC")
+            + pd.to_timedelta(np.arange(rows), unit="s"),
+        }
+    )
+
+
+def make_rest_pages(df: pd.DataFrame, page_size: int):
+    timestamps = (df["created_at"].astype("int64") // 1000).astype(str)
+    pages = []
+    for start in range(0, len(df), page_size):
+        end = min(start + page_size, len(df))
+        rows = [
+            {
+                "f": [
+                    {"v": str(df["id"].iat[i])},
+                    {"v": df["name"].iat[i]},
+                    {"v": repr(float(df["amount"].iat[i]))},
+                    {"v": "true" if df["active"].iat[i] else "false"},
+                    {"v": timestamps.iat[i]},
+                ]
+            }
+            for i in range(start, end)
+        ]
+        page = {"rows": rows, "totalRows": str(len(df))}
+        if end < len(df):
+            page["pageToken"] = str(end)
+        pages.append(json.dumps(page).encode("utf-8"))
+    return pages
+
+
+def run_rest(pages, total_rows: int) -> pd.DataFrame:
+    by_token = {None: pages[0]}
+    for i, page in enumerate(pages[1:], start=1):
+        by_token[json.loads(pages[i - 1])["pageToken"]] = page
+
+    def api_request(method, path, query_params=None, timeout=None):
+        token = (query_params or {}).get("pageToken")
+        return json.loads(by_token[token])
+
+    rows = RowIterator(
+        client=None,
+        api_request=api_request,
+        path="/stand-in",
+        schema=SCHEMA,
+        total_rows=total_rows,
+    )
+    return rows_to_dataframe(rows)
+
+
+def make_arrow_batches(df: pd.DataFrame, batch_size: int):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = table.schema.serialize().to_pybytes()
+    batches = [
+        (b.serialize().to_pybytes(), b.num_rows) for b in table.to_batches(batch_size)
+    ]
+    return schema, batches
+
+
+class StandInReadRows:
+    """Stand-in for the ReadRows call of the generated Storage Read client."""
+
+    def __init__(self, batches):
+        self.batches = batches
+
+    def read_rows(self, read_stream, offset, **kwargs):
+        return iter(
+            types.ReadRowsResponse(
+                arrow_record_batch=types.ArrowRecordBatch(
+                    serialized_record_batch=data, row_count=rows
+                ),
+                row_count=rows,
+            )
+            for data, rows in self.batches
+        )
+
+
+class StandInReadClient:
+    """Stand-in for `BigQueryReadClient` that serves one Arrow stream."""
+
+    def __init__(self, schema_bytes: bytes, batches):
+        self.schema_bytes = schema_bytes
+        self.batches = batches
+
+    def create_read_session(self, parent, read_session, max_stream_count):
+        session = types.ReadSession(
+            table=read_session.table,
+            data_format=types.DataFormat.ARROW,
+            streams=[types.ReadStream(name="stand-in/streams/0")],
+        )
+        session.arrow_schema.serialized_schema = self.schema_bytes
+        return session
+
+    def read_rows(self, name):
+        return reader.ReadRowsStream(StandInReadRows(self.batches), name, 0, {})
+
+
+def run_arrow(schema_bytes: bytes, batches) -> pd.DataFrame:
+    client = StandInReadClient(schema_bytes, batches)
+    table = read_table_with_bqstorage(client, "billing", "project", "dataset", "table")
+    return arrow_table_to_dataframe(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=20_000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    pages = make_rest_pages(df, args.page_size)
+    schema_bytes, batches = make_arrow_batches(df, args.page_size)
+
+    start = time.perf_counter()
+    rest_df = run_rest(pages, args.rows)
+    rest_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    arrow_df = run_arrow(schema_bytes, batches)
+    arrow_seconds = time.perf_counter() - start
+
+    assert len(rest_df) == len(arrow_df) == args.rows
+    print(f"rows: {args.rows}")
+    print(f"REST (tabledata.list JSON): {args.rows / rest_seconds:,.0f} rows/s")
+    print(f"Storage Read API (Arrow):   {args.rows / arrow_seconds:,.0f} rows/s")
+    print(f"speedup: {rest_seconds / arrow_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,42 @@ from .auth import (
     get_google_authorized_session,
     get_general_credentials,
 )
+from .state import JsonWatermarkStore, SqliteWatermarkStore
+from .gcs import (
+    upload_to_gcs,
+    resumable_upload_to_gcs,
+    download_from_gcs_as_dataframe,
+    upload_dataframe_to_gcs,
+    upload_dataframe_shards_to_gcs,
+    download_shards_from_gcs_as_arrow,
+    delete_from_gcs,
+)
 from .bigquery import (
     get_schema_from_bigquery,
+    get_schemas,
     upload_dataframe_to_bigquery,
+    align_dataframe_to_schema,
+    load_gcs_to_bigquery,
+    export_bigquery_to_gcs,
     query_bigquery_as_dataframe,
     download_from_bigquery_as_dataframe,
+    download_from_bigquery_via_export,
+    iter_bigquery_batches,
+    QueryResultCache,
+    run_queries,
+    dry_run_query,
+    incremental_download_from_bigquery,
+)
+from .dbt import (
+    get_dbt_job_list,
+    trigger_dbt_job,
+    get_dbt_run_status,
+    get_dbt_run_statuses,
+    dbt_run,
+    dbt_run_async,
+    DbtRunHandle,
+    dbt_run_many,
+    get_dbt_run_artifact,
+    parse_dbt_run_results,
+    get_dbt_run_timings,
 )
-from .gcs import upload_to_gcs, download_from_gcs_as_dataframe, upload_dataframe_to_gcs
-from .dbt import get_dbt_job_list, trigger_dbt_job, get_dbt_run_status, dbt_run
@@ -1,43 +1,172 @@
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
 import logging
+import os
+import re
+import time
+import hashlib
+import io
+import json
+import queue
+import threading
+import uuid
+import datetime
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
 import pandas as pd
+from requests.adapters import HTTPAdapter
 from google.cloud import bigquery
 from google.cloud.bigquery import SchemaField
-from cru_dse_utils import get_google_credentials, get_google_authorized_session
+from google.api_core.exceptions import NotFound
+from cru_dse_utils import (
+    get_google_credentials,
+    get_google_authorized_session,
+    upload_dataframe_shards_to_gcs,
+    download_shards_from_gcs_as_arrow,
+    delete_from_gcs,
+)
+from cru_dse_utils.gcs import validate_shard_format
 
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
-def get_schema_from_bigquery(
-    project_id: str, dataset_id: str, table_id: str, secret_name: str
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+try:
+    from google.cloud import bigquery_storage
+except ImportError:
+    bigquery_storage = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+EXPORT_THRESHOLD_BYTES = 10 * 1024**3
+
+SCHEMA_CACHE: Dict[str, Dict[str, Any]] = {}
+SCHEMA_CACHE_LOCK = threading.Lock()
+
+
+def get_cached_schema(
+    table_id_full: str, cache_dir: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached schema entry of a table from memory or disk.
+
+    Args:
+        table_id_full (str): The table ID in "project.dataset.table" format.
+        cache_dir (str, optional): The directory of the on-disk cache.
+        Defaults to None (in-process cache only).
+
+    Returns:
+        Dict[str, Any] or None: The cache entry with the schema "fields",
+        the "etag" and the "fetched_at" time, or None if it is not cached.
+    """
+    with SCHEMA_CACHE_LOCK:
+        entry = SCHEMA_CACHE.get(table_id_full)
+    if entry is None and cache_dir is not None:
+        path = os.path.join(cache_dir, f"{table_id_full}.json")
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with SCHEMA_CACHE_LOCK:
+            SCHEMA_CACHE[table_id_full] = entry
+    return entry
+
+
+def store_cached_schema(
+    table_id_full: str, entry: Dict[str, Any], cache_dir: Optional[str] = None
+) -> None:
+    """
+    Stores the schema entry of a table in memory and optionally on disk.
+
+    Args:
+        table_id_full (str): The table ID in "project.dataset.table" format.
+        entry (Dict[str, Any]): The cache entry with the schema "fields",
+        the "etag" and the "fetched_at" time.
+        cache_dir (str, optional): The directory of the on-disk cache.
+        Defaults to None (in-process cache only).
+    """
+    with SCHEMA_CACHE_LOCK:
+        SCHEMA_CACHE[table_id_full] = entry
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, f"{table_id_full}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+def fetch_schema_from_bigquery(
+    session: Any,
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    cache_ttl: Optional[float] = None,
+    cache_dir: Optional[str] = None,
 ) -> Optional[List[Dict]]:
     """
-    Fetches and returns the schema details of the specified table in Google
-    BigQuery.
+    Fetches the schema of a table with an authorized session.
 
-    This function fetches the schema details by building the required URL
-    using project_id, dataset_id, and table_id. The function checks for a
-    successful session authorization and successful response status for a
-    GET request. It also logs the progress and possible errors during the
-    operation.
+    This function requests only the `schema` and `etag` fields of the table
+    resource. If caching is enabled and a cached schema is older than
+    `cache_ttl`, the request is sent with the cached ETag, and a 304
+    response revalidates the cached schema without transferring it again.
 
     Args:
+        session (AuthorizedSession): The authorized session to use.
         project_id (str): The Google BigQuery Project ID.
         dataset_id (str): The Google BigQuery Dataset ID.
         table_id (str): The Google BigQuery Table ID.
+        cache_ttl (float, optional): The number of seconds a cached schema
+        is used without revalidation. Defaults to None (no caching).
+        cache_dir (str, optional): The directory of the on-disk cache.
+        Defaults to None (in-process cache only).
 
     Returns:
         List[Dict] or None: A list of dictionaries in json format containing
         the schema details if the operation is successful, None otherwise.
     """
     logger = logging.getLogger("primary_logger")
-    session = get_google_authorized_session(secret_name)
-    if session is None:
-        logger.error("Get schema from BigQuery error with authorization error")
-        return None
+    table_id_full = f"{project_id}.{dataset_id}.{table_id}"
+    entry = get_cached_schema(table_id_full, cache_dir) if cache_ttl else None
     url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/datasets/{dataset_id}/tables/{table_id}"
-    response = session.get(url)
+    params = {"fields": "schema,etag"}
+    if entry is not None and entry.get("etag"):
+        response = session.get(
+            url, params=params, headers={"If-None-Match": entry["etag"]}
+        )
+    else:
+        response = session.get(url, params=params)
+    if response.status_code == 304 and entry is not None:
+        store_cached_schema(
+            table_id_full, {**entry, "fetched_at": time.time()}, cache_dir
+        )
+        logger.info("Revalidated cached schema from BigQuery.")
+        return entry["fields"]
     if response.status_code == 200:
         data = response.json()
         schema_json = data["schema"]["fields"]
+        if cache_ttl:
+            store_cached_schema(
+                table_id_full,
+                {
+                    "fields": schema_json,
+                    "etag": data.get("etag"),
+                    "fetched_at": time.time(),
+                },
+                cache_dir,
+            )
         logger.info("Retrieved schemas from BigQuery.")
         return schema_json
     else:
@@ -47,12 +176,126 @@ def get_schema_from_bigquery(
         return None
 
 
+def get_schema_from_bigquery(
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    secret_name: str,
+    cache_ttl: Optional[float] = None,
+    cache_dir: Optional[str] = None,
+) -> Optional[List[Dict]]:
+    """
+    Fetches and returns the schema details of the specified table in Google
+    BigQuery.
+
+    This function fetches the schema details by building the required URL
+    using project_id, dataset_id, and table_id. Only the schema and ETag of
+    the table are requested. The function checks for a successful session
+    authorization and successful response status for a GET request. It
+    also logs the progress and possible errors during the operation. If
+    `cache_ttl` is set, schemas are cached in process, and on disk when
+    `cache_dir` is set; a cached schema younger than `cache_ttl` is
+    returned without any request, and an older one is revalidated with its
+    ETag.
+
+    Args:
+        project_id (str): The Google BigQuery Project ID.
+        dataset_id (str): The Google BigQuery Dataset ID.
+        table_id (str): The Google BigQuery Table ID.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        cache_ttl (float, optional): The number of seconds a cached schema
+        is used without revalidation. Defaults to None (no caching).
+        cache_dir (str, optional): The directory of the on-disk cache.
+        Defaults to None (in-process cache only).
+
+    Returns:
+        List[Dict] or None: A list of dictionaries in json format containing
+        the schema details if the operation is successful, None otherwise.
+    """
+    logger = logging.getLogger("primary_logger")
+    if cache_ttl:
+        entry = get_cached_schema(f"{project_id}.{dataset_id}.{table_id}", cache_dir)
+        if entry is not None and time.time() - entry["fetched_at"] < cache_ttl:
+            return entry["fields"]
+    session = get_google_authorized_session(secret_name)
+    if session is None:
+        logger.error("Get schema from BigQuery error with authorization error")
+        return None
+    return fetch_schema_from_bigquery(
+        session, project_id, dataset_id, table_id, cache_ttl, cache_dir
+    )
+
+
+def get_schemas(
+    tables: List[str],
+    secret_name: str,
+    max_workers: int = 8,
+    cache_ttl: Optional[float] = None,
+    cache_dir: Optional[str] = None,
+) -> Dict[str, Optional[List[Dict]]]:
+    """
+    Fetches the schemas of many BigQuery tables concurrently.
+
+    This function fetches the schemas with a thread pool over one
+    authorized session whose connection pool is sized to `max_workers`.
+    Cached schemas younger than `cache_ttl` are returned without a request.
+
+    Args:
+        tables (List[str]): The table IDs in "project.dataset.table" format.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        max_workers (int): The maximum number of concurrent requests.
+        Defaults to 8.
+        cache_ttl (float, optional): The number of seconds a cached schema
+        is used without revalidation. Defaults to None (no caching).
+        cache_dir (str, optional): The directory of the on-disk cache.
+        Defaults to None (in-process cache only).
+
+    Returns:
+        Dict[str, Optional[List[Dict]]]: The schema of each table keyed by
+        its table ID, or None for the tables whose schema could not be
+        fetched.
+    """
+    logger = logging.getLogger("primary_logger")
+    schemas = {}
+    to_fetch = []
+    for table_id_full in tables:
+        entry = get_cached_schema(table_id_full, cache_dir) if cache_ttl else None
+        if entry is not None and time.time() - entry["fetched_at"] < cache_ttl:
+            schemas[table_id_full] = entry["fields"]
+        else:
+            to_fetch.append(table_id_full)
+    if not to_fetch:
+        return schemas
+    session = get_google_authorized_session(secret_name)
+    if session is None:
+        logger.error("Get schemas from BigQuery error with authorization error")
+        return {**schemas, **{t: None for t in to_fetch}}
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+
+    def fetch(table_id_full):
+        try:
+            project_id, dataset_id, table_id = table_id_full.split(".")
+            return fetch_schema_from_bigquery(
+                session, project_id, dataset_id, table_id, cache_ttl, cache_dir
+            )
+        except Exception as e:
+            logger.exception(f"Get schema from BigQuery error: {str(e)}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        schemas.update(zip(to_fetch, pool.map(fetch, to_fetch)))
+    logger.info(f"Retrieved {len(to_fetch)} schemas from BigQuery.")
+    return schemas
+
+
 def validate_upload_dataframe_to_bigquery_arguments(
     project_id: str,
     dataset_id: str,
     table_id: str,
     secret_name: str,
-    df: pd.DataFrame,
+    df: Union[pd.DataFrame, "pa.Table"],
 ):
     """
     Validate the arguments needed for upload_bigquery_dataframe().
@@ -63,18 +306,133 @@ def validate_upload_dataframe_to_bigquery_arguments(
         table_id (str): The BigQuery table ID.
         secret_name (str): The name of the environment variable
         used for Google Cloud authentication.
-        df (pd.DataFrame): The pandas DataFrame containing the data to
-        upload.
+        df (Union[pd.DataFrame, pa.Table]): The pandas DataFrame or pyarrow
+        Table containing the data to upload.
 
     Raises:
         AssertionError: If any of the arguments are None or if df is not
-        a pandas DataFrame.
+        a pandas DataFrame or a pyarrow Table.
     """
     assert project_id, "project_id must not be None or empty"
     assert dataset_id, "dataset_id must not be None or empty"
     assert table_id, "table_id must not be None or empty"
     assert secret_name, "secret_name must not be None or empty"
-    assert isinstance(df, pd.DataFrame), "df must be a pandas DataFrame"
+    assert isinstance(df, pd.DataFrame) or (
+        pa is not None and isinstance(df, pa.Table)
+    ), "df must be a pandas DataFrame or a pyarrow Table"
+
+
+def cast_series_to_bigquery_type(series: pd.Series, field_type: str) -> pd.Series:
+    """
+    Casts a pandas Series to the dtype BigQuery expects for a column type.
+
+    Types without a cast, such as RECORD, NUMERIC, BYTES or GEOGRAPHY, are
+    returned unchanged.
+
+    Args:
+        series (pd.Series): The column to cast.
+        field_type (str): The BigQuery type of the column.
+
+    Returns:
+        pd.Series: The cast column.
+
+    Raises:
+        ValueError: If a value cannot be represented in the BigQuery type.
+        TypeError: If the column's values have an incompatible type.
+    """
+    field_type = field_type.upper()
+    if field_type in ("INTEGER", "INT64"):
+        if pd.api.types.is_integer_dtype(series.dtype):
+            return series.astype("Int64")
+        numbers = pd.to_numeric(series, errors="raise")
+        fractional = numbers.notna() & (numbers % 1 != 0)
+        if fractional.any():
+            raise ValueError(
+                f"non-integer values such as {numbers[fractional].iloc[0]}"
+            )
+        return numbers.astype("Int64")
+    if field_type in ("FLOAT", "FLOAT64"):
+        return pd.to_numeric(series, errors="raise").astype("float64")
+    if field_type in ("BOOLEAN", "BOOL"):
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series.astype("boolean")
+        text = series.astype("string").str.strip().str.lower()
+        values = text.map({"true": True, "false": False, "1": True, "0": False})
+        invalid = text.notna() & values.isna()
+        if invalid.any():
+            raise ValueError(f"non-boolean values such as {series[invalid].iloc[0]!r}")
+        return values.astype("boolean")
+    if field_type == "STRING":
+        if pd.api.types.is_string_dtype(series.dtype) and series.dtype != object:
+            return series
+        return series.astype("string")
+    if field_type == "TIMESTAMP":
+        return pd.to_datetime(series, utc=True, errors="raise")
+    if field_type == "DATETIME":
+        values = pd.to_datetime(series, errors="raise")
+        if values.dt.tz is not None:
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        return values
+    if field_type == "DATE":
+        return pd.to_datetime(series, errors="raise").dt.date
+    return series
+
+
+def align_dataframe_to_schema(
+    df: pd.DataFrame, schema_json: List[Dict[str, Any]]
+) -> pd.DataFrame:
+    """
+    Aligns a pandas DataFrame to a BigQuery table schema before an upload.
+
+    This function casts each column in bulk to the dtype BigQuery expects
+    for its type, for example object columns holding numbers to nullable
+    integers and tz-naive timestamps to UTC, orders the columns as in the
+    schema and drops columns missing from the schema. Missing NULLABLE
+    columns are added as nulls. All incompatible columns are collected and
+    reported in one error, so a bad frame fails before any bytes are sent
+    instead of after a slow upload.
+
+    Args:
+        df (pd.DataFrame): The pandas DataFrame to align.
+        schema_json (List[Dict[str, Any]]): The BigQuery schema, as returned
+        by `get_schema_from_bigquery()`.
+
+    Returns:
+        pd.DataFrame: A new DataFrame with the schema's columns, in order.
+
+    Raises:
+        ValueError: If any column cannot be cast to its BigQuery type, or a
+        REQUIRED column is missing or has nulls.
+    """
+    logger = logging.getLogger("primary_logger")
+    errors = {}
+    columns = {}
+    for field in schema_json:
+        name = field["name"]
+        mode = field.get("mode", "NULLABLE")
+        if name not in df.columns:
+            if mode == "REQUIRED":
+                errors[name] = "required column is missing"
+                continue
+            series = pd.Series([None] * len(df), index=df.index, dtype=object)
+        else:
+            series = df[name]
+        if mode == "REPEATED":
+            columns[name] = series
+            continue
+        try:
+            columns[name] = cast_series_to_bigquery_type(series, field["type"])
+        except (ValueError, TypeError) as e:
+            errors[name] = f"cannot cast {series.dtype} to {field['type']}: {e}"
+            continue
+        if mode == "REQUIRED" and columns[name].isna().any():
+            errors[name] = "required column has nulls"
+    if errors:
+        raise ValueError(f"DataFrame does not match the BigQuery schema: {errors}")
+    dropped = [c for c in df.columns if c not in columns]
+    if dropped:
+        logger.warning(f"Dropping columns not in the BigQuery schema: {dropped}")
+    return pd.DataFrame(columns, index=df.index)
 
 
 def get_job_config(schema_json, write_disposition, job_config_override):
@@ -111,22 +469,548 @@ def get_job_config(schema_json, write_disposition, job_config_override):
     )
 
 
-def upload_dataframe_to_bigquery(
+def append_dataframe_with_storage_write(
+    write_client: Any,
     project_id: str,
     dataset_id: str,
     table_id: str,
+    df: Union[pd.DataFrame, "pa.Table"],
+    stream_type: str = "committed",
+    batch_target_bytes: int = 8 * 1024 * 1024,
+) -> Dict[str, Any]:
+    """
+    Appends a pandas DataFrame to a BigQuery table with the Storage Write API.
+
+    This function serializes the DataFrame to Arrow record batches of about
+    `batch_target_bytes` each and appends them to a write stream over one
+    bidirectional gRPC call. With a "committed" stream the rows become
+    visible as each batch is acknowledged. With a "pending" stream the rows
+    are committed atomically once all batches have been appended.
+
+    Args:
+        write_client (BigQueryWriteClient): The Storage Write API client.
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The BigQuery dataset ID.
+        table_id (str): The BigQuery table ID. The table must exist.
+        df (Union[pd.DataFrame, pa.Table]): The pandas DataFrame or pyarrow
+        Table containing the data to append. Its columns must match the
+        table schema.
+        stream_type (str): "committed" or "pending". Defaults to
+        "committed".
+        batch_target_bytes (int): The target size of each appended batch.
+        Defaults to 8 MiB. The Storage Write API limits requests to 10 MB.
+
+    Returns:
+        Dict[str, Any]: The number of rows and batches, the elapsed seconds,
+        the rows per second and the latency of each batch in seconds.
+
+    Raises:
+        ValueError: If `stream_type` is not supported.
+        RuntimeError: If an append or the commit fails.
+    """
+    if stream_type not in ("committed", "pending"):
+        raise ValueError(f"Unsupported stream_type: {stream_type}")
+    types = bigquery_storage.types
+    start_time = time.monotonic()
+    parent = write_client.table_path(project_id, dataset_id, table_id)
+    write_stream = write_client.create_write_stream(
+        parent=parent,
+        write_stream=types.WriteStream(
+            type_=(
+                types.WriteStream.Type.COMMITTED
+                if stream_type == "committed"
+                else types.WriteStream.Type.PENDING
+            )
+        ),
+    )
+    if isinstance(df, pa.Table):
+        arrow_table = df
+    else:
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    rows_per_batch = max(
+        1,
+        batch_target_bytes * arrow_table.num_rows // max(1, arrow_table.nbytes),
+    )
+    batches = arrow_table.to_batches(max_chunksize=rows_per_batch)
+    send_times = []
+
+    def append_requests():
+        offset = 0
+        for batch in batches:
+            request = types.AppendRowsRequest(
+                offset=offset,
+                arrow_rows=types.AppendRowsRequest.ArrowData(
+                    rows=types.ArrowRecordBatch(
+                        serialized_record_batch=batch.serialize().to_pybytes()
+                    )
+                ),
+            )
+            if offset == 0:
+                request.write_stream = write_stream.name
+                request.arrow_rows.writer_schema = types.ArrowSchema(
+                    serialized_schema=arrow_table.schema.serialize().to_pybytes()
+                )
+            send_times.append(time.monotonic())
+            offset += batch.num_rows
+            yield request
+
+    latencies = []
+    if batches:
+        for response in write_client.append_rows(append_requests()):
+            latencies.append(time.monotonic() - send_times[len(latencies)])
+            if response.error.code or response.row_errors:
+                raise RuntimeError(
+                    f"Storage Write API append error: {response.error.message} "
+                    f"{list(response.row_errors)}"
+                )
+    write_client.finalize_write_stream(name=write_stream.name)
+    if stream_type == "pending":
+        commit = write_client.batch_commit_write_streams(
+            types.BatchCommitWriteStreamsRequest(
+                parent=parent, write_streams=[write_stream.name]
+            )
+        )
+        if commit.stream_errors:
+            raise RuntimeError(
+                f"Storage Write API commit error: {list(commit.stream_errors)}"
+            )
+    seconds = time.monotonic() - start_time
+    return {
+        "rows": arrow_table.num_rows,
+        "batches": len(batches),
+        "seconds": seconds,
+        "rows_per_second": arrow_table.num_rows / seconds if seconds else 0.0,
+        "batch_latencies": latencies,
+    }
+
+
+def load_dataframe_via_gcs(
+    client: bigquery.Client,
+    df: pd.DataFrame,
+    table_id_full: str,
+    job_config: bigquery.LoadJobConfig,
+    secret_name: str,
+    staging_bucket_name: str,
+    staging_prefix: Optional[str] = None,
+    chunk_rows: int = 1_000_000,
+    max_workers: int = 8,
+) -> bigquery.LoadJob:
+    """
+    Loads a pandas DataFrame into BigQuery through Parquet shards on GCS.
+
+    This function writes the DataFrame to Parquet shards under a staging
+    prefix in parallel, loads all shards with a single load job using a
+    wildcard URI, and deletes the shards afterwards, whether or not the
+    load succeeded. Only the `part-*.parquet` shards directly under the
+    staging prefix are loaded and deleted.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        df (pd.DataFrame): The pandas DataFrame containing the data to load.
+        table_id_full (str): The table ID in "project.dataset.table" format.
+        job_config (bigquery.LoadJobConfig): The load job configuration. Its
+        source format is set to Parquet.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        staging_bucket_name (str): The bucket to stage the shards in.
+        staging_prefix (str, optional): The prefix to stage the shards
+        under. Defaults to a unique prefix under "bigquery_staging/".
+        chunk_rows (int): The number of rows per shard. Defaults to 1000000.
+        max_workers (int): The maximum number of concurrent shard uploads.
+        Defaults to 8.
+
+    Returns:
+        bigquery.LoadJob: The completed load job.
+
+    Raises:
+        RuntimeError: If the shards could not be staged.
+    """
+    staging_prefix = (
+        staging_prefix or f"bigquery_staging/{table_id_full}/{uuid.uuid4().hex}"
+    ).rstrip("/")
+    try:
+        uris = upload_dataframe_shards_to_gcs(
+            staging_bucket_name,
+            staging_prefix,
+            df,
+            secret_name,
+            chunk_rows=chunk_rows,
+            max_workers=max_workers,
+        )
+        if uris is None:
+            raise RuntimeError("Staging DataFrame to Google Cloud Storage failed")
+        job_config = bigquery.LoadJobConfig.from_api_repr(job_config.to_api_repr())
+        job_config.source_format = bigquery.SourceFormat.PARQUET
+        job = client.load_table_from_uri(
+            f"gs://{staging_bucket_name}/{staging_prefix}/part-*.parquet",
+            table_id_full,
+            job_config=job_config,
+        )
+        job.result()
+        return job
+    finally:
+        delete_from_gcs(
+            staging_bucket_name,
+            f"{staging_prefix}/",
+            secret_name,
+            pattern="part-*.parquet",
+        )
+
+
+def build_merge_query(
+    target_table_id: str,
+    source_table_id: str,
+    columns: List[str],
+    merge_keys: List[str],
+    delete_column: Optional[str] = None,
+    delete_unmatched: bool = False,
+) -> str:
+    """
+    Builds a MERGE statement that upserts a source table into a target.
+
+    Rows are matched on `merge_keys` with `IS NOT DISTINCT FROM`, so a NULL
+    key matches a NULL key and re-running a merge does not insert duplicates.
+    Matched rows are updated and unmatched rows are inserted. If
+    `delete_column` is given, matched rows whose source value in that
+    column is true are deleted instead, and such rows are never inserted.
+    If `delete_unmatched` is True, target rows missing from the source are
+    deleted, which is only correct when the source holds a full snapshot.
+
+    Args:
+        target_table_id (str): The target table in "project.dataset.table"
+        format.
+        source_table_id (str): The source table in "project.dataset.table"
+        format.
+        columns (List[str]): The columns of the source table.
+        merge_keys (List[str]): The columns that identify a row.
+        delete_column (str, optional): A boolean source column flagging rows
+        to delete. It is not written to the target. Defaults to None.
+        delete_unmatched (bool): Whether to delete target rows that are not
+        in the source. Defaults to False.
+
+    Returns:
+        str: The MERGE statement.
+    """
+    data_columns = [c for c in columns if c != delete_column]
+    update_columns = [c for c in data_columns if c not in merge_keys]
+    on = " AND ".join(f"T.`{k}` IS NOT DISTINCT FROM S.`{k}`" for k in merge_keys)
+    clauses = []
+    if delete_column:
+        clauses.append(f"WHEN MATCHED AND S.`{delete_column}` THEN DELETE")
+    if update_columns:
+        assignments = ", ".join(f"`{c}` = S.`{c}`" for c in update_columns)
+        clauses.append(f"WHEN MATCHED THEN UPDATE SET {assignments}")
+    insert_condition = (
+        f" AND NOT COALESCE(S.`{delete_column}`, FALSE)" if delete_column else ""
+    )
+    insert_columns = ", ".join(f"`{c}`" for c in data_columns)
+    insert_values = ", ".join(f"S.`{c}`" for c in data_columns)
+    clauses.append(
+        f"WHEN NOT MATCHED BY TARGET{insert_condition} THEN "
+        f"INSERT ({insert_columns}) VALUES ({insert_values})"
+    )
+    if delete_unmatched:
+        clauses.append("WHEN NOT MATCHED BY SOURCE THEN DELETE")
+    return (
+        f"MERGE `{target_table_id}` T USING `{source_table_id}` S ON {on} "
+        + " ".join(clauses)
+    )
+
+
+def merge_staging_table(
+    client: bigquery.Client,
+    staging_table_id: str,
+    target_table_id: str,
+    columns: List[str],
+    merge_keys: List[str],
+    delete_column: Optional[str] = None,
+    delete_unmatched: bool = False,
+    maximum_bytes_billed: Optional[int] = None,
+) -> bigquery.QueryJob:
+    """
+    Merges a staging table into a target table.
+
+    This function runs the MERGE statement built by `build_merge_query()`.
+    If the target table does not exist yet, it is created from the staging
+    table instead, leaving out the rows flagged for deletion.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        staging_table_id (str): The staging table in "project.dataset.table"
+        format.
+        target_table_id (str): The target table in "project.dataset.table"
+        format.
+        columns (List[str]): The columns of the staging table.
+        merge_keys (List[str]): The columns that identify a row.
+        delete_column (str, optional): A boolean column flagging rows to
+        delete. Defaults to None.
+        delete_unmatched (bool): Whether to delete target rows that are not
+        in the staging table. Defaults to False.
+        maximum_bytes_billed (int, optional): The maximum number of bytes the
+        query may bill. Defaults to None (no limit).
+
+    Returns:
+        bigquery.QueryJob: The completed query job.
+    """
+    try:
+        client.get_table(target_table_id)
+        query = build_merge_query(
+            target_table_id,
+            staging_table_id,
+            columns,
+            merge_keys,
+            delete_column,
+            delete_unmatched,
+        )
+    except NotFound:
+        select = ", ".join(f"`{c}`" for c in columns if c != delete_column)
+        query = (
+            f"CREATE TABLE `{target_table_id}` AS "
+            f"SELECT {select} FROM `{staging_table_id}`"
+        )
+        if delete_column:
+            query += f" WHERE NOT COALESCE(`{delete_column}`, FALSE)"
+    job = submit_query(client, query, maximum_bytes_billed)
+    job.result()
+    return job
+
+
+def load_dataframe_to_table(
+    client: bigquery.Client,
+    df: Union[pd.DataFrame, "pa.Table"],
+    table_id_full: str,
+    job_config: bigquery.LoadJobConfig,
+    method: str,
     secret_name: str,
+    staging_bucket_name: Optional[str] = None,
+    staging_prefix: Optional[str] = None,
+    chunk_rows: int = 1_000_000,
+    max_workers: int = 8,
+) -> None:
+    """
+    Loads a pandas DataFrame into a table with a load job.
+
+    This function runs `load_table_from_dataframe()` for the "load_job"
+    method, or stages the DataFrame as Parquet shards on GCS with
+    `load_dataframe_via_gcs()` for the "gcs_staged" method. A pyarrow Table
+    is written to Parquet in memory and loaded with
+    `load_table_from_file()` without converting it to pandas.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        df (Union[pd.DataFrame, pa.Table]): The pandas DataFrame or pyarrow
+        Table containing the data to load. A pyarrow Table is only
+        supported by the "load_job" method.
+        table_id_full (str): The table ID in "project.dataset.table" format,
+        optionally with a partition decorator.
+        job_config (bigquery.LoadJobConfig): The load job configuration.
+        method (str): "load_job" or "gcs_staged".
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        staging_bucket_name (str, optional): The bucket to stage Parquet
+        shards in, required by the "gcs_staged" method.
+        staging_prefix (str, optional): The prefix to stage the shards
+        under.
+        chunk_rows (int): The number of rows per staged shard. Defaults to
+        1000000.
+        max_workers (int): The maximum number of concurrent shard uploads.
+        Defaults to 8.
+    """
+    if method == "gcs_staged":
+        load_dataframe_via_gcs(
+            client,
+            df,
+            table_id_full,
+            job_config,
+            secret_name,
+            staging_bucket_name,
+            staging_prefix=staging_prefix,
+            chunk_rows=chunk_rows,
+            max_workers=max_workers,
+        )
+    elif isinstance(df, pd.DataFrame):
+        job = client.load_table_from_dataframe(df, table_id_full, job_config=job_config)
+        job.result()
+    else:
+        job_config = bigquery.LoadJobConfig.from_api_repr(job_config.to_api_repr())
+        job_config.source_format = bigquery.SourceFormat.PARQUET
+        buffer = io.BytesIO()
+        pq.write_table(df, buffer)
+        buffer.seek(0)
+        job = client.load_table_from_file(buffer, table_id_full, job_config=job_config)
+        job.result()
+
+
+def split_dataframe_by_partition(
+    df: pd.DataFrame, partition_column: str, partition_type: str = "DAY"
+) -> Dict[str, pd.DataFrame]:
+    """
+    Splits a pandas DataFrame by its BigQuery time partition.
+
+    Args:
+        df (pd.DataFrame): The pandas DataFrame to split.
+        partition_column (str): The DATE, DATETIME or TIMESTAMP column the
+        table is partitioned on.
+        partition_type (str): "HOUR", "DAY", "MONTH" or "YEAR". Defaults to
+        "DAY".
+
+    Returns:
+        Dict[str, pd.DataFrame]: The rows of each partition keyed by the
+        partition decorator, such as "20240101" for a daily partition or
+        "__NULL__" for rows without a partition value.
+    """
+    formats = {"HOUR": "%Y%m%d%H", "DAY": "%Y%m%d", "MONTH": "%Y%m", "YEAR": "%Y"}
+    if partition_type not in formats:
+        raise ValueError(f"Unsupported partition_type: {partition_type}")
+    values = pd.to_datetime(df[partition_column])
+    if values.dt.tz is not None:
+        values = values.dt.tz_convert("UTC")
+    keys = values.dt.strftime(formats[partition_type]).fillna("__NULL__")
+    return {key: part for key, part in df.groupby(keys, sort=True)}
+
+
+def replace_partitions(
+    client: bigquery.Client,
     df: pd.DataFrame,
+    table_id_full: str,
+    job_config: bigquery.LoadJobConfig,
+    partition_column: str,
+    partition_type: str,
+    clustering_fields: Optional[List[str]],
+    method: str,
+    secret_name: str,
+    staging_bucket_name: Optional[str] = None,
+    staging_prefix: Optional[str] = None,
+    chunk_rows: int = 1_000_000,
+    max_workers: int = 8,
+) -> List[str]:
+    """
+    Overwrites only the partitions present in a pandas DataFrame.
+
+    This function loads the rows of each partition into its partition
+    decorator, such as `table$20240101`, with WRITE_TRUNCATE, so other
+    partitions are left untouched. The partitions are loaded in parallel.
+    If the table does not exist, the first partition is loaded on its own
+    to create the table with the requested time partitioning and
+    clustering before the rest are loaded.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        df (pd.DataFrame): The pandas DataFrame containing the data to load.
+        table_id_full (str): The table ID in "project.dataset.table" format.
+        job_config (bigquery.LoadJobConfig): The base load job
+        configuration. Its write disposition, time partitioning and
+        clustering are set by this function.
+        partition_column (str): The column the table is partitioned on.
+        partition_type (str): "HOUR", "DAY", "MONTH" or "YEAR".
+        clustering_fields (List[str], optional): The clustering columns used
+        when the table is created.
+        method (str): "load_job" or "gcs_staged".
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        staging_bucket_name (str, optional): The bucket to stage Parquet
+        shards in, required by the "gcs_staged" method.
+        staging_prefix (str, optional): The prefix to stage the shards
+        under. Each partition uses its own sub-prefix.
+        chunk_rows (int): The number of rows per staged shard. Defaults to
+        1000000.
+        max_workers (int): The maximum number of concurrent partition loads.
+        Defaults to 8.
+
+    Returns:
+        List[str]: The partition decorators that were replaced.
+    """
+    partitions = split_dataframe_by_partition(df, partition_column, partition_type)
+    job_config = bigquery.LoadJobConfig.from_api_repr(job_config.to_api_repr())
+    job_config.write_disposition = "WRITE_TRUNCATE"
+    job_config.time_partitioning = bigquery.TimePartitioning(
+        type_=partition_type, field=partition_column
+    )
+    if clustering_fields:
+        job_config.clustering_fields = clustering_fields
+
+    def load_partition(key):
+        load_dataframe_to_table(
+            client,
+            partitions[key],
+            f"{table_id_full}${key}",
+            job_config,
+            method,
+            secret_name,
+            staging_bucket_name,
+            f"{staging_prefix.rstrip('/')}/{key}" if staging_prefix else None,
+            chunk_rows,
+            max_workers,
+        )
+        return key
+
+    keys = list(partitions)
+    try:
+        client.get_table(table_id_full)
+    except NotFound:
+        if keys:
+            load_partition(keys.pop(0))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(load_partition, keys))
+    return list(partitions)
+
+
+def upload_dataframe_to_bigquery(
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    secret_name: str,
+    df: Union[pd.DataFrame, "pa.Table"],
     schema_json: Optional[Dict[Any, Any]] = None,
     job_config_override: Optional[bigquery.LoadJobConfig] = None,
     write_disposition: Optional[str] = "WRITE_TRUNCATE",
+    method: str = "load_job",
+    stream_type: str = "committed",
+    batch_target_bytes: int = 8 * 1024 * 1024,
+    staging_bucket_name: Optional[str] = None,
+    staging_prefix: Optional[str] = None,
+    chunk_rows: int = 1_000_000,
+    max_workers: int = 8,
+    merge_keys: Optional[List[str]] = None,
+    merge_delete_column: Optional[str] = None,
+    merge_delete_unmatched: bool = False,
+    partition_column: Optional[str] = None,
+    partition_type: str = "DAY",
+    clustering_fields: Optional[List[str]] = None,
+    align_to_schema: bool = False,
+    maximum_bytes_billed: Optional[int] = None,
 ) -> None:
     """
     Uploads data from a pandas DataFrame to a BigQuery table.
 
     This function validates the provided arguments, retrieves the Google Cloud
     credentials, prepares the load job configuration and then starts the
-    upload process.
+    upload process. With `method="storage_write"`, the rows are appended
+    with the BigQuery Storage Write API instead of a load job, which avoids
+    job scheduling latency and load job quotas for frequent small appends.
+    The Storage Write API only appends, so `write_disposition` and
+    `job_config_override` are ignored, and the table is created from
+    `schema_json` if it is provided. With `method="gcs_staged"`, the
+    DataFrame is written as Parquet shards to `staging_bucket_name` in
+    parallel and loaded with a single load job, which is faster for frames
+    of tens of millions of rows; the shards are deleted afterwards.
+
+    With `write_disposition="MERGE"`, the DataFrame is loaded into a
+    temporary staging table next to the target, merged into the target on
+    `merge_keys` with a generated MERGE statement, and the staging table is
+    dropped, so the cost of an incremental sync scales with the changed
+    rows instead of the table size.
+
+    With `write_disposition="REPLACE_PARTITIONS"`, only the time partitions
+    of `partition_column` present in the DataFrame are overwritten, each
+    through its partition decorator and in parallel. A missing table is
+    created with the time partitioning and `clustering_fields`.
+
+    A pyarrow Table can be uploaded instead of a DataFrame. The "load_job"
+    method sends it as Parquet and the "storage_write" method appends its
+    record batches as they are, without a pandas round trip. The
+    "gcs_staged" method and the "REPLACE_PARTITIONS" write disposition
+    split rows with pandas, so they convert the Table to a DataFrame first.
 
     Args:
         project_id (str): The Google Cloud project ID.
@@ -134,116 +1018,1970 @@ def upload_dataframe_to_bigquery(
         table_id (str): The BigQuery table ID.
         secret_name (str): The name of the environment variable used for
         Google Cloud authentication.
-        df (pd.DataFrame): The pandas DataFrame containing the data to upload.
+        df (Union[pd.DataFrame, pa.Table]): The pandas DataFrame or pyarrow
+        Table containing the data to upload.
         write_disposition (str, optional): Write disposition for the load job.
-        Default is "WRITE_TRUNCATE". Other options are "WRITE_APPEND" and
-        "WRITE_EMPTY".
+        Default is "WRITE_TRUNCATE". Other options are "WRITE_APPEND",
+        "WRITE_EMPTY", "MERGE" and "REPLACE_PARTITIONS".
         schema_json (Dict[Any, Any], optional): A dictionary representing the
         schema of the BigQuery table.
         job_config_override (bigquery.LoadJobConfig, optional): An optional
         LoadJobConfig instance. If provided, this config will be used and
         other parameters will be ignored.
+        method (str, optional): "load_job", "storage_write" or
+        "gcs_staged". Default is "load_job".
+        stream_type (str, optional): The Storage Write API stream type,
+        "committed" or "pending". Default is "committed".
+        batch_target_bytes (int, optional): The target size of each Storage
+        Write API batch. Default is 8 MiB.
+        staging_bucket_name (str, optional): The bucket to stage Parquet
+        shards in, required by the "gcs_staged" method.
+        staging_prefix (str, optional): The prefix to stage the shards
+        under. Default is a unique prefix under "bigquery_staging/".
+        chunk_rows (int, optional): The number of rows per staged shard.
+        Default is 1000000.
+        max_workers (int, optional): The maximum number of concurrent shard
+        uploads or partition loads. Default is 8.
+        merge_keys (List[str], optional): The columns that identify a row,
+        required by the "MERGE" write disposition.
+        merge_delete_column (str, optional): A boolean column flagging rows
+        to delete from the target during a merge. It is not written to the
+        target. Default is None.
+        merge_delete_unmatched (bool, optional): Whether a merge deletes
+        target rows missing from the DataFrame. Only use it when the
+        DataFrame is a full snapshot. Default is False.
+        partition_column (str, optional): The DATE, DATETIME or TIMESTAMP
+        column the table is partitioned on, required by the
+        "REPLACE_PARTITIONS" write disposition.
+        partition_type (str, optional): "HOUR", "DAY", "MONTH" or "YEAR".
+        Default is "DAY".
+        clustering_fields (List[str], optional): The clustering columns used
+        when the table is created. Default is None.
+        align_to_schema (bool, optional): Whether to cast and order the
+        DataFrame's columns to `schema_json` with
+        `align_dataframe_to_schema()` before uploading, so that
+        incompatible columns fail before any data is sent. Requires
+        `schema_json` and a pandas DataFrame. Default is False.
+        maximum_bytes_billed (int, optional): The maximum number of bytes the
+        "MERGE" query may bill. Default is None (no limit).
 
     Raises:
-        ValueError: If Google Cloud credentials are invalid or absent.
+        ValueError: If Google Cloud credentials are invalid or absent, or if
+        the method is not supported or not available, or if a merge has no
+        merge keys, or if a partition replace has no partition column, or
+        if `align_to_schema` finds columns incompatible with `schema_json`.
         Any exception raised during the upload process will be re-raised after
         being logged.
     """
     validate_upload_dataframe_to_bigquery_arguments(
         project_id, dataset_id, table_id, secret_name, df
     )
+    if method not in ("load_job", "storage_write", "gcs_staged"):
+        raise ValueError(f"Unsupported upload method: {method}")
+    if method == "gcs_staged" and not staging_bucket_name:
+        raise ValueError("The gcs_staged method requires staging_bucket_name")
+    if write_disposition == "MERGE" and not merge_keys:
+        raise ValueError("The MERGE write disposition requires merge_keys")
+    if write_disposition == "REPLACE_PARTITIONS" and not partition_column:
+        raise ValueError(
+            "The REPLACE_PARTITIONS write disposition requires partition_column"
+        )
+    if write_disposition in ("MERGE", "REPLACE_PARTITIONS") and (
+        method == "storage_write"
+    ):
+        raise ValueError(
+            f"The storage_write method does not support {write_disposition}"
+        )
+    if method == "storage_write" and (bigquery_storage is None or pa is None):
+        raise ValueError(
+            "The storage_write method requires google-cloud-bigquery-storage "
+            "and pyarrow"
+        )
+    if align_to_schema:
+        if not schema_json or not isinstance(df, pd.DataFrame):
+            raise ValueError("align_to_schema requires schema_json and a DataFrame")
+        aligned = align_dataframe_to_schema(df, schema_json)
+        if merge_delete_column and merge_delete_column in df.columns:
+            aligned[merge_delete_column] = df[merge_delete_column]
+        df = aligned
 
     logger = logging.getLogger("primary_logger")
     credentials = get_google_credentials(secret_name)
     if credentials is None:
         logger.error("Upload to BigQuery error with authorization error")
         raise ValueError("Invalid Google Cloud credentials")
+    if not isinstance(df, pd.DataFrame) and (
+        method == "gcs_staged" or write_disposition == "REPLACE_PARTITIONS"
+    ):
+        df = df.to_pandas()
 
     client = bigquery.Client(credentials=credentials)
     table_id_full = f"{project_id}.{dataset_id}.{table_id}"
-    job_config = get_job_config(schema_json, write_disposition, job_config_override)
 
     logger.info(f"Starting to upload data to {table_id_full}")
+    if method == "storage_write":
+        if write_disposition != "WRITE_APPEND":
+            logger.warning(
+                f"The storage_write method only appends. Ignoring "
+                f"write_disposition {write_disposition}."
+            )
+        try:
+            if schema_json:
+                schema = [SchemaField.from_api_repr(field) for field in schema_json]
+                client.create_table(
+                    bigquery.Table(table_id_full, schema=schema), exists_ok=True
+                )
+            write_client = bigquery_storage.BigQueryWriteClient(credentials=credentials)
+            stats = append_dataframe_with_storage_write(
+                write_client,
+                project_id,
+                dataset_id,
+                table_id,
+                df,
+                stream_type=stream_type,
+                batch_target_bytes=batch_target_bytes,
+            )
+            latencies = stats["batch_latencies"] or [0.0]
+            logger.info(
+                f"Appended {stats['rows']} rows to {table_id_full} in "
+                f"{stats['batches']} batches: {stats['rows_per_second']:.0f} "
+                f"rows/s, batch latency mean {sum(latencies) / len(latencies):.3f}s, "
+                f"max {max(latencies):.3f}s"
+            )
+        except Exception as e:
+            logger.exception(f"Upload to BigQuery error: {str(e)}")
+            raise
+        return
+
+    if write_disposition == "MERGE":
+        staging_table_id = f"{table_id_full}__staging_{uuid.uuid4().hex[:8]}"
+        job_config = get_job_config(schema_json, "WRITE_TRUNCATE", job_config_override)
+        try:
+            load_dataframe_to_table(
+                client,
+                df,
+                staging_table_id,
+                job_config,
+                method,
+                secret_name,
+                staging_bucket_name,
+                staging_prefix,
+                chunk_rows,
+                max_workers,
+            )
+            # Expire the staging table in case this process dies before
+            # dropping it.
+            staging_table = client.get_table(staging_table_id)
+            staging_table.expires = datetime.datetime.now(
+                datetime.timezone.utc
+            ) + datetime.timedelta(days=1)
+            client.update_table(staging_table, ["expires"])
+            job = merge_staging_table(
+                client,
+                staging_table_id,
+                table_id_full,
+                list(df.columns) if isinstance(df, pd.DataFrame) else df.column_names,
+                merge_keys,
+                merge_delete_column,
+                merge_delete_unmatched,
+                maximum_bytes_billed,
+            )
+            logger.info(
+                f"Merged data into {table_id_full}, "
+                f"{job.num_dml_affected_rows} rows affected"
+            )
+        except Exception as e:
+            logger.exception(f"Upload to BigQuery error: {str(e)}")
+            raise
+        finally:
+            client.delete_table(staging_table_id, not_found_ok=True)
+        return
+
+    if write_disposition == "REPLACE_PARTITIONS":
+        job_config = get_job_config(schema_json, "WRITE_TRUNCATE", job_config_override)
+        try:
+            partitions = replace_partitions(
+                client,
+                df,
+                table_id_full,
+                job_config,
+                partition_column,
+                partition_type,
+                clustering_fields,
+                method,
+                secret_name,
+                staging_bucket_name,
+                staging_prefix,
+                chunk_rows,
+                max_workers,
+            )
+            logger.info(
+                f"Replaced {len(partitions)} partitions of {table_id_full}: "
+                f"{', '.join(partitions)}"
+            )
+        except Exception as e:
+            logger.exception(f"Upload to BigQuery error: {str(e)}")
+            raise
+        return
+
+    job_config = get_job_config(schema_json, write_disposition, job_config_override)
     try:
-        job = client.load_table_from_dataframe(df, table_id_full, job_config=job_config)
-        job.result()
+        load_dataframe_to_table(
+            client,
+            df,
+            table_id_full,
+            job_config,
+            method,
+            secret_name,
+            staging_bucket_name,
+            staging_prefix,
+            chunk_rows,
+            max_workers,
+        )
         logger.info(f"Uploaded data to {table_id_full}")
     except Exception as e:
         logger.exception(f"Upload to BigQuery error: {str(e)}")
         raise
 
 
-def download_from_bigquery_as_dataframe(
-    project_id: str, dataset_id: str, table_id: str, secret_name: str
-) -> Union[pd.DataFrame, None]:
+def get_job_timing(job: Any) -> Optional[float]:
     """
-    Download data from a BigQuery table to a pandas DataFrame.
-
-    This function uploads a pandas DataFrame to the specified BigQuery table.
-    The function logs a message indicating whether the upload succeeded or
-    failed.
+    Returns the seconds between the start and the end of a finished job.
 
     Args:
-        project_id (str): The Google Cloud project ID.
-        dataset_id (str): The BigQuery dataset ID.
-        table_id (str): The BigQuery table ID.
-        secret_name (str): The name of the environment variable used for
-        Google Cloud authentication.
+        job (bigquery job): The finished job.
 
     Returns:
-        Union[pd.DataFrame, None]: The pandas DataFrame containing the data
-        downloaded from BigQuery. If the authorization or download fails,
-        None is returned.
+        float or None: The elapsed seconds, or None if the job has no
+        start or end time.
     """
-    logger = logging.getLogger("primary_logger")
-    credentials = get_google_credentials(secret_name)
-    if credentials is None:
-        logger.error("Download from BigQuery error with authorization error")
-        return None
-    client = bigquery.Client(credentials=credentials)
-    table_id_full = f"{project_id}.{dataset_id}.{table_id}"
-    logger.info(f"Starting to download data from BigQuery table: {table_id_full}")
-    try:
-        df = client.list_rows(table_id_full).to_dataframe()
-        logger.info(f"Downloaded data from BigQuery table: {table_id_full}")
-        return df
-    except Exception as e:
-        logger.exception(f"Download from BigQuery error: {str(e)}")
+    if job.started is None or job.ended is None:
         return None
+    return (job.ended - job.started).total_seconds()
+
+
+def load_gcs_to_bigquery(
+    source_uris: Union[str, List[str]],
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    secret_name: str,
+    schema_json: Optional[Dict[Any, Any]] = None,
+    job_config_override: Optional[bigquery.LoadJobConfig] = None,
+    write_disposition: Optional[str] = "WRITE_TRUNCATE",
+    source_format: str = "CSV",
+    skip_leading_rows: int = 1,
+) -> Dict[str, Any]:
+    """
+    Loads files from Google Cloud Storage into a BigQuery table.
+
+    This function runs a load job that reads the files directly from Google
+    Cloud Storage, so no data passes through this process. The job
+    configuration follows `upload_dataframe_to_bigquery()`: the table is
+    created with `schema_json`, or with an autodetected schema if it is
+    not given, and `job_config_override` replaces the configuration
+    entirely. The function logs the job's timing and size.
+
+    Args:
+        source_uris (Union[str, List[str]]): The gs:// URI of the files. A
+        URI may contain one "*" wildcard, such as "gs://bucket/data/*.csv".
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The BigQuery dataset ID.
+        table_id (str): The BigQuery table ID.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        schema_json (Dict[Any, Any], optional): A dictionary representing the
+        schema of the BigQuery table.
+        job_config_override (bigquery.LoadJobConfig, optional): An optional
+        LoadJobConfig instance. If provided, this config will be used and
+        other parameters will be ignored.
+        write_disposition (str, optional): Write disposition for the load job.
+        Default is "WRITE_TRUNCATE", other options are "WRITE_APPEND" and
+        "WRITE_EMPTY".
+        source_format (str, optional): "CSV", "NEWLINE_DELIMITED_JSON",
+        "PARQUET", "AVRO" or "ORC". Default is "CSV".
+        skip_leading_rows (int, optional): The number of header rows to skip
+        in CSV files. Default is 1.
+
+    Returns:
+        Dict[str, Any]: The job ID, the number of input files, input bytes
+        and loaded rows, and the elapsed seconds of the load job.
+
+    Raises:
+        ValueError: If Google Cloud credentials are invalid or absent.
+        Any exception raised by the load job will be re-raised after being
+        logged.
+    """
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error("Load to BigQuery error with authorization error")
+        raise ValueError("Invalid Google Cloud credentials")
+    client = bigquery.Client(credentials=credentials)
+    table_id_full = f"{project_id}.{dataset_id}.{table_id}"
+    job_config = get_job_config(schema_json, write_disposition, job_config_override)
+    if not job_config_override:
+        job_config.source_format = source_format
+        if source_format == "CSV":
+            job_config.skip_leading_rows = skip_leading_rows
+    try:
+        job = client.load_table_from_uri(
+            source_uris, table_id_full, job_config=job_config
+        )
+        job.result()
+        stats = {
+            "job_id": job.job_id,
+            "input_files": job.input_files,
+            "input_file_bytes": job.input_file_bytes,
+            "output_rows": job.output_rows,
+            "elapsed_seconds": get_job_timing(job),
+        }
+        logger.info(f"Loaded {source_uris} to {table_id_full}. Stats: {stats}")
+        return stats
+    except Exception as e:
+        logger.exception(f"Load to BigQuery error: {str(e)}")
+        raise
+
+
+def extract_table_to_gcs(
+    client: bigquery.Client,
+    table_id_full: str,
+    destination_uri: str,
+    file_format: str = "PARQUET",
+    compression: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Runs an extract job from a BigQuery table to Google Cloud Storage.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        table_id_full (str): The table ID in "project.dataset.table" format.
+        destination_uri (str): The gs:// URI to write to. It must contain
+        one "*" wildcard for tables larger than 1 GB.
+        file_format (str, optional): "PARQUET", "AVRO", "CSV" or
+        "NEWLINE_DELIMITED_JSON". Defaults to "PARQUET".
+        compression (str, optional): The compression, such as "SNAPPY" or
+        "GZIP". Defaults to None (the BigQuery default for the format).
+
+    Returns:
+        Dict[str, Any]: The job ID, the number of files written, the rows
+        and bytes of the exported table, and the elapsed seconds of the
+        extract job.
+    """
+    job_config = bigquery.ExtractJobConfig(destination_format=file_format)
+    if compression:
+        job_config.compression = compression
+    if file_format == "AVRO":
+        job_config.use_avro_logical_types = True
+    job = client.extract_table(table_id_full, destination_uri, job_config=job_config)
+    job.result()
+    table = client.get_table(table_id_full)
+    return {
+        "job_id": job.job_id,
+        "destination_files": sum(job.destination_uri_file_counts or []),
+        "source_rows": table.num_rows,
+        "source_bytes": table.num_bytes,
+        "elapsed_seconds": get_job_timing(job),
+    }
+
+
+def export_bigquery_to_gcs(
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    secret_name: str,
+    destination_uri: str,
+    file_format: str = "PARQUET",
+    compression: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Exports a BigQuery table to files in Google Cloud Storage.
+
+    This function runs an extract job, which is free and writes the files
+    from BigQuery directly, so no data passes through this process. The
+    function logs the job's timing and the number of files written.
+
+    Args:
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The BigQuery dataset ID.
+        table_id (str): The BigQuery table ID.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        destination_uri (str): The gs:// URI to write to, such as
+        "gs://bucket/export/part-*.parquet". It must contain one "*"
+        wildcard for tables larger than 1 GB.
+        file_format (str, optional): "PARQUET", "AVRO", "CSV" or
+        "NEWLINE_DELIMITED_JSON". Default is "PARQUET".
+        compression (str, optional): The compression, such as "SNAPPY" or
+        "GZIP". Default is None (the BigQuery default for the format).
+
+    Returns:
+        Dict[str, Any]: The job ID, the number of files written, the rows
+        and bytes of the exported table, and the elapsed seconds of the
+        extract job.
+
+    Raises:
+        ValueError: If Google Cloud credentials are invalid or absent.
+        Any exception raised by the extract job will be re-raised after
+        being logged.
+    """
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error("Export from BigQuery error with authorization error")
+        raise ValueError("Invalid Google Cloud credentials")
+    client = bigquery.Client(credentials=credentials)
+    table_id_full = f"{project_id}.{dataset_id}.{table_id}"
+    try:
+        stats = extract_table_to_gcs(
+            client, table_id_full, destination_uri, file_format, compression
+        )
+        logger.info(f"Exported {table_id_full} to {destination_uri}. Stats: {stats}")
+        return stats
+    except Exception as e:
+        logger.exception(f"Export from BigQuery error: {str(e)}")
+        raise
+
+
+def get_bqstorage_client(credentials) -> Optional[Any]:
+    """
+    Creates a BigQuery Storage Read API client if it is available.
+
+    This function creates a `BigQueryReadClient` with the provided
+    credentials when the optional `google-cloud-bigquery-storage` package
+    is installed. The function logs a warning and returns None if the
+    package is missing or the client cannot be created, so callers can fall
+    back to the REST API.
+
+    Args:
+        credentials (Credentials): The Google Cloud credentials.
+
+    Returns:
+        BigQueryReadClient or None: The Storage Read API client, or None if
+        it is not available.
+    """
+    logger = logging.getLogger("primary_logger")
+    if bigquery_storage is None:
+        logger.warning(
+            "google-cloud-bigquery-storage is not installed. Using the REST API."
+        )
+        return None
+    try:
+        return bigquery_storage.BigQueryReadClient(credentials=credentials)
+    except Exception as e:
+        logger.warning(f"Create BigQuery Storage client error: {str(e)}")
+        return None
+
+
+def get_dataframe_dtypes(dtype_backend: str) -> Dict[str, Any]:
+    """
+    Returns the pandas dtypes used for BigQuery scalar columns.
+
+    Args:
+        dtype_backend (str): "numpy" for the default dtypes of the BigQuery
+        client, "nullable" for pandas nullable extension dtypes, or
+        "pyarrow" for Arrow-backed dtypes.
+
+    Returns:
+        Dict[str, Any]: The `bool_dtype`, `int_dtype`, `float_dtype` and
+        `string_dtype` arguments of `RowIterator.to_dataframe()`. Empty for
+        "numpy".
+
+    Raises:
+        ValueError: If `dtype_backend` is not supported, or if "pyarrow" is
+        requested and pyarrow is not installed.
+    """
+    if dtype_backend == "numpy":
+        return {}
+    if dtype_backend == "nullable":
+        return {
+            "bool_dtype": pd.BooleanDtype(),
+            "int_dtype": pd.Int64Dtype(),
+            "float_dtype": pd.Float64Dtype(),
+            "string_dtype": pd.StringDtype(),
+        }
+    if dtype_backend == "pyarrow":
+        if pa is None:
+            raise ValueError("pyarrow is required for the pyarrow dtype backend")
+        return {
+            "bool_dtype": pd.ArrowDtype(pa.bool_()),
+            "int_dtype": pd.ArrowDtype(pa.int64()),
+            "float_dtype": pd.ArrowDtype(pa.float64()),
+            "string_dtype": pd.ArrowDtype(pa.string()),
+        }
+    raise ValueError(f"Unsupported dtype backend: {dtype_backend}")
+
+
+def arrow_table_to_dataframe(
+    table: "pa.Table", dtype_backend: str = "numpy"
+) -> pd.DataFrame:
+    """
+    Converts a pyarrow Table to a pandas DataFrame with the given dtypes.
+
+    Args:
+        table (pa.Table): The Arrow table.
+        dtype_backend (str, optional): "numpy", "nullable" or "pyarrow". See
+        `get_dataframe_dtypes`. Defaults to "numpy".
+
+    Returns:
+        pd.DataFrame: The table as a pandas DataFrame.
+    """
+    dtypes = get_dataframe_dtypes(dtype_backend)
+    if dtype_backend == "pyarrow":
+        return table.to_pandas(split_blocks=True, types_mapper=pd.ArrowDtype)
+    if dtype_backend == "nullable":
+        types_mapper = {
+            pa.bool_(): dtypes["bool_dtype"],
+            pa.int64(): dtypes["int_dtype"],
+            pa.float64(): dtypes["float_dtype"],
+            pa.string(): dtypes["string_dtype"],
+            pa.large_string(): dtypes["string_dtype"],
+        }.get
+        return table.to_pandas(split_blocks=True, types_mapper=types_mapper)
+    return table.to_pandas(split_blocks=True)
+
+
+def downcast_integer_series(series: pd.Series) -> pd.Series:
+    """
+    Casts an integer Series to the smallest integer type holding its values.
+
+    The kind of dtype is kept: numpy integers stay numpy integers, nullable
+    integers stay nullable and Arrow integers stay Arrow integers.
+
+    Args:
+        series (pd.Series): The integer Series.
+
+    Returns:
+        pd.Series: The downcast Series, or the original Series if it is
+        empty or no smaller type holds its values.
+    """
+    if series.count() == 0:
+        return series
+    low, high = int(series.min()), int(series.max())
+    for bits in (8, 16, 32):
+        info = np.iinfo(f"int{bits}")
+        if info.min <= low and high <= info.max:
+            break
+    else:
+        return series
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return series.astype(pd.ArrowDtype(getattr(pa, f"int{bits}")()))
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.astype(f"Int{bits}")
+    return series.astype(f"int{bits}")
+
+
+def optimize_dataframe_memory(
+    df: pd.DataFrame,
+    schema: List[SchemaField],
+    categorical_threshold: float = 0.5,
+) -> pd.DataFrame:
+    """
+    Reduces the memory of a DataFrame downloaded from BigQuery.
+
+    This function uses the BigQuery schema to decide which columns to
+    shrink. INTEGER columns are downcast to the smallest integer type that
+    holds their values, and STRING columns whose number of distinct values
+    is at most `categorical_threshold` times the number of rows are
+    converted to categoricals. Other columns, such as REPEATED or RECORD
+    columns, are left unchanged. The memory before and after is logged.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to optimize.
+        schema (List[SchemaField]): The BigQuery schema of the DataFrame.
+        categorical_threshold (float, optional): The maximum ratio of
+        distinct values to rows for a string column to become categorical.
+        Defaults to 0.5.
+
+    Returns:
+        pd.DataFrame: The optimized DataFrame.
+    """
+    logger = logging.getLogger("primary_logger")
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    for field in schema:
+        if field.name not in df.columns or field.mode == "REPEATED":
+            continue
+        series = df[field.name]
+        if field.field_type in ("INTEGER", "INT64"):
+            if pd.api.types.is_integer_dtype(series.dtype):
+                df[field.name] = downcast_integer_series(series)
+        elif field.field_type == "STRING" and len(series):
+            if series.nunique() <= categorical_threshold * len(series):
+                df[field.name] = series.astype("category")
+    bytes_after = int(df.memory_usage(deep=True).sum())
+    logger.info(
+        f"DataFrame memory reduced from {bytes_before / 2**20:.1f} MiB to "
+        f"{bytes_after / 2**20:.1f} MiB."
+    )
+    return df
+
+
+def rows_to_dataframe(
+    rows, bqstorage_client: Optional[Any] = None, dtype_backend: str = "numpy"
+) -> pd.DataFrame:
+    """
+    Converts BigQuery rows to a pandas DataFrame.
+
+    This function reads the rows with the BigQuery Storage Read API and
+    Arrow serialization when a Storage client is provided. If the Storage
+    read fails, for example because of missing permissions, the function
+    logs a warning and falls back to paging through the REST API.
+
+    Args:
+        rows (RowIterator): The rows returned by `list_rows()` or by a query
+        job's `result()`.
+        bqstorage_client (BigQueryReadClient, optional): The Storage Read
+        API client. Defaults to None (REST API).
+        dtype_backend (str, optional): "numpy", "nullable" or "pyarrow". See
+        `get_dataframe_dtypes`. Defaults to "numpy".
+
+    Returns:
+        pd.DataFrame: The rows as a pandas DataFrame.
+    """
+    logger = logging.getLogger("primary_logger")
+    dtypes = get_dataframe_dtypes(dtype_backend)
+    if bqstorage_client is not None:
+        try:
+            return rows.to_dataframe(bqstorage_client=bqstorage_client, **dtypes)
+        except Exception as e:
+            logger.warning(
+                f"BigQuery Storage read error: {str(e)}. Falling back to REST API."
+            )
+    return rows.to_dataframe(create_bqstorage_client=False, **dtypes)
+
+
+def validate_output(output: str) -> None:
+    """
+    Checks that a result output format is supported and available.
+
+    Args:
+        output (str): "pandas", "arrow" or "polars".
+
+    Raises:
+        ValueError: If `output` is not supported, or if the package it needs
+        is not installed.
+    """
+    if output not in ("pandas", "arrow", "polars"):
+        raise ValueError(f"Unsupported output: {output}")
+    if output in ("arrow", "polars") and pa is None:
+        raise ValueError(f"pyarrow is required for {output} output")
+    if output == "polars" and pl is None:
+        raise ValueError("polars is required for polars output")
+
+
+def arrow_table_to_output(
+    table: "pa.Table", output: str, dtype_backend: str = "numpy"
+) -> Union[pd.DataFrame, "pa.Table", "pl.DataFrame"]:
+    """
+    Converts a pyarrow Table to the requested output format.
+
+    Polars frames share the Arrow buffers of the table where the types
+    allow, so "arrow" and "polars" avoid copying the data.
+
+    Args:
+        table (pa.Table): The Arrow table.
+        output (str): "pandas", "arrow" or "polars".
+        dtype_backend (str, optional): The pandas dtype backend, used for
+        "pandas" output. Defaults to "numpy".
+
+    Returns:
+        Union[pd.DataFrame, pa.Table, pl.DataFrame]: The converted table.
+    """
+    if output == "arrow":
+        return table
+    if output == "polars":
+        return pl.from_arrow(table)
+    return arrow_table_to_dataframe(table, dtype_backend)
+
+
+def rows_to_output(
+    rows,
+    bqstorage_client: Optional[Any] = None,
+    output: str = "pandas",
+    dtype_backend: str = "numpy",
+) -> Union[pd.DataFrame, "pa.Table", "pl.DataFrame"]:
+    """
+    Converts BigQuery rows to a pandas DataFrame, pyarrow Table or Polars
+    DataFrame.
+
+    Arrow and Polars outputs are built from the Arrow data of the rows
+    without going through pandas. Like `rows_to_dataframe`, a failed
+    Storage read falls back to the REST API.
+
+    Args:
+        rows (RowIterator): The rows returned by `list_rows()` or by a query
+        job's `result()`.
+        bqstorage_client (BigQueryReadClient, optional): The Storage Read
+        API client. Defaults to None (REST API).
+        output (str, optional): "pandas", "arrow" or "polars". Defaults to
+        "pandas".
+        dtype_backend (str, optional): The pandas dtype backend, used for
+        "pandas" output. Defaults to "numpy".
+
+    Returns:
+        Union[pd.DataFrame, pa.Table, pl.DataFrame]: The rows.
+    """
+    if output == "pandas":
+        return rows_to_dataframe(rows, bqstorage_client, dtype_backend)
+    logger = logging.getLogger("primary_logger")
+    table = None
+    if bqstorage_client is not None:
+        try:
+            table = rows.to_arrow(bqstorage_client=bqstorage_client)
+        except Exception as e:
+            logger.warning(
+                f"BigQuery Storage read error: {str(e)}. Falling back to REST API."
+            )
+    if table is None:
+        table = rows.to_arrow(create_bqstorage_client=False)
+    return arrow_table_to_output(table, output)
+
+
+def read_bqstorage_stream(
+    bqstorage_client: Any, stream_name: str, session: Any
+) -> "pa.Table":
+    """
+    Reads one Storage Read API stream to a pyarrow Table.
+
+    Args:
+        bqstorage_client (BigQueryReadClient): The Storage Read API client.
+        stream_name (str): The name of the read stream.
+        session (ReadSession): The read session that owns the stream.
+
+    Returns:
+        pa.Table: The rows of the stream.
+    """
+    return bqstorage_client.read_rows(stream_name).to_arrow(session)
+
+
+def read_bqstorage_stream_in_process(
+    secret_name: str, stream_name: str, serialized_session: bytes
+) -> "pa.Table":
+    """
+    Reads one Storage Read API stream in a worker process.
+
+    gRPC clients and credentials cannot be sent to another process, so this
+    function creates its own Storage Read API client from `secret_name` and
+    rebuilds the read session from its serialized form.
+
+    Args:
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        stream_name (str): The name of the read stream.
+        serialized_session (bytes): The serialized read session.
+
+    Returns:
+        pa.Table: The rows of the stream.
+    """
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        raise ValueError("Invalid Google Cloud credentials")
+    session = bigquery_storage.types.ReadSession.deserialize(serialized_session)
+    bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=credentials)
+    return read_bqstorage_stream(bqstorage_client, stream_name, session)
+
+
+def read_table_with_bqstorage(
+    bqstorage_client: Any,
+    billing_project_id: str,
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    columns: Optional[List[str]] = None,
+    row_filter: Optional[str] = None,
+    sample_percent: Optional[float] = None,
+    max_results: Optional[int] = None,
+    max_streams: int = 1,
+    executor: str = "thread",
+    secret_name: Optional[str] = None,
+) -> "pa.Table":
+    """
+    Reads a BigQuery table with a Storage Read API session.
+
+    This function creates a read session with the selected columns, row
+    restriction and sampling pushed down to BigQuery, so only the requested
+    data is transferred. The rows are read as Arrow record batches. If
+    `max_results` is set, a single stream is used and the function stops
+    reading once enough rows have been received. If `max_streams` is
+    greater than one, the session is split into up to that many streams,
+    each stream is read and decoded on its own worker, and the results are
+    concatenated without copying the column data. With the "thread"
+    executor the workers share the decoded Arrow buffers with the caller.
+    The "process" executor starts its workers with the "spawn" method, so
+    the gRPC channels of the parent are never forked, and each stream's
+    table is pickled back to the parent, which copies it once.
+
+    Args:
+        bqstorage_client (BigQueryReadClient): The Storage Read API client.
+        billing_project_id (str): The project that the read session is
+        billed to.
+        project_id (str): The Google Cloud project ID of the table.
+        dataset_id (str): The BigQuery dataset ID.
+        table_id (str): The BigQuery table ID.
+        columns (List[str], optional): The columns to read. Defaults to None
+        (all columns).
+        row_filter (str, optional): A SQL boolean expression used to filter
+        rows, such as "created_at >= '2024-01-01'". Defaults to None.
+        sample_percent (float, optional): The percentage of the table to
+        sample. Defaults to None (no sampling).
+        max_results (int, optional): The maximum number of rows to read.
+        Defaults to None (all rows).
+        max_streams (int): The maximum number of streams to read in
+        parallel. BigQuery may return fewer streams. Defaults to 1.
+        executor (str): "thread" to decode streams in a thread pool or
+        "process" to decode them in a process pool. Defaults to "thread".
+        secret_name (str, optional): The name of the environment variable
+        used for Google Cloud authentication, required by the "process"
+        executor.
+
+    Returns:
+        pa.Table: The rows as a pyarrow Table.
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Unsupported executor: {executor}")
+    if executor == "process" and secret_name is None:
+        raise ValueError("secret_name is required for the process executor")
+    if max_results is not None:
+        max_streams = 1
+    types = bigquery_storage.types
+    read_options = types.ReadSession.TableReadOptions(
+        selected_fields=columns or [], row_restriction=row_filter or ""
+    )
+    if sample_percent is not None:
+        read_options.sample_percentage = sample_percent
+    requested_session = types.ReadSession(
+        table=f"projects/{project_id}/datasets/{dataset_id}/tables/{table_id}",
+        data_format=types.DataFormat.ARROW,
+        read_options=read_options,
+    )
+    session = bqstorage_client.create_read_session(
+        parent=f"projects/{billing_project_id}",
+        read_session=requested_session,
+        max_stream_count=max_streams,
+    )
+    schema = pa.ipc.read_schema(pa.py_buffer(session.arrow_schema.serialized_schema))
+    stream_names = [stream.name for stream in session.streams]
+    if len(stream_names) > 1:
+        logger = logging.getLogger("primary_logger")
+        logger.info(f"Reading {len(stream_names)} BigQuery Storage streams.")
+        if executor == "process":
+            serialized_session = types.ReadSession.serialize(session)
+            with ProcessPoolExecutor(
+                max_workers=len(stream_names),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                tables = list(
+                    pool.map(
+                        read_bqstorage_stream_in_process,
+                        [secret_name] * len(stream_names),
+                        stream_names,
+                        [serialized_session] * len(stream_names),
+                    )
+                )
+        else:
+            with ThreadPoolExecutor(max_workers=len(stream_names)) as pool:
+                tables = list(
+                    pool.map(
+                        lambda name: read_bqstorage_stream(
+                            bqstorage_client, name, session
+                        ),
+                        stream_names,
+                    )
+                )
+        return pa.concat_tables(
+            [t for t in tables if t.num_rows] or [schema.empty_table()]
+        )
+    batches = []
+    rows_read = 0
+    for stream_name in stream_names:
+        reader = bqstorage_client.read_rows(stream_name)
+        for page in reader.rows(session).pages:
+            batch = page.to_arrow()
+            batches.append(batch)
+            rows_read += batch.num_rows
+            if max_results is not None and rows_read >= max_results:
+                break
+    table = pa.Table.from_batches(batches, schema=schema)
+    if max_results is not None:
+        table = table.slice(0, max_results)
+    return table
+
+
+def build_select_query(
+    table_id_full: str,
+    columns: Optional[List[str]] = None,
+    row_filter: Optional[str] = None,
+    sample_percent: Optional[float] = None,
+    max_results: Optional[int] = None,
+) -> str:
+    """
+    Builds a SELECT statement that projects and filters a BigQuery table.
+
+    Args:
+        table_id_full (str): The table ID in "project.dataset.table" format.
+        columns (List[str], optional): The columns to select. Defaults to
+        None (all columns).
+        row_filter (str, optional): A SQL boolean expression used to filter
+        rows. Defaults to None.
+        sample_percent (float, optional): The percentage of the table to
+        sample with TABLESAMPLE. Defaults to None.
+        max_results (int, optional): The maximum number of rows to return.
+        Defaults to None.
+
+    Returns:
+        str: The SQL query.
+    """
+    select = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+    query = f"SELECT {select} FROM `{table_id_full}`"
+    if sample_percent is not None:
+        query += f" TABLESAMPLE SYSTEM ({sample_percent} PERCENT)"
+    if row_filter:
+        query += f" WHERE {row_filter}"
+    if max_results is not None:
+        query += f" LIMIT {int(max_results)}"
+    return query
+
+
+def download_from_bigquery_as_dataframe(
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    secret_name: str,
+    use_bqstorage: bool = True,
+    columns: Optional[List[str]] = None,
+    row_filter: Optional[str] = None,
+    max_results: Optional[int] = None,
+    sample_percent: Optional[float] = None,
+    max_streams: int = 1,
+    executor: str = "thread",
+    dtype_backend: str = "numpy",
+    optimize_memory: bool = False,
+    output: str = "pandas",
+    staging_bucket_name: Optional[str] = None,
+    export_threshold_bytes: int = EXPORT_THRESHOLD_BYTES,
+    maximum_bytes_billed: Optional[int] = None,
+) -> Union[pd.DataFrame, "pa.Table", "pl.DataFrame", None]:
+    """
+    Download data from a BigQuery table to a pandas DataFrame.
+
+    This function downloads the rows of the specified BigQuery table to a
+    pandas DataFrame. The rows are read with the BigQuery Storage Read API
+    when it is available, and through the REST API otherwise. Selected
+    columns are pushed down as `selected_fields`. A row filter or sampling
+    is pushed down to the read session; without the Storage Read API they
+    are applied with an equivalent query instead, which is billed for the
+    bytes it scans. If `max_streams` is greater than one, the Storage Read
+    API session is split into several streams that are decoded in parallel
+    by a thread or process pool. If `staging_bucket_name` is given and the
+    whole table of at least `export_threshold_bytes` is requested, the table
+    is exported to Google Cloud Storage and read back with
+    `download_from_bigquery_via_export()` instead. The function logs a
+    message indicating whether the download succeeded or failed.
+
+    Args:
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The BigQuery dataset ID.
+        table_id (str): The BigQuery table ID.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        use_bqstorage (bool, optional): Whether to read with the BigQuery
+        Storage Read API. Defaults to True.
+        columns (List[str], optional): The columns to download. Defaults to
+        None (all columns).
+        row_filter (str, optional): A SQL boolean expression used to filter
+        rows, such as "created_at >= '2024-01-01'". Defaults to None.
+        max_results (int, optional): The maximum number of rows to download,
+        useful for previews. Defaults to None (all rows).
+        sample_percent (float, optional): The percentage of the table to
+        sample, useful for previews. Defaults to None (no sampling).
+        max_streams (int, optional): The maximum number of Storage Read API
+        streams to read in parallel. Defaults to 1.
+        executor (str, optional): "thread" or "process", the pool used to
+        decode parallel streams. Defaults to "thread".
+        dtype_backend (str, optional): "numpy" for the default dtypes,
+        "nullable" for pandas nullable dtypes, or "pyarrow" for Arrow-backed
+        dtypes. Defaults to "numpy".
+        optimize_memory (bool, optional): Whether to downcast INTEGER columns
+        and convert low-cardinality STRING columns to categoricals. See
+        `optimize_dataframe_memory`. Defaults to False.
+        output (str, optional): "pandas" for a pandas DataFrame, "arrow" for
+        a pyarrow Table or "polars" for a Polars DataFrame. Arrow and Polars
+        outputs skip the pandas conversion; `dtype_backend` and
+        `optimize_memory` only apply to pandas output. Defaults to "pandas".
+        staging_bucket_name (str, optional): The bucket used to export large
+        tables. Defaults to None (never export).
+        export_threshold_bytes (int, optional): The table size from which a
+        full-table download is exported. Defaults to 10 GiB.
+        maximum_bytes_billed (int, optional): The maximum number of bytes the
+        row filter query may bill when the Storage Read API is not
+        available. Defaults to None (no limit).
+
+    Returns:
+        Union[pd.DataFrame, pa.Table, pl.DataFrame, None]: The data
+        downloaded from BigQuery. If the authorization or download fails,
+        None is returned.
+
+    Raises:
+        ValueError: If `dtype_backend` or `output` is not supported.
+    """
+    get_dataframe_dtypes(dtype_backend)
+    validate_output(output)
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error("Download from BigQuery error with authorization error")
+        return None
+    client = bigquery.Client(credentials=credentials)
+    bqstorage_client = get_bqstorage_client(credentials) if use_bqstorage else None
+    table_id_full = f"{project_id}.{dataset_id}.{table_id}"
+    logger.info(f"Starting to download data from BigQuery table: {table_id_full}")
+    try:
+        schema = None
+        pushdown = row_filter or sample_percent is not None
+        full_table = not (pushdown or columns or max_results)
+        if staging_bucket_name and full_table:
+            bq_table = client.get_table(table_id_full)
+            if (bq_table.num_bytes or 0) >= export_threshold_bytes:
+                logger.info(
+                    f"Table {table_id_full} has {bq_table.num_bytes} bytes. "
+                    f"Downloading it via export."
+                )
+                df = download_from_bigquery_via_export(
+                    project_id,
+                    dataset_id,
+                    table_id,
+                    secret_name,
+                    staging_bucket_name,
+                    output=output,
+                    dtype_backend=dtype_backend,
+                )
+                if df is not None and optimize_memory and output == "pandas":
+                    df = optimize_dataframe_memory(df, bq_table.schema)
+                return df
+        if bqstorage_client and (pushdown or max_streams > 1):
+            table = read_table_with_bqstorage(
+                bqstorage_client,
+                client.project,
+                project_id,
+                dataset_id,
+                table_id,
+                columns=columns,
+                row_filter=row_filter,
+                sample_percent=sample_percent,
+                max_results=max_results,
+                max_streams=max_streams,
+                executor=executor,
+                secret_name=secret_name,
+            )
+            df = arrow_table_to_output(table, output, dtype_backend)
+            if optimize_memory and output == "pandas":
+                schema = client.get_table(table_id_full).schema
+        elif pushdown:
+            logger.warning(
+                "BigQuery Storage Read API not available. Applying row filter "
+                "with a query."
+            )
+            query = build_select_query(
+                table_id_full, columns, row_filter, sample_percent, max_results
+            )
+            rows = submit_query(client, query, maximum_bytes_billed).result()
+            schema = rows.schema
+            df = rows_to_output(rows, None, output, dtype_backend)
+        else:
+            selected_fields = None
+            if columns:
+                schema = {f.name: f for f in client.get_table(table_id_full).schema}
+                selected_fields = [schema[c] for c in columns]
+            rows = client.list_rows(
+                table_id_full, selected_fields=selected_fields, max_results=max_results
+            )
+            schema = rows.schema
+            df = rows_to_output(rows, bqstorage_client, output, dtype_backend)
+        if optimize_memory and output == "pandas":
+            df = optimize_dataframe_memory(df, schema)
+        logger.info(f"Downloaded data from BigQuery table: {table_id_full}")
+        return df
+    except Exception as e:
+        logger.exception(f"Download from BigQuery error: {str(e)}")
+        return None
+
+
+def download_from_bigquery_via_export(
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    secret_name: str,
+    staging_bucket_name: str,
+    staging_prefix: Optional[str] = None,
+    file_format: str = "PARQUET",
+    max_workers: int = 8,
+    output: str = "pandas",
+    dtype_backend: str = "numpy",
+) -> Union[pd.DataFrame, "pa.Table", "pl.DataFrame", None]:
+    """
+    Downloads a whole BigQuery table by exporting it to Google Cloud Storage.
+
+    This function runs an extract job that writes the table as sharded
+    Parquet or Avro files under a unique prefix in `staging_bucket_name`,
+    reads the shards back in parallel with
+    `download_shards_from_gcs_as_arrow()` and deletes them afterwards. Extract
+    jobs are free and BigQuery writes the shards in parallel, so for full
+    snapshots of large tables this is much faster than reading rows through
+    the API. The function logs a message indicating whether the download
+    succeeded or failed.
+
+    Args:
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The BigQuery dataset ID.
+        table_id (str): The BigQuery table ID.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        staging_bucket_name (str): The bucket to export the shards to.
+        staging_prefix (str, optional): The prefix to export the shards
+        under. Defaults to a unique prefix under "bigquery_export/".
+        file_format (str, optional): "PARQUET" or "AVRO". Defaults to
+        "PARQUET".
+        max_workers (int, optional): The maximum number of concurrent shard
+        downloads. Defaults to 8.
+        output (str, optional): "pandas", "arrow" or "polars". Defaults to
+        "pandas".
+        dtype_backend (str, optional): The pandas dtype backend, used for
+        "pandas" output. Defaults to "numpy".
+
+    Returns:
+        Union[pd.DataFrame, pa.Table, pl.DataFrame, None]: The rows of the
+        table. If the authorization, export or download fails, None is
+        returned.
+
+    Raises:
+        ValueError: If `file_format`, `output` or `dtype_backend` is not
+        supported.
+    """
+    validate_shard_format(file_format)
+    validate_output(output)
+    get_dataframe_dtypes(dtype_backend)
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error("Download from BigQuery error with authorization error")
+        return None
+    client = bigquery.Client(credentials=credentials)
+    table_id_full = f"{project_id}.{dataset_id}.{table_id}"
+    prefix = (staging_prefix or f"bigquery_export/{uuid.uuid4().hex}").rstrip("/")
+    extension = file_format.lower()
+    destination_uri = f"gs://{staging_bucket_name}/{prefix}/part-*.{extension}"
+    try:
+        stats = extract_table_to_gcs(
+            client, table_id_full, destination_uri, file_format, "SNAPPY"
+        )
+        logger.info(f"Exported {table_id_full} to {destination_uri}. Stats: {stats}")
+        table = download_shards_from_gcs_as_arrow(
+            staging_bucket_name,
+            f"{prefix}/",
+            secret_name,
+            file_format=file_format,
+            max_workers=max_workers,
+            pattern=f"part-*.{extension}",
+        )
+        if table is None:
+            raise RuntimeError("Download of exported shards failed")
+        logger.info(f"Downloaded data from BigQuery table: {table_id_full}")
+        return arrow_table_to_output(table, output, dtype_backend)
+    except Exception as e:
+        logger.exception(f"Download from BigQuery error: {str(e)}")
+        return None
+    finally:
+        delete_from_gcs(
+            staging_bucket_name,
+            f"{prefix}/",
+            secret_name,
+            pattern=f"part-*.{extension}",
+        )
+
+
+def format_watermark_literal(value: Any, field_type: str) -> str:
+    """
+    Formats a watermark value as a BigQuery SQL literal.
+
+    Args:
+        value (Any): The watermark value, as stored in a watermark store.
+        field_type (str): The BigQuery type of the watermark column.
+
+    Returns:
+        str: The SQL literal.
+    """
+    field_type = field_type.upper()
+    if field_type in ("TIMESTAMP", "DATETIME", "DATE"):
+        return f"{field_type} '{value}'"
+    if field_type in ("INTEGER", "INT64", "FLOAT", "FLOAT64", "NUMERIC", "BIGNUMERIC"):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def serialize_watermark(value: Any) -> Any:
+    """
+    Converts a watermark value read from a DataFrame to a JSON value.
+
+    Args:
+        value (Any): The watermark value, such as a pd.Timestamp or a numpy
+        integer.
+
+    Returns:
+        Any: The value as an ISO formatted string, a number or a string.
+    """
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+@contextlib.contextmanager
+def incremental_download_from_bigquery(
+    project_id: str,
+    dataset_id: str,
+    table_id: str,
+    secret_name: str,
+    watermark_column: str,
+    state_store: Any,
+    state_key: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    use_bqstorage: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """
+    Downloads the rows of a BigQuery table added since the last run.
+
+    This context manager reads the last high-water mark of
+    `watermark_column` from `state_store`, downloads only the rows above it
+    with the filter pushed down to BigQuery, and yields them as a pandas
+    DataFrame. The watermark is advanced to the largest value downloaded
+    only when the `with` block exits without an exception, so a failed
+    consumer reprocesses the same rows on the next run. On the first run
+    the whole table is downloaded. Rows that arrive later with a watermark
+    equal to or lower than the stored one are not picked up, so the column
+    should increase monotonically, such as an ingestion timestamp.
+
+    Example:
+        store = JsonWatermarkStore("state/watermarks.json")
+        with incremental_download_from_bigquery(
+            "project", "dataset", "events", "SECRET", "ingested_at", store
+        ) as df:
+            process(df)
+
+    Args:
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The BigQuery dataset ID.
+        table_id (str): The BigQuery table ID.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        watermark_column (str): The column to track, such as a TIMESTAMP or
+        an increasing INTEGER ID.
+        state_store (Any): An object with `get(key)` and `set(key, value)`
+        methods, such as `JsonWatermarkStore` or `SqliteWatermarkStore`.
+        state_key (str, optional): The key of the watermark in the store.
+        Defaults to "<project>.<dataset>.<table>.<watermark_column>".
+        columns (List[str], optional): The columns to download. The
+        watermark column is always included. Defaults to None (all columns).
+        use_bqstorage (bool, optional): Whether to read with the BigQuery
+        Storage Read API. Defaults to True.
+
+    Yields:
+        pd.DataFrame: The rows above the stored watermark.
+
+    Raises:
+        ValueError: If the watermark column is not in the table schema.
+        RuntimeError: If the schema or the rows could not be downloaded.
+    """
+    logger = logging.getLogger("primary_logger")
+    state_key = state_key or f"{project_id}.{dataset_id}.{table_id}.{watermark_column}"
+    previous = state_store.get(state_key)
+    row_filter = None
+    if previous is not None:
+        schema_json = get_schema_from_bigquery(
+            project_id, dataset_id, table_id, secret_name, cache_ttl=300
+        )
+        if schema_json is None:
+            raise RuntimeError("Get schema from BigQuery failed")
+        field_types = {field["name"]: field["type"] for field in schema_json}
+        if watermark_column not in field_types:
+            raise ValueError(f"Column {watermark_column} not found in {table_id}")
+        literal = format_watermark_literal(previous, field_types[watermark_column])
+        row_filter = f"`{watermark_column}` > {literal}"
+    if columns is not None and watermark_column not in columns:
+        columns = columns + [watermark_column]
+    logger.info(f"Downloading rows of {table_id} above watermark {previous}")
+    df = download_from_bigquery_as_dataframe(
+        project_id,
+        dataset_id,
+        table_id,
+        secret_name,
+        use_bqstorage=use_bqstorage,
+        columns=columns,
+        row_filter=row_filter,
+    )
+    if df is None:
+        raise RuntimeError("Incremental download from BigQuery failed")
+    yield df
+    if len(df) and df[watermark_column].notna().any():
+        watermark = serialize_watermark(df[watermark_column].max())
+        state_store.set(state_key, watermark)
+        logger.info(f"Advanced watermark {state_key} to {watermark}")
+
+
+class QueryResultCache:
+    """
+    A local, size-bounded cache of query results stored as Parquet files.
+
+    Results are keyed by the normalized SQL and the last modified times of
+    the tables the query references, so a cached result is not used once
+    any of those tables changes. Entries expire after `ttl_seconds`, and
+    the least recently used entries are evicted once the cache grows past
+    `max_bytes`. Queries with non-deterministic results, such as those
+    using CURRENT_TIMESTAMP() or RAND(), should not be cached.
+
+    Args:
+        cache_dir (str): The directory to store the cached results in.
+        ttl_seconds (float): The number of seconds a result stays valid.
+        Defaults to 3600.
+        max_bytes (int): The maximum total size of the cached results.
+        Defaults to 1 GiB.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: float = 3600,
+        max_bytes: int = 1024**3,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Normalizes whitespace and trailing semicolons outside of literals.
+
+        Args:
+            query (str): The SQL query.
+
+        Returns:
+            str: The normalized SQL query.
+        """
+        parts = re.split(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""", query)
+        normalized = "".join(
+            part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts)
+        )
+        return normalized.strip().rstrip(";").strip()
+
+    def make_key(
+        self,
+        query: str,
+        table_versions: Dict[str, str],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Builds the cache key of a query.
+
+        Args:
+            query (str): The SQL query.
+            table_versions (Dict[str, str]): The last modified time of each
+            table referenced by the query.
+            options (Dict[str, Any], optional): The settings that change the
+            shape of the result, such as the dtype backend. Defaults to None.
+
+        Returns:
+            str: The cache key.
+        """
+        payload = json.dumps(
+            {
+                "query": self.normalize_query(query),
+                "tables": table_versions,
+                "options": options or {},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Returns the cached result for a key, or None on a miss.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            pd.DataFrame or None: The cached result, or None if there is no
+            valid entry.
+        """
+        path = os.path.join(self.cache_dir, f"{key}.parquet")
+        with self.lock:
+            try:
+                modified = os.path.getmtime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            if time.time() - modified > self.ttl_seconds:
+                os.remove(path)
+                self.misses += 1
+                return None
+            # The access time tracks recency for eviction, the modified
+            # time tracks age for the TTL.
+            os.utime(path, (time.time(), modified))
+            self.hits += 1
+        return pd.read_parquet(path)
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        """
+        Stores a result in the cache and evicts entries over the size limit.
+
+        Args:
+            key (str): The cache key.
+            df (pd.DataFrame): The query result.
+        """
+        path = os.path.join(self.cache_dir, f"{key}.parquet")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes expired entries and the least recently used entries until
+        the cache fits in `max_bytes`.
+        """
+        with self.lock:
+            entries = []
+            now = time.time()
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".parquet"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    os.remove(path)
+                    self.evictions += 1
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit, miss and eviction counts and the cache size.
+        """
+        sizes = [
+            os.path.getsize(os.path.join(self.cache_dir, name))
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".parquet")
+        ]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+        }
+
+
+def run_dry_run_job(client: bigquery.Client, query: str) -> Any:
+    """
+    Runs a dry run of a query, which is free and does not use slots.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        query (str): The SQL query.
+
+    Returns:
+        QueryJob: The dry run job, with `total_bytes_processed` and
+        `referenced_tables` set.
+    """
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+    return client.query(query, job_config=job_config)
+
+
+def dry_run_query(query: str, secret_name: str) -> Union[Dict[str, Any], None]:
+    """
+    Estimates the cost of a SQL query without running it.
+
+    This function runs a dry run of the query, which is free and does not
+    use slots, and returns the number of bytes the query would process and
+    the tables it references. On-demand pricing bills the bytes processed,
+    so the estimate can be checked before running an expensive query.
+
+    Args:
+        query (str): The SQL query to estimate.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+
+    Returns:
+        Union[Dict[str, Any], None]: A dictionary with the estimated
+        "total_bytes_processed" and the "referenced_tables" in
+        "project.dataset.table" format. If the authorization or the dry run
+        fails, for example because of a syntax error, None is returned.
+    """
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error("Dry run query error with authorization error")
+        return None
+    client = bigquery.Client(credentials=credentials)
+    try:
+        dry_run_job = run_dry_run_job(client, query)
+    except Exception as e:
+        logger.exception(f"Dry run query error: {str(e)}")
+        return None
+    estimate = {
+        "total_bytes_processed": dry_run_job.total_bytes_processed,
+        "referenced_tables": [
+            f"{table.project}.{table.dataset_id}.{table.table_id}"
+            for table in dry_run_job.referenced_tables
+        ],
+    }
+    logger.info(f"Dry run query estimate: {estimate}")
+    return estimate
+
+
+def submit_query(
+    client: bigquery.Client, query: str, maximum_bytes_billed: Optional[int] = None
+) -> Any:
+    """
+    Starts a query job, optionally capped by the bytes it may bill.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        query (str): The SQL query.
+        maximum_bytes_billed (int, optional): The maximum number of bytes the
+        job may bill. BigQuery fails the job without charge if the query
+        would bill more. Defaults to None (no limit).
+
+    Returns:
+        QueryJob: The started query job.
+    """
+    if maximum_bytes_billed is None:
+        return client.query(query)
+    job_config = bigquery.QueryJobConfig(maximum_bytes_billed=maximum_bytes_billed)
+    return client.query(query, job_config=job_config)
+
+
+def get_referenced_table_versions(
+    client: bigquery.Client, query: str
+) -> Dict[str, str]:
+    """
+    Returns the last modified time of each table referenced by a query.
+
+    This function runs a dry run of the query, which is free and does not
+    use slots, to find the referenced tables, and then fetches each
+    table's metadata.
+
+    Args:
+        client (bigquery.Client): The BigQuery client.
+        query (str): The SQL query.
+
+    Returns:
+        Dict[str, str]: The last modified time of each referenced table, in
+        ISO format, keyed by the table ID in "project.dataset.table" format.
+    """
+    dry_run_job = run_dry_run_job(client, query)
+    versions = {}
+    for table_ref in dry_run_job.referenced_tables:
+        table = client.get_table(table_ref)
+        table_id_full = f"{table.project}.{table.dataset_id}.{table.table_id}"
+        versions[table_id_full] = table.modified.isoformat()
+    return versions
 
 
 def query_bigquery_as_dataframe(
-    query: str, secrete_name: str
-) -> Union[pd.DataFrame, None]:
+    query: str,
+    secrete_name: str,
+    use_bqstorage: bool = True,
+    cache: Optional[QueryResultCache] = None,
+    maximum_bytes_billed: Optional[int] = None,
+    dtype_backend: str = "numpy",
+    optimize_memory: bool = False,
+    output: str = "pandas",
+) -> Union[pd.DataFrame, "pa.Table", "pl.DataFrame", None]:
     """
     Executes a SQL query on a BigQuery dataset and returns the results as
     a pandas DataFrame.
 
     This function executes a SQL query on a BigQuery dataset and returns
-    the results as a pandas DataFrame. The function logs a message indicating
-    the query that was executed, and logs a message indicating the number of
-    rows that were returned by the query.
+    the results as a pandas DataFrame. The results are read with the
+    BigQuery Storage Read API when it is available, and through the REST
+    API otherwise. If a `QueryResultCache` is provided, a valid cached
+    result is returned without running the query job; only a free dry run
+    is made to check the referenced tables' last modified times. The
+    function logs the bytes processed, slot time and cache hit status of
+    the query job.
 
     Args:
         query (str): The SQL query to execute.
         secrete_name (str): The name of the environment variable used for
         Google Cloud authentication.
+        use_bqstorage (bool, optional): Whether to read the results with the
+        BigQuery Storage Read API. Defaults to True.
+        cache (QueryResultCache, optional): The local cache to read results
+        from and store results in. Defaults to None (no caching).
+        maximum_bytes_billed (int, optional): The maximum number of bytes the
+        query may bill. The query fails without charge if it would bill
+        more. Defaults to None (no limit).
+        dtype_backend (str, optional): "numpy" for the default dtypes,
+        "nullable" for pandas nullable dtypes, or "pyarrow" for Arrow-backed
+        dtypes. Defaults to "numpy".
+        optimize_memory (bool, optional): Whether to downcast INTEGER columns
+        and convert low-cardinality STRING columns to categoricals. See
+        `optimize_dataframe_memory`. Defaults to False.
+        output (str, optional): "pandas" for a pandas DataFrame, "arrow" for
+        a pyarrow Table or "polars" for a Polars DataFrame. Arrow and Polars
+        outputs skip the pandas conversion; `dtype_backend`,
+        `optimize_memory` and `cache` only apply to pandas output. Defaults
+        to "pandas".
 
     Returns:
-        Union[pd.DataFrame, None]: A pandas DataFrame containing the results
-        of the query. If the authorization or query fails, None is returned.
+        Union[pd.DataFrame, pa.Table, pl.DataFrame, None]: The results of
+        the query. If the authorization or query fails, None is returned.
+
+    Raises:
+        ValueError: If `dtype_backend` or `output` is not supported, or if a
+        cache is used with a non-pandas output.
     """
+    get_dataframe_dtypes(dtype_backend)
+    validate_output(output)
+    if cache is not None and output != "pandas":
+        raise ValueError("The query result cache only supports pandas output")
     logger = logging.getLogger("primary_logger")
     credentials = get_google_credentials(secrete_name)
     if credentials is None:
         logger.error("Query BigQuery error with authorization error")
         return None
     client = bigquery.Client(credentials=credentials)
+    bqstorage_client = get_bqstorage_client(credentials) if use_bqstorage else None
     try:
-        query_job = client.query(query)
+        if cache is not None:
+            key = cache.make_key(
+                query,
+                get_referenced_table_versions(client, query),
+                {"dtype_backend": dtype_backend, "optimize_memory": optimize_memory},
+            )
+            df = cache.get(key)
+            if df is not None:
+                logger.info(f"Query cache hit. Cache stats: {cache.stats}")
+                return df
+        query_job = submit_query(client, query, maximum_bytes_billed)
         results = query_job.result()
-        logger.info(f"Executed query.")
-        return results.to_dataframe()
+        logger.info(f"Executed query. Stats: {get_query_job_stats(query_job)}")
+        df = rows_to_output(results, bqstorage_client, output, dtype_backend)
+        if optimize_memory and output == "pandas":
+            df = optimize_dataframe_memory(df, results.schema)
+        if cache is not None:
+            try:
+                cache.put(key, df)
+            except Exception as e:
+                logger.warning(f"Store query result in cache error: {str(e)}")
+        return df
     except Exception as e:
         logger.exception(f"Query BigQuery error: {str(e)}")
         return None
+
+
+def get_query_job_stats(query_job: Any) -> Dict[str, Any]:
+    """
+    Returns the cost and performance statistics of a finished query job.
+
+    Args:
+        query_job (QueryJob): The finished query job.
+
+    Returns:
+        Dict[str, Any]: The job ID, the bytes processed and billed, the slot
+        milliseconds, whether the result came from the query cache, and the
+        elapsed seconds between the job's start and end.
+    """
+    return {
+        "job_id": query_job.job_id,
+        "total_bytes_processed": query_job.total_bytes_processed,
+        "total_bytes_billed": query_job.total_bytes_billed,
+        "slot_millis": query_job.slot_millis,
+        "cache_hit": query_job.cache_hit,
+        "elapsed_seconds": get_job_timing(query_job),
+    }
+
+
+def run_queries(
+    queries: Union[Dict[str, str], List[str]],
+    secret_name: str,
+    max_concurrent: int = 10,
+    use_bqstorage: bool = True,
+    poll_interval: float = 0.5,
+    maximum_bytes_billed: Optional[int] = None,
+) -> Union[Dict[Any, Dict[str, Any]], None]:
+    """
+    Runs independent SQL queries concurrently and returns their results.
+
+    This function shares one BigQuery client between all queries. Up to
+    `max_concurrent` query jobs run at the same time; the jobs are polled
+    together and, as each finishes, its results are fetched in a worker
+    thread while the remaining jobs keep running and the next queued query
+    is submitted. The total time is therefore close to the slowest query
+    rather than the sum of all queries. A failing query does not stop the
+    others; its DataFrame is None and the error is recorded in its stats.
+
+    Args:
+        queries (Union[Dict[str, str], List[str]]): The SQL queries, keyed by
+        name. If a list is given, the results are keyed by position.
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        max_concurrent (int, optional): The maximum number of query jobs
+        running, and of results being fetched, at the same time. Defaults
+        to 10.
+        use_bqstorage (bool, optional): Whether to read the results with the
+        BigQuery Storage Read API. Defaults to True.
+        poll_interval (float, optional): The number of seconds between polls
+        of the running jobs. Defaults to 0.5.
+        maximum_bytes_billed (int, optional): The maximum number of bytes
+        each query may bill. Defaults to None (no limit).
+
+    Returns:
+        Union[Dict[Any, Dict[str, Any]], None]: For each query, a dictionary
+        with the "dataframe" and the job "stats" (see
+        `get_query_job_stats`, plus "error" if the query failed). If the
+        authorization fails, None is returned.
+    """
+    logger = logging.getLogger("primary_logger")
+    if isinstance(queries, list):
+        queries = dict(enumerate(queries))
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error("Run queries error with authorization error")
+        return None
+    client = bigquery.Client(credentials=credentials)
+    bqstorage_client = get_bqstorage_client(credentials) if use_bqstorage else None
+
+    def fetch(query_job):
+        df = rows_to_dataframe(query_job.result(), bqstorage_client)
+        return df, get_query_job_stats(query_job)
+
+    results = {}
+    queued = list(queries.items())
+    running = {}
+    fetching = {}
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as executor:
+        while queued or running or fetching:
+            while queued and len(running) + len(fetching) < max_concurrent:
+                name, query = queued.pop(0)
+                try:
+                    running[name] = submit_query(client, query, maximum_bytes_billed)
+                except Exception as e:
+                    logger.exception(f"Submit query {name} error: {str(e)}")
+                    results[name] = {"dataframe": None, "stats": {"error": str(e)}}
+            for name, query_job in list(running.items()):
+                # A failed poll is surfaced by result() in the fetch below.
+                try:
+                    if not query_job.done():
+                        continue
+                except Exception:
+                    pass
+                del running[name]
+                fetching[executor.submit(fetch, query_job)] = name
+            for future in [future for future in fetching if future.done()]:
+                name = fetching.pop(future)
+                try:
+                    df, stats = future.result()
+                    results[name] = {"dataframe": df, "stats": stats}
+                    logger.info(f"Query {name} finished. Stats: {stats}")
+                except Exception as e:
+                    logger.exception(f"Query {name} error: {str(e)}")
+                    results[name] = {"dataframe": None, "stats": {"error": str(e)}}
+            if running or fetching:
+                time.sleep(poll_interval)
+    logger.info(
+        f"Ran {len(queries)} queries in {time.time() - start:.1f} seconds, "
+        f"{sum(r['dataframe'] is None for r in results.values())} failed."
+    )
+    return {name: results[name] for name in queries}
+
+
+def prefetch_iterator(iterable: Iterable, max_prefetch: int = 2) -> Iterator:
+    """
+    Iterates over an iterable in a background thread.
+
+    This function consumes the iterable in a background thread and keeps up
+    to `max_prefetch` items queued, so fetching the next item overlaps with
+    the caller processing the current one while memory stays bounded.
+    Exceptions raised by the iterable are re-raised in the caller. If the
+    caller stops iterating early, the background thread is stopped.
+
+    Args:
+        iterable (Iterable): The iterable to consume.
+        max_prefetch (int): The maximum number of items fetched ahead.
+        Defaults to 2.
+
+    Yields:
+        The items of the iterable, in order.
+    """
+    items = queue.Queue(maxsize=max(1, max_prefetch))
+    stop = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        items.put((item, None), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            items.put((done, None))
+        except Exception as e:
+            items.put((done, e))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        while thread.is_alive():
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                thread.join(timeout=0.1)
+
+
+def rebatch_record_batches(
+    batches: Iterable["pa.RecordBatch"], batch_size: int
+) -> Iterator["pa.RecordBatch"]:
+    """
+    Regroups Arrow record batches into batches of `batch_size` rows.
+
+    Args:
+        batches (Iterable[pa.RecordBatch]): The record batches to regroup.
+        batch_size (int): The number of rows per output batch. The last
+        batch may be smaller.
+
+    Yields:
+        pa.RecordBatch: Record batches of `batch_size` rows.
+    """
+    pending = []
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= batch_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, batch_size).combine_chunks().to_batches()[0]
+            pending = table.slice(batch_size).to_batches()
+            pending_rows -= batch_size
+    if pending_rows:
+        yield pa.Table.from_batches(pending).combine_chunks().to_batches()[0]
+
+
+def iter_bigquery_batches(
+    secret_name: str,
+    query: Optional[str] = None,
+    project_id: Optional[str] = None,
+    dataset_id: Optional[str] = None,
+    table_id: Optional[str] = None,
+    batch_size: int = 100_000,
+    output: str = "pandas",
+    max_prefetch: int = 2,
+    use_bqstorage: bool = True,
+    maximum_bytes_billed: Optional[int] = None,
+) -> Iterator[Union[pd.DataFrame, "pa.RecordBatch", "pl.DataFrame"]]:
+    """
+    Iterates over the results of a BigQuery query or table in batches.
+
+    This function reads the results of `query`, or the rows of the table
+    given by `project_id`, `dataset_id` and `table_id`, and yields them in
+    batches of `batch_size` rows instead of materializing one DataFrame.
+    The next batches are fetched in a background thread while the caller
+    processes the current one, so peak memory is bounded by roughly
+    `max_prefetch + 2` batches. The rows are read with the BigQuery Storage
+    Read API when it is available, and through the REST API otherwise.
+
+    Args:
+        secret_name (str): The name of the environment variable used for
+        Google Cloud authentication.
+        query (str, optional): The SQL query to execute.
+        project_id (str, optional): The Google Cloud project ID of the table.
+        dataset_id (str, optional): The BigQuery dataset ID of the table.
+        table_id (str, optional): The BigQuery table ID of the table.
+        batch_size (int): The number of rows per batch. Defaults to 100000.
+        output (str): "pandas" to yield DataFrames, "arrow" to yield
+        pyarrow RecordBatches or "polars" to yield Polars DataFrames.
+        Defaults to "pandas".
+        max_prefetch (int): The number of pages fetched ahead in the
+        background. Defaults to 2.
+        use_bqstorage (bool): Whether to read with the BigQuery Storage Read
+        API. Defaults to True.
+        maximum_bytes_billed (int, optional): The maximum number of bytes the
+        query may bill. Defaults to None (no limit).
+
+    Yields:
+        pd.DataFrame, pa.RecordBatch or pl.DataFrame: The next batch of rows.
+
+    Raises:
+        ValueError: If neither or both of a query and a table are given, if
+        `output` is not supported, or if Google Cloud credentials are
+        invalid or absent.
+        Any exception raised while reading is re-raised after being logged.
+    """
+    if (query is None) == (table_id is None):
+        raise ValueError("Provide either a query or a table, but not both")
+    validate_output(output)
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error("Iterate BigQuery batches error with authorization error")
+        raise ValueError("Invalid Google Cloud credentials")
+    client = bigquery.Client(credentials=credentials)
+    bqstorage_client = get_bqstorage_client(credentials) if use_bqstorage else None
+    try:
+        if query is not None:
+            query_job = submit_query(client, query, maximum_bytes_billed)
+            rows = query_job.result(page_size=batch_size)
+            logger.info(f"Executed query. Stats: {get_query_job_stats(query_job)}")
+        else:
+            table_id_full = f"{project_id}.{dataset_id}.{table_id}"
+            rows = client.list_rows(table_id_full, page_size=batch_size)
+        record_batches = rows.to_arrow_iterable(bqstorage_client=bqstorage_client)
+        batches = rebatch_record_batches(
+            prefetch_iterator(record_batches, max_prefetch), batch_size
+        )
+        rows_read = 0
+        for batch in batches:
+            rows_read += batch.num_rows
+            if output == "pandas":
+                yield batch.to_pandas()
+            elif output == "polars":
+                yield pl.from_arrow(batch)
+            else:
+                yield batch
+        logger.info(f"Read {rows_read} rows from BigQuery in batches.")
+    except Exception as e:
+        logger.exception(f"Iterate BigQuery batches error: {str(e)}")
+        raise
@@ -1,8 +1,15 @@
 import logging
+import json
 import requests
+from requests.adapters import HTTPAdapter
 import time
-from typing import List, Dict, Any, Optional, Union
-from cru_dse_utils import get_general_credentials
+import datetime
+import threading
+import pandas as pd
+from typing import List, Dict, Any, Optional, Tuple, Union
+from cru_dse_utils import get_general_credentials, upload_dataframe_to_bigquery
+
+DBT_CLOUD_API_BASE_URL = "https://cloud.getdbt.com/api/v2"
 
 
 def get_dbt_job_list(account_id: str, secret_name: str) -> None:
@@ -31,7 +38,7 @@ def get_dbt_job_list(account_id: str, secret_name: str) -> None:
         "Authorization": f"Token {token}",
         "Content-Type": "application/json",
     }
-    url = f"https://cloud.getdbt.com/api/v2/accounts/{account_id}/jobs/"
+    url = f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/jobs/"
     try:
         r = requests.get(url, headers=headers)
         r.raise_for_status()
@@ -63,7 +70,7 @@ def trigger_dbt_job(account_id: str, job_id: str, token: str) -> Union[str, None
         "Authorization": f"Token {token}",
         "Content-Type": "application/json",
     }
-    url = f"https://cloud.getdbt.com/api/v2/accounts/{account_id}/jobs/{job_id}/run/"
+    url = f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/jobs/{job_id}/run/"
     json = {"cause": "Triggered by python script API request"}
     try:
         r = requests.post(url, headers=headers, json=json)
@@ -76,7 +83,7 @@ def trigger_dbt_job(account_id: str, job_id: str, token: str) -> Union[str, None
         return None
 
 
-def get_dbt_run_status(run_id: str, token: str) -> int:
+def get_dbt_run_status(run_id: str, token: str, account_id: str) -> int:
     """
     Retrieves the status of a dbt job run.
 
@@ -89,6 +96,7 @@ def get_dbt_run_status(run_id: str, token: str) -> int:
     Args:
         run_id (str): The id of the dbt job run.
         token (str): The dbt Cloud API token.
+        account_id (str): The ID of the account in dbt Cloud.
 
     Returns:
         int: The status of the dbt job run.
@@ -99,7 +107,7 @@ def get_dbt_run_status(run_id: str, token: str) -> int:
         "Authorization": f"Token {token}",
         "Content-Type": "application/json",
     }
-    url = f"https://cloud.getdbt.com/api/v2/accounts/10206/runs/{run_id}/"
+    url = f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/runs/{run_id}/"
     try:
         r = requests.get(url, headers=headers)
         r.raise_for_status()
@@ -110,73 +118,1098 @@ def get_dbt_run_status(run_id: str, token: str) -> int:
     return status
 
 
+def get_dbt_session(token: str, pool_maxsize: int = 10) -> requests.Session:
+    """
+    Creates a requests Session for the dbt Cloud API.
+
+    The session keeps connections to dbt Cloud open between requests, so
+    repeated status checks do not pay for a new TLS handshake each time.
+
+    Args:
+        token (str): The dbt Cloud API token.
+        pool_maxsize (int): The maximum number of pooled connections.
+        Default is 10.
+
+    Returns:
+        requests.Session: The session, with the authorization headers set.
+    """
+    session = requests.Session()
+    session.headers.update(
+        {
+            "Authorization": f"Token {token}",
+            "Content-Type": "application/json",
+        }
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_dbt_run_statuses(
+    account_id: str,
+    token: str,
+    run_ids: Optional[List[str]] = None,
+    status: Optional[List[int]] = None,
+    session: Optional[requests.Session] = None,
+    page_size: int = 100,
+) -> Dict[str, int]:
+    """
+    Retrieves the status of many dbt job runs with one paginated listing.
+
+    This function lists the runs of the account, newest first, instead of
+    sending one request per run, so checking N concurrent runs costs one
+    request per page of up to `page_size` runs. The listing stops as soon as
+    all `run_ids` have been found. The function logs a message if the status
+    check failed.
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        token (str): The dbt Cloud API token.
+        run_ids (List[str], optional): The ids of the runs to check. Default
+        is None (the most recent page of runs).
+        status (List[int], optional): Only return runs with these statuses,
+        such as [1, 2, 3] for unfinished runs. Default is None (all).
+        session (requests.Session, optional): The session to send the
+        requests with. Default is None (a new pooled session).
+        page_size (int): The number of runs per page, at most 100. Default
+        is 100.
+
+    Returns:
+        Dict[str, int]: The status of each run keyed by run id as a string.
+        Runs that were not found are missing. Empty if the request failed.
+    """
+    logger = logging.getLogger("primary_logger")
+    session = session or get_dbt_session(token)
+    url = f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/runs/"
+    wanted = {str(run_id) for run_id in run_ids} if run_ids is not None else None
+    oldest = min(int(run_id) for run_id in wanted) if wanted else None
+    params = {"order_by": "-id", "limit": page_size, "offset": 0}
+    if status:
+        params["status__in"] = json.dumps(list(status))
+    statuses = {}
+    try:
+        while True:
+            r = session.get(url, params=params)
+            r.raise_for_status()
+            runs = r.json()["data"]
+            for run in runs:
+                if wanted is None or str(run["id"]) in wanted:
+                    statuses[str(run["id"])] = run["status"]
+            if wanted is None or not runs or wanted <= set(statuses):
+                break
+            if oldest is not None and int(runs[-1]["id"]) <= oldest:
+                break
+            params["offset"] += page_size
+    except Exception as e:
+        logger.exception(f"dbt job statuses check failed: {e}")
+        return {}
+    return statuses
+
+
+def rerun_dbt_job(account_id: str, job_id: str, token: str) -> Union[str, None]:
+    """
+    Reruns a failed dbt job from the point of failure.
+
+    This function calls the dbt Cloud rerun endpoint, which starts a new
+    run of the job's last failed run that skips the steps and models that
+    already succeeded. The function logs a message indicating whether the
+    rerun started, and returns the id of the new run.
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        job_id (str): The ID of the dbt job to be rerun.
+        token (str): The dbt Cloud API token.
+
+    Returns:
+        str: The run_id of the new dbt job run.
+        None: If the rerun failed to start, for example because the
+        endpoint is not available for the account.
+    """
+    logger = logging.getLogger("primary_logger")
+    headers = {
+        "Authorization": f"Token {token}",
+        "Content-Type": "application/json",
+    }
+    url = f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/jobs/{job_id}/rerun/"
+    try:
+        r = requests.post(url, headers=headers)
+        r.raise_for_status()
+        logger.info(f"dbt job rerun from failure started successfully.")
+        return r.json()["data"]["id"]
+    except Exception as e:
+        logger.warning(f"dbt job rerun from failure failed to start: {str(e)}")
+        return None
+
+
+def get_dbt_run_steps(account_id: str, run_id: str, token: str) -> List[Dict[str, Any]]:
+    """
+    Retrieves the steps of a dbt job run, such as "dbt build".
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        run_id (str): The id of the dbt job run.
+        token (str): The dbt Cloud API token.
+
+    Returns:
+        List[Dict[str, Any]]: The run steps, each with its "name" and
+        "status". Empty if the request failed.
+    """
+    logger = logging.getLogger("primary_logger")
+    headers = {
+        "Authorization": f"Token {token}",
+        "Content-Type": "application/json",
+    }
+    url = f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/runs/{run_id}/"
+    try:
+        r = requests.get(
+            url, headers=headers, params={"include_related": '["run_steps"]'}
+        )
+        r.raise_for_status()
+        return r.json()["data"].get("run_steps") or []
+    except Exception as e:
+        logger.warning(f"dbt run steps check failed: {e}")
+        return []
+
+
+DBT_RUN_STATUSES = {
+    0: "Status not available",
+    1: "Queued",
+    2: "Starting",
+    3: "Running",
+    10: "Success",
+    20: "Failed",
+    30: "Cancelled",
+}
+
+
+def get_dbt_job_average_duration(
+    account_id: str, job_id: str, token: str, limit: int = 10
+) -> Optional[float]:
+    """
+    Returns the average duration of the recent successful runs of a dbt job.
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        job_id (str): The ID of the dbt job.
+        token (str): The dbt Cloud API token.
+        limit (int): The number of recent successful runs to average.
+        Default is 10.
+
+    Returns:
+        float: The average duration in seconds.
+        None: If the job has no successful runs or the request failed.
+    """
+    logger = logging.getLogger("primary_logger")
+    headers = {
+        "Authorization": f"Token {token}",
+        "Content-Type": "application/json",
+    }
+    url = f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/runs/"
+    params = {
+        "job_definition_id": job_id,
+        "status": 10,
+        "order_by": "-id",
+        "limit": limit,
+    }
+    try:
+        r = requests.get(url, headers=headers, params=params)
+        r.raise_for_status()
+        durations = []
+        for run in r.json()["data"]:
+            if run.get("started_at") and run.get("finished_at"):
+                started = datetime.datetime.fromisoformat(run["started_at"])
+                finished = datetime.datetime.fromisoformat(run["finished_at"])
+                durations.append((finished - started).total_seconds())
+    except Exception as e:
+        logger.warning(f"dbt job run history check failed: {e}")
+        return None
+    if not durations:
+        return None
+    return sum(durations) / len(durations)
+
+
+def get_next_poll_interval(
+    status: int,
+    elapsed_seconds: float,
+    expected_seconds: Optional[float] = None,
+    min_interval: float = 5.0,
+    max_interval: float = 60.0,
+) -> float:
+    """
+    Returns how long to wait before polling a dbt job run again.
+
+    While the run is queued or starting, or when its typical duration is
+    unknown, the interval grows with the elapsed time, so short runs are
+    noticed quickly and long runs are not polled needlessly often. While a
+    run with a known typical duration is running, the interval is a quarter
+    of the expected remaining time, so polling speeds up as the run nears
+    its usual end.
+
+    Args:
+        status (int): The current status of the run.
+        elapsed_seconds (float): The seconds since the run was triggered.
+        expected_seconds (float, optional): The typical duration of the job.
+        min_interval (float): The shortest interval in seconds. Default is 5.
+        max_interval (float): The longest interval in seconds. Default is 60.
+
+    Returns:
+        float: The interval in seconds.
+    """
+    if status == 3 and expected_seconds:
+        remaining = expected_seconds - elapsed_seconds
+        interval = remaining / 4 if remaining > 0 else elapsed_seconds / 20
+    else:
+        interval = elapsed_seconds / 10
+    return max(min_interval, min(max_interval, interval))
+
+
+class DbtRunHandle:
+    """
+    Tracks a dbt job run that is triggered and polled in a background thread.
+
+    The handle is returned by `dbt_run_async()`. The background thread
+    triggers the job, polls its status with adaptive intervals (see
+    `get_next_poll_interval()`), and retries failed runs up to
+    `max_retries` times, like `dbt_run()`. A failed run is retried from the
+    point of failure with `rerun_dbt_job()`, skipping the steps and models
+    that already succeeded, and falls back to a full trigger if the rerun
+    cannot start. The calling thread can do other work and check `done()`,
+    block with `wait()`, or `cancel()` the run.
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        job_id (str): The ID of the dbt job to be triggered.
+        token (str): The dbt Cloud API token.
+        max_retries (int): Maximum number of retries if the job fails.
+        Default is 3.
+        min_poll_interval (float): The shortest interval between status
+        checks, in seconds. Default is 5.
+        max_poll_interval (float): The longest interval between status
+        checks, in seconds. Default is 60.
+        rerun_from_failure (bool): Whether to retry failed runs from the
+        point of failure instead of re-running the whole job. Default is
+        True.
+    """
+
+    def __init__(
+        self,
+        account_id: str,
+        job_id: str,
+        token: str,
+        max_retries: int = 3,
+        min_poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        rerun_from_failure: bool = True,
+    ):
+        self.account_id = account_id
+        self.job_id = job_id
+        self.token = token
+        self.max_retries = max_retries
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.rerun_from_failure = rerun_from_failure
+        self.run_id = None
+        self.status = None
+        self.finished = threading.Event()
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> "DbtRunHandle":
+        """
+        Starts the background thread and returns the handle.
+        """
+        self.thread.start()
+        return self
+
+    def run(self) -> None:
+        """
+        Triggers the job and polls it until it succeeds, is cancelled, or
+        fails after all retries. Runs in the background thread.
+        """
+        logger = logging.getLogger("primary_logger")
+        try:
+            self.poll_until_finished(logger)
+        except Exception as e:
+            logger.exception(f"dbt job run error: {str(e)}")
+        finally:
+            self.finished.set()
+
+    def poll_until_finished(self, logger: logging.Logger) -> None:
+        """
+        Runs the trigger, poll and retry loop of the background thread.
+
+        Args:
+            logger (logging.Logger): The logger for status messages.
+        """
+        expected_seconds = None
+        failed_run_id = None
+        retries = 0
+        while retries <= self.max_retries and not self.cancelled.is_set():
+            run_id = None
+            if failed_run_id is not None:
+                run_id = self.rerun_failed_run(failed_run_id, logger)
+                failed_run_id = None
+            if run_id is None:
+                run_id = trigger_dbt_job(self.account_id, self.job_id, self.token)
+            if run_id is None:
+                logger.error(
+                    f"dbt run failed to start. Retry {retries + 1} of "
+                    f"{self.max_retries + 1}"
+                )
+                retries += 1
+                continue
+            with self.lock:
+                self.run_id = run_id
+                cancel_requested = self.cancelled.is_set()
+            # cancel() was called while the job was being triggered, before
+            # the run_id was known, so the cancel request is sent from here.
+            if cancel_requested:
+                self.request_cancel(logger)
+            start_time = time.monotonic()
+            interval = self.min_poll_interval
+
+            while True:
+                time.sleep(interval)
+                status = get_dbt_run_status(run_id, self.token, self.account_id)
+                self.status = status
+                status_str = DBT_RUN_STATUSES.get(status, "Unknown")
+                logger.info(f"dbt job status: {status} - {status_str}")
+
+                if status == 10:
+                    logger.info(f"dbt job run completed successfully.")
+                    return
+                elif status in (20, 30):
+                    if self.cancelled.is_set():
+                        logger.warning(f"dbt job run {run_id} was cancelled.")
+                        return
+                    if retries < self.max_retries:
+                        logger.warning(
+                            f"dbt job {status_str}. Retrying... "
+                            f"(Attempt {retries + 1} of {self.max_retries})"
+                        )
+                        retries += 1
+                        if status == 20 and self.rerun_from_failure:
+                            failed_run_id = run_id
+                        break
+                    logger.error(
+                        f"dbt job {status_str} after {self.max_retries} retries."
+                    )
+                    return
+
+                # Look up the history once, when the run starts running. 0.0
+                # marks a job without history so it is not looked up again.
+                if status == 3 and expected_seconds is None:
+                    expected_seconds = (
+                        get_dbt_job_average_duration(
+                            self.account_id, self.job_id, self.token
+                        )
+                        or 0.0
+                    )
+                interval = get_next_poll_interval(
+                    status,
+                    time.monotonic() - start_time,
+                    expected_seconds,
+                    self.min_poll_interval,
+                    self.max_poll_interval,
+                )
+
+        if not self.cancelled.is_set():
+            logger.error(
+                f"dbt job failed to complete successfully after "
+                f"{self.max_retries} retries."
+            )
+
+    def rerun_failed_run(
+        self, failed_run_id: str, logger: logging.Logger
+    ) -> Union[str, None]:
+        """
+        Reruns the job from the point of failure of a failed run.
+
+        Args:
+            failed_run_id (str): The id of the failed run.
+            logger (logging.Logger): The logger for status messages.
+
+        Returns:
+            str: The run_id of the new run.
+            None: If the rerun could not start and the job must be
+            triggered again in full.
+        """
+        steps = get_dbt_run_steps(self.account_id, failed_run_id, self.token)
+        run_id = rerun_dbt_job(self.account_id, self.job_id, self.token)
+        if run_id is None:
+            logger.warning("Falling back to a full trigger of the dbt job.")
+            return None
+        skipped = [step["name"] for step in steps if step.get("status") == 10]
+        logger.info(
+            f"Rerunning dbt job from the failure of run {failed_run_id}. "
+            f"Skipping {len(skipped)} succeeded steps: {skipped}"
+        )
+        return run_id
+
+    def done(self) -> bool:
+        """
+        Returns True if the run has finished, whatever its outcome.
+        """
+        return self.finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until the run has finished or the timeout has passed.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to
+            wait. Default is None (wait until finished).
+
+        Returns:
+            bool: True if the run has finished, False on timeout.
+        """
+        return self.finished.wait(timeout)
+
+    def result(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Waits for the run to finish and returns its final status.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to
+            wait. Default is None (wait until finished).
+
+        Returns:
+            int: The final status of the last run, such as 10 for success,
+            20 for failed or 30 for cancelled.
+            None: If no run could be started.
+
+        Raises:
+            TimeoutError: If the run has not finished within the timeout.
+        """
+        if not self.wait(timeout):
+            raise TimeoutError(f"dbt job {self.job_id} did not finish in time")
+        return self.status
+
+    def cancel(self) -> bool:
+        """
+        Cancels the current run and stops further retries.
+
+        If the job is still being triggered, the cancel request is sent by
+        the background thread as soon as the run has started.
+
+        Returns:
+            bool: True if the cancellation was accepted by dbt Cloud, or if
+            no run was in progress. False if the cancel request failed.
+        """
+        logger = logging.getLogger("primary_logger")
+        with self.lock:
+            self.cancelled.set()
+            run_id = self.run_id
+        if run_id is None or self.done():
+            return True
+        return self.request_cancel(logger)
+
+    def request_cancel(self, logger: logging.Logger) -> bool:
+        """
+        Sends the cancel request for the current run to dbt Cloud.
+
+        Args:
+            logger (logging.Logger): The logger for status messages.
+
+        Returns:
+            bool: True if the cancellation was accepted by dbt Cloud, False
+            if the cancel request failed.
+        """
+        headers = {
+            "Authorization": f"Token {self.token}",
+            "Content-Type": "application/json",
+        }
+        url = (
+            f"{DBT_CLOUD_API_BASE_URL}/accounts/{self.account_id}/runs/"
+            f"{self.run_id}/cancel/"
+        )
+        try:
+            r = requests.post(url, headers=headers)
+            r.raise_for_status()
+            logger.info(f"dbt job run {self.run_id} cancellation requested.")
+            return True
+        except Exception as e:
+            logger.exception(f"dbt job cancel failed: {str(e)}")
+            return False
+
+
+def dbt_run_async(
+    account_id: str,
+    job_id: str,
+    secret_name: str,
+    max_retries: int = 3,
+    min_poll_interval: float = 5.0,
+    max_poll_interval: float = 60.0,
+    rerun_from_failure: bool = True,
+) -> Optional[DbtRunHandle]:
+    """
+    Starts a dbt job run in the background and returns a handle to it.
+
+    This function triggers the dbt job and polls it in a background thread,
+    with the same retry logic as `dbt_run()`, and returns immediately. The
+    status is polled with adaptive intervals based on the run's status and
+    the job's historical duration, instead of a fixed interval.
+
+    Example:
+        handle = dbt_run_async("10206", "85521", "DBT_TOKEN")
+        do_other_work()
+        if not handle.wait(timeout=3600):
+            handle.cancel()
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        job_id (str): The ID of the dbt job to be triggered.
+        secret_name (str): The name of the environment variable used for dbt
+        Cloud API token.
+        max_retries (int): Maximum number of retries if the job fails.
+        Default is 3.
+        min_poll_interval (float): The shortest interval between status
+        checks, in seconds. Default is 5.
+        max_poll_interval (float): The longest interval between status
+        checks, in seconds. Default is 60.
+        rerun_from_failure (bool): Whether to retry failed runs from the
+        point of failure instead of re-running the whole job. Default is
+        True.
+
+    Returns:
+        DbtRunHandle: The handle of the started run.
+        None: If the dbt token could not be retrieved.
+    """
+    logger = logging.getLogger("primary_logger")
+    logger.info(f"Starting dbt job...")
+    token = get_general_credentials(secret_name)
+    if token is None:
+        logger.error(f"Failed to get dbt token with {secret_name}")
+        return None
+    return DbtRunHandle(
+        account_id,
+        job_id,
+        token,
+        max_retries=max_retries,
+        min_poll_interval=min_poll_interval,
+        max_poll_interval=max_poll_interval,
+        rerun_from_failure=rerun_from_failure,
+    ).start()
+
+
 def dbt_run(
-    account_id: str, job_id: str, secret_name: str, max_retries: int = 3
+    account_id: str,
+    job_id: str,
+    secret_name: str,
+    max_retries: int = 3,
+    min_poll_interval: float = 5.0,
+    max_poll_interval: float = 60.0,
+    rerun_from_failure: bool = True,
 ) -> None:
     """
     Runs a dbt job and checks its status, with retry logic.
 
     This function runs a dbt job by calling the `trigger_dbt_job()` function
     and then checks the status of the job by calling `get_dbt_run_status()`
-    function every 30 seconds until the job is completed successfully,
-    failed, or cancelled. If the job fails, it will retry up to 'max_retries' times.
-    The function logs messages indicating the status of the dbt job and its final outcome.
+    until the job is completed successfully, failed, or cancelled. The
+    status is checked with adaptive intervals between `min_poll_interval`
+    and `max_poll_interval` seconds. If the job fails, it will retry up to
+    'max_retries' times, from the point of failure if `rerun_from_failure`
+    is True. The function logs messages indicating the status of the dbt
+    job and its final outcome. It blocks until the job has finished; use
+    `dbt_run_async()` to keep working while it runs.
 
     Args:
         account_id (str): The ID of the account in dbt Cloud.
         job_id (str): The ID of the dbt job to be triggered.
         secret_name (str): The name of the environment variable used for dbt Cloud API token.
         max_retries (int): Maximum number of retries if the job fails. Default is 3.
+        min_poll_interval (float): The shortest interval between status
+        checks, in seconds. Default is 5.
+        max_poll_interval (float): The longest interval between status
+        checks, in seconds. Default is 60.
+        rerun_from_failure (bool): Whether to retry failed runs from the
+        point of failure, skipping what already succeeded, instead of
+        re-running the whole job. Default is True.
 
     Returns:
         None
     """
+    handle = dbt_run_async(
+        account_id,
+        job_id,
+        secret_name,
+        max_retries=max_retries,
+        min_poll_interval=min_poll_interval,
+        max_poll_interval=max_poll_interval,
+        rerun_from_failure=rerun_from_failure,
+    )
+    if handle is not None:
+        handle.wait()
+
+
+def get_dbt_job_order(jobs: List[str], dependencies: Dict[str, List[str]]) -> List[str]:
+    """
+    Orders dbt jobs so that every job comes after its upstream jobs.
+
+    Args:
+        jobs (List[str]): The IDs of the dbt jobs.
+        dependencies (Dict[str, List[str]]): The upstream job IDs of each job.
+
+    Returns:
+        List[str]: The job IDs in dependency order.
+
+    Raises:
+        ValueError: If a dependency refers to an unknown job or the
+        dependencies contain a cycle.
+    """
+    for job_id, upstreams in dependencies.items():
+        unknown = [j for j in [job_id] + list(upstreams) if j not in jobs]
+        if unknown:
+            raise ValueError(f"Unknown dbt jobs in dependencies: {unknown}")
+    order = []
+    visiting = set()
+
+    def visit(job_id):
+        if job_id in order:
+            return
+        if job_id in visiting:
+            raise ValueError(f"Cycle in dbt job dependencies at job {job_id}")
+        visiting.add(job_id)
+        for upstream in dependencies.get(job_id, []):
+            visit(upstream)
+        visiting.remove(job_id)
+        order.append(job_id)
+
+    for job_id in jobs:
+        visit(job_id)
+    return order
+
+
+def get_dbt_critical_path(
+    results: Dict[str, Dict[str, Any]], dependencies: Dict[str, List[str]]
+) -> Tuple[List[str], float]:
+    """
+    Returns the chain of dependent dbt jobs with the longest total duration.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): The results of
+        `dbt_run_many()`, keyed by job ID in dependency order.
+        dependencies (Dict[str, List[str]]): The upstream job IDs of each job.
+
+    Returns:
+        Tuple[List[str], float]: The job IDs on the critical path, upstream
+        first, and their total duration in seconds.
+    """
+    totals = {}
+    previous = {}
+    for job_id, result in results.items():
+        upstreams = [u for u in dependencies.get(job_id, []) if u in totals]
+        best = max(upstreams, key=lambda u: totals[u], default=None)
+        previous[job_id] = best
+        totals[job_id] = (result["duration_seconds"] or 0.0) + (
+            totals[best] if best is not None else 0.0
+        )
+    if not totals:
+        return [], 0.0
+    job_id = max(totals, key=totals.get)
+    total = totals[job_id]
+    path = []
+    while job_id is not None:
+        path.append(job_id)
+        job_id = previous[job_id]
+    return path[::-1], total
+
+
+def dbt_run_many(
+    account_id: str,
+    jobs: List[str],
+    secret_name: str,
+    dependencies: Optional[Dict[str, List[str]]] = None,
+    max_concurrent: int = 4,
+    poll_interval: float = 10.0,
+    timeout: Optional[float] = None,
+    max_failed_checks: int = 5,
+) -> Optional[Dict[str, Any]]:
+    """
+    Runs several dbt jobs concurrently, respecting their dependencies.
+
+    This function triggers every job whose upstream jobs have succeeded,
+    with at most `max_concurrent` runs in progress, and checks the running
+    jobs every `poll_interval` seconds. A dependent job starts as soon as
+    its last upstream job succeeds, instead of after all earlier jobs as
+    with repeated `dbt_run()` calls. The statuses of all running jobs are
+    fetched together with `get_dbt_run_statuses()`. If a job fails, is
+    cancelled or fails to start, all jobs downstream of it are skipped
+    while independent branches keep running. The function logs the outcome
+    of each job, the total wall-clock time and the critical path, the chain
+    of dependent jobs that bounds the total time. A running job whose
+    status cannot be read `max_failed_checks` times in a row, or that is
+    still running after `timeout` seconds, is marked "unknown" and its
+    downstream jobs are skipped, so the function always returns.
+
+    Example:
+        dbt_run_many(
+            "10206",
+            ["staging", "marts", "exports", "docs"],
+            "DBT_TOKEN",
+            dependencies={"marts": ["staging"], "exports": ["marts"]},
+        )
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        jobs (List[str]): The IDs of the dbt jobs to run.
+        secret_name (str): The name of the environment variable used for dbt
+        Cloud API token.
+        dependencies (Dict[str, List[str]], optional): The upstream job IDs
+        of each job. Default is None (all jobs are independent).
+        max_concurrent (int): The maximum number of runs in progress at the
+        same time. Default is 4.
+        poll_interval (float): The number of seconds between status checks.
+        Default is 10.
+        timeout (float, optional): The number of seconds after which the
+        jobs still running are marked "unknown" and the jobs not started yet
+        are skipped. Default is None (no timeout).
+        max_failed_checks (int): The number of consecutive status checks
+        without a status after which a running job is marked "unknown".
+        Default is 5.
+
+    Returns:
+        Dict[str, Any]: The "jobs" results keyed by job ID, each with the
+        "run_id", the "status" ("success", "failed", "cancelled", "unknown"
+        or "skipped") and the "started_seconds", "finished_seconds" and
+        "duration_seconds" relative to the start; the
+        "wall_clock_seconds"; the "critical_path" job IDs; and the
+        "critical_path_seconds".
+        None: If the dbt token could not be retrieved.
+
+    Raises:
+        ValueError: If a dependency refers to an unknown job or the
+        dependencies contain a cycle.
+    """
+    dependencies = dependencies or {}
+    order = get_dbt_job_order(jobs, dependencies)
     logger = logging.getLogger("primary_logger")
-    logger.info(f"Starting dbt job...")
     token = get_general_credentials(secret_name)
     if token is None:
         logger.error(f"Failed to get dbt token with {secret_name}")
-        return
+        return None
 
-    retries = 0
-    while retries <= max_retries:
-        run_id = trigger_dbt_job(account_id, job_id, token)
-        if run_id is None:
-            logger.error(
-                f"dbt run failed to start. Retry {retries + 1} of {max_retries + 1}"
+    results = {
+        job_id: {
+            "run_id": None,
+            "status": None,
+            "started_seconds": None,
+            "finished_seconds": None,
+            "duration_seconds": None,
+        }
+        for job_id in order
+    }
+    downstream = {job_id: [] for job_id in order}
+    for job_id, upstreams in dependencies.items():
+        for upstream in upstreams:
+            downstream[upstream].append(job_id)
+    running = {}
+    failed_checks = {}
+    session = get_dbt_session(token, pool_maxsize=max_concurrent)
+    start_time = time.monotonic()
+
+    def finish(job_id, status):
+        result = results[job_id]
+        result["status"] = status
+        result["finished_seconds"] = time.monotonic() - start_time
+        if result["started_seconds"] is not None:
+            result["duration_seconds"] = (
+                result["finished_seconds"] - result["started_seconds"]
             )
-            retries += 1
-            continue
+        logger.info(f"dbt job {job_id} finished with status {status}.")
+        if status == "success":
+            return
+        blocked = list(downstream[job_id])
+        while blocked:
+            skipped = blocked.pop()
+            if results[skipped]["status"] is None:
+                results[skipped]["status"] = "skipped"
+                logger.warning(f"Skipping dbt job {skipped}: upstream {job_id} failed.")
+                blocked.extend(downstream[skipped])
 
-        while True:
-            time.sleep(30)
-            status = get_dbt_run_status(run_id, token)
-            status_str = {
-                0: "Status not available",
-                1: "Queued",
-                2: "Starting",
-                3: "Running",
-                10: "Success",
-                20: "Failed",
-                30: "Cancelled",
-            }.get(status, "Unknown")
-
-            logger.info(f"dbt job status: {status} - {status_str}")
-
-            if status == 10:
-                logger.info(f"dbt job run completed successfully.")
-                return  # Exit the function on success
-            elif status in (20, 30):  # Failed or Cancelled
-                if retries < max_retries:
-                    logger.warning(
-                        f"dbt job {status_str}. Retrying... (Attempt {retries + 1} of {max_retries})"
+    while True:
+        for job_id in order:
+            if len(running) >= max_concurrent:
+                break
+            result = results[job_id]
+            if result["status"] is not None or job_id in running:
+                continue
+            upstreams = dependencies.get(job_id, [])
+            if all(results[u]["status"] == "success" for u in upstreams):
+                run_id = trigger_dbt_job(account_id, job_id, token)
+                result["started_seconds"] = time.monotonic() - start_time
+                if run_id is None:
+                    finish(job_id, "failed")
+                    continue
+                result["run_id"] = run_id
+                running[job_id] = run_id
+        if not running:
+            break
+        time.sleep(poll_interval)
+        statuses = get_dbt_run_statuses(
+            account_id, token, run_ids=list(running.values()), session=session
+        )
+        for job_id, run_id in list(running.items()):
+            status = statuses.get(str(run_id))
+            if status is None:
+                failed_checks[job_id] = failed_checks.get(job_id, 0) + 1
+                if failed_checks[job_id] >= max_failed_checks:
+                    logger.error(
+                        f"Failed to get the status of dbt job {job_id} (run "
+                        f"{run_id}) {max_failed_checks} times in a row."
                     )
-                    retries += 1
-                    break  # Break the inner loop to retry
-                else:
-                    logger.error(f"dbt job {status_str} after {max_retries} retries.")
-                    return  # Exit the function after max retries
-
-    logger.error(
-        f"dbt job failed to complete successfully after {max_retries} retries."
+                    del running[job_id]
+                    finish(job_id, "unknown")
+                continue
+            failed_checks[job_id] = 0
+            if status in (10, 20, 30):
+                del running[job_id]
+                finish(job_id, {10: "success", 20: "failed", 30: "cancelled"}[status])
+        if timeout is not None and time.monotonic() - start_time >= timeout:
+            logger.error(f"dbt jobs did not finish within {timeout} seconds.")
+            for job_id in list(running):
+                del running[job_id]
+                finish(job_id, "unknown")
+            for job_id in order:
+                if results[job_id]["status"] is None:
+                    results[job_id]["status"] = "skipped"
+            break
+
+    wall_clock_seconds = time.monotonic() - start_time
+    critical_path, critical_path_seconds = get_dbt_critical_path(results, dependencies)
+    failed = [j for j, r in results.items() if r["status"] != "success"]
+    logger.info(
+        f"dbt jobs finished in {wall_clock_seconds:.0f} seconds. Critical path "
+        f"{' -> '.join(critical_path)} took {critical_path_seconds:.0f} seconds."
     )
+    if failed:
+        logger.error(f"dbt jobs did not succeed: {failed}")
+    return {
+        "jobs": results,
+        "wall_clock_seconds": wall_clock_seconds,
+        "critical_path": critical_path,
+        "critical_path_seconds": critical_path_seconds,
+    }
+
+
+def get_dbt_run_artifact(
+    account_id: str, run_id: str, path: str, token: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetches an artifact of a dbt job run, such as "run_results.json".
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        run_id (str): The id of the dbt job run.
+        path (str): The path of the artifact, such as "run_results.json" or
+        "manifest.json".
+        token (str): The dbt Cloud API token.
+
+    Returns:
+        Dict[str, Any]: The parsed artifact.
+        None: If the request failed.
+    """
+    logger = logging.getLogger("primary_logger")
+    headers = {
+        "Authorization": f"Token {token}",
+        "Content-Type": "application/json",
+    }
+    url = (
+        f"{DBT_CLOUD_API_BASE_URL}/accounts/{account_id}/runs/{run_id}/"
+        f"artifacts/{path}"
+    )
+    try:
+        r = requests.get(url, headers=headers)
+        r.raise_for_status()
+        logger.info(f"Got dbt artifact {path} of run {run_id}.")
+        return r.json()
+    except Exception as e:
+        logger.exception(f"dbt artifact {path} error: {str(e)}")
+        return None
+
+
+def parse_dbt_run_results(
+    run_results: Dict[str, Any], manifest: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    Parses a dbt `run_results.json` artifact into one row per node.
+
+    Args:
+        run_results (Dict[str, Any]): The `run_results.json` artifact.
+        manifest (Dict[str, Any], optional): The `manifest.json` artifact of
+        the same run, used for the model names and resource types. Default
+        is None (names are taken from the unique IDs).
+
+    Returns:
+        pd.DataFrame: The columns "unique_id", "model", "resource_type",
+        "status", "execution_time" (seconds), "rows_affected" and
+        "generated_at", sorted by execution time, slowest first.
+    """
+    nodes = (manifest or {}).get("nodes", {})
+    generated_at = run_results.get("metadata", {}).get("generated_at")
+    rows = []
+    for result in run_results.get("results", []):
+        unique_id = result["unique_id"]
+        node = nodes.get(unique_id, {})
+        rows.append(
+            {
+                "unique_id": unique_id,
+                "model": node.get("name", unique_id.split(".")[-1]),
+                "resource_type": node.get("resource_type", unique_id.split(".")[0]),
+                "status": result.get("status"),
+                "execution_time": float(result.get("execution_time") or 0.0),
+                "rows_affected": (result.get("adapter_response") or {}).get(
+                    "rows_affected"
+                ),
+                "generated_at": generated_at,
+            }
+        )
+    df = pd.DataFrame(
+        rows,
+        columns=[
+            "unique_id",
+            "model",
+            "resource_type",
+            "status",
+            "execution_time",
+            "rows_affected",
+            "generated_at",
+        ],
+    )
+    df["rows_affected"] = df["rows_affected"].astype("Int64")
+    df["generated_at"] = pd.to_datetime(df["generated_at"], utc=True)
+    return df.sort_values("execution_time", ascending=False, ignore_index=True)
+
+
+def get_dbt_model_critical_path(
+    timings: pd.DataFrame, manifest: Dict[str, Any]
+) -> Tuple[List[str], float]:
+    """
+    Returns the chain of dependent dbt models with the longest execution time.
+
+    Only the nodes in `timings` are considered, so the dependencies through
+    sources or nodes that were not run are ignored.
+
+    Args:
+        timings (pd.DataFrame): The output of `parse_dbt_run_results()`.
+        manifest (Dict[str, Any]): The `manifest.json` artifact of the run.
+
+    Returns:
+        Tuple[List[str], float]: The unique IDs on the critical path,
+        upstream first, and their total execution time in seconds.
+    """
+    durations = dict(zip(timings["unique_id"], timings["execution_time"]))
+    nodes = manifest.get("nodes", {})
+    dependencies = {
+        unique_id: [
+            upstream
+            for upstream in nodes.get(unique_id, {})
+            .get("depends_on", {})
+            .get("nodes", [])
+            if upstream in durations
+        ]
+        for unique_id in durations
+    }
+    order = get_dbt_job_order(list(durations), dependencies)
+    results = {
+        unique_id: {"duration_seconds": durations[unique_id]} for unique_id in order
+    }
+    return get_dbt_critical_path(results, dependencies)
+
+
+def get_dbt_run_timings(
+    account_id: str,
+    run_id: str,
+    secret_name: str,
+    top_n: int = 10,
+    project_id: Optional[str] = None,
+    dataset_id: Optional[str] = None,
+    table_id: Optional[str] = None,
+    bigquery_secret_name: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Analyzes the per-model timings of a dbt job run.
+
+    This function fetches the `run_results.json` and `manifest.json`
+    artifacts of the run, parses them into a DataFrame of model timings and
+    logs the `top_n` slowest models and the critical path, the chain of
+    dependent models that bounds the run time. If `project_id`,
+    `dataset_id`, `table_id` and `bigquery_secret_name` are given, the
+    timings are appended to that BigQuery table with
+    `upload_dataframe_to_bigquery()` to track regressions over time.
+
+    Example:
+        get_dbt_run_timings(
+            "10206",
+            "123456",
+            "DBT_TOKEN",
+            project_id="my-project",
+            dataset_id="dbt_monitoring",
+            table_id="model_timings",
+            bigquery_secret_name="GOOGLE_CREDENTIALS",
+        )
+
+    Args:
+        account_id (str): The ID of the account in dbt Cloud.
+        run_id (str): The id of the dbt job run.
+        secret_name (str): The name of the environment variable used for dbt
+        Cloud API token.
+        top_n (int): The number of slowest models to report. Default is 10.
+        project_id (str, optional): The BigQuery project of the timings
+        table. Default is None (no upload).
+        dataset_id (str, optional): The BigQuery dataset of the timings
+        table. Default is None.
+        table_id (str, optional): The BigQuery timings table. Default is
+        None.
+        bigquery_secret_name (str, optional): The name of the environment
+        variable used for Google Cloud credentials. Default is None.
+
+    Returns:
+        Dict[str, Any]: The "timings" DataFrame with a "run_id" column, the
+        "slowest_models" DataFrame, the "critical_path" unique IDs and the
+        "critical_path_seconds".
+        None: If the dbt token or the artifacts could not be retrieved.
+    """
+    logger = logging.getLogger("primary_logger")
+    token = get_general_credentials(secret_name)
+    if token is None:
+        logger.error(f"Failed to get dbt token with {secret_name}")
+        return None
+    run_results = get_dbt_run_artifact(account_id, run_id, "run_results.json", token)
+    manifest = get_dbt_run_artifact(account_id, run_id, "manifest.json", token)
+    if run_results is None or manifest is None:
+        return None
+
+    timings = parse_dbt_run_results(run_results, manifest)
+    timings.insert(0, "run_id", str(run_id))
+    slowest_models = timings.head(top_n)
+    critical_path, critical_path_seconds = get_dbt_model_critical_path(
+        timings, manifest
+    )
+    slowest = ", ".join(
+        f"{row.model} ({row.execution_time:.0f}s)"
+        for row in slowest_models.itertuples()
+    )
+    logger.info(f"Slowest dbt models of run {run_id}: {slowest}")
+    logger.info(
+        f"dbt critical path of run {run_id} took {critical_path_seconds:.0f} "
+        f"seconds: {' -> '.join(critical_path)}"
+    )
+    if project_id and dataset_id and table_id and bigquery_secret_name:
+        upload_dataframe_to_bigquery(
+            project_id,
+            dataset_id,
+            table_id,
+            bigquery_secret_name,
+            timings,
+            write_disposition="WRITE_APPEND",
+        )
+    return {
+        "timings": timings,
+        "slowest_models": slowest_models,
+        "critical_path": critical_path,
+        "critical_path_seconds": critical_path_seconds,
+    }
@@ -1,20 +1,52 @@
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
 import io
+import os
+import json
+import time
+import fnmatch
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import storage
-from cru_dse_utils import get_google_credentials
+from cru_dse_utils import get_google_credentials, get_google_authorized_session
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import fastavro
+except ImportError:
+    fastavro = None
+
+GCS_RESUMABLE_UPLOAD_URL = (
+    "https://storage.googleapis.com/upload/storage/v1/b/{bucket_name}/o"
+)
+GCS_CHUNK_SIZE_MULTIPLE = 256 * 1024
+
 
 def upload_to_gcs(
-    file_path: str, bucket_name: str, blob_name: str, secret_name: str
-) -> None:
+    file_path: str,
+    bucket_name: str,
+    blob_name: str,
+    secret_name: str,
+    resumable: bool = False,
+    chunk_size: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+) -> Optional[bool]:
     """
     Uploads the specified file to a Google Cloud Storage bucket.
 
     This function uploads a file to the specified Google Cloud Storage bucket
     with the specified name. The function logs a message indicating whether
-    the upload succeeded or failed.
+    the upload succeeded or failed. If `resumable` is True, the upload is
+    delegated to `resumable_upload_to_gcs()`, which checkpoints its progress
+    so that a retry or a restarted process continues from the last
+    committed byte.
 
     Args:
         file_path: str: The path to the file to be uploaded.
@@ -23,10 +55,27 @@ def upload_to_gcs(
         blob_name (str): The name of the file to create in the bucket.
         secret_name (str): The name of the environment variable to retrieve
         the Google Cloud credentials.
+        resumable (bool, optional): Whether to use a checkpointed resumable
+        upload session. Defaults to False.
+        chunk_size (int, optional): The initial chunk size in bytes for
+        resumable uploads. Defaults to None (8 MiB).
+        checkpoint_path (str, optional): The path of the checkpoint file for
+        resumable uploads. Defaults to None (next to the uploaded file).
 
     Returns:
-        None
+        bool: With `resumable`, True if the upload completed, False
+        otherwise.
+        None: Without `resumable`.
     """
+    if resumable:
+        return resumable_upload_to_gcs(
+            file_path,
+            bucket_name,
+            blob_name,
+            secret_name,
+            chunk_size=chunk_size or 8 * 1024 * 1024,
+            checkpoint_path=checkpoint_path,
+        )
     logger = logging.getLogger("primary_logger")
     credentials = get_google_credentials(secret_name)
     if credentials is None:
@@ -44,15 +93,320 @@ def upload_to_gcs(
         logger.exception(f"Upload to Google Cloud Storage error: {str(e)}")
 
 
+def get_next_chunk_size(
+    chunk_size: int,
+    bytes_sent: int,
+    seconds: float,
+    target_seconds: float = 10.0,
+    min_chunk_size: int = GCS_CHUNK_SIZE_MULTIPLE * 4,
+    max_chunk_size: int = GCS_CHUNK_SIZE_MULTIPLE * 1024,
+) -> int:
+    """
+    Adapts the resumable upload chunk size to the measured throughput.
+
+    This function sizes the next chunk so that it takes about
+    `target_seconds` to send at the throughput measured for the last chunk.
+    The size changes by at most a factor of two per chunk, stays between
+    `min_chunk_size` and `max_chunk_size`, and is rounded down to a multiple
+    of 256 KiB as required by Google Cloud Storage.
+
+    Args:
+        chunk_size (int): The current chunk size in bytes.
+        bytes_sent (int): The number of bytes sent in the last chunk.
+        seconds (float): The time it took to send the last chunk.
+        target_seconds (float): The desired duration of one chunk.
+        Defaults to 10.
+        min_chunk_size (int): The smallest chunk size. Defaults to 1 MiB.
+        max_chunk_size (int): The largest chunk size. Defaults to 256 MiB.
+
+    Returns:
+        int: The chunk size in bytes to use for the next chunk.
+    """
+    if seconds <= 0 or bytes_sent <= 0:
+        return chunk_size
+    desired = int(bytes_sent / seconds * target_seconds)
+    desired = max(chunk_size // 2, min(desired, chunk_size * 2))
+    desired = max(min_chunk_size, min(desired, max_chunk_size))
+    return max(
+        GCS_CHUNK_SIZE_MULTIPLE,
+        desired // GCS_CHUNK_SIZE_MULTIPLE * GCS_CHUNK_SIZE_MULTIPLE,
+    )
+
+
+def get_resumable_upload_offset(
+    session: requests.Session, session_uri: str, file_size: int
+) -> Optional[int]:
+    """
+    Queries the number of bytes committed to a resumable upload session.
+
+    Args:
+        session (requests.Session): The authorized session to use.
+        session_uri (str): The resumable upload session URI.
+        file_size (int): The total size of the file being uploaded.
+
+    Returns:
+        int or None: The committed offset, the file size if the upload is
+        already complete, or None if the session no longer exists.
+    """
+    response = session.put(
+        session_uri,
+        headers={"Content-Range": f"bytes */{file_size}", "Content-Length": "0"},
+    )
+    if response.status_code in (200, 201):
+        return file_size
+    if response.status_code == 308:
+        committed = response.headers.get("Range")
+        if not committed:
+            return 0
+        return int(committed.split("-")[-1]) + 1
+    if response.status_code in (404, 410):
+        return None
+    response.raise_for_status()
+    return None
+
+
+def resumable_upload_to_gcs(
+    file_path: str,
+    bucket_name: str,
+    blob_name: str,
+    secret_name: str,
+    chunk_size: int = 8 * 1024 * 1024,
+    adaptive_chunk_size: bool = True,
+    checkpoint_path: Optional[str] = None,
+    max_retries: int = 5,
+) -> bool:
+    """
+    Uploads a file to Google Cloud Storage with a checkpointed resumable
+    upload session.
+
+    This function opens a resumable upload session and sends the file in
+    chunks. After every committed chunk, the session URI and the committed
+    offset are written to a local checkpoint file. If a chunk fails, the
+    committed offset is queried from the server and the upload continues
+    from there, up to `max_retries` consecutive failures. If the process
+    stops, calling this function again with the same arguments resumes the
+    session from the checkpoint. The checkpoint is removed once the upload
+    completes.
+
+    Args:
+        file_path (str): The path to the file to be uploaded.
+        bucket_name (str): The name of the Google Cloud Storage bucket to
+        upload the file to.
+        blob_name (str): The name of the file to create in the bucket.
+        secret_name (str): The name of the environment variable to retrieve
+        the Google Cloud credentials.
+        chunk_size (int): The initial chunk size in bytes, rounded down to a
+        multiple of 256 KiB. Defaults to 8 MiB.
+        adaptive_chunk_size (bool): Whether to adapt the chunk size to the
+        measured throughput. Defaults to True.
+        checkpoint_path (str, optional): The path of the checkpoint file.
+        Defaults to None (`<file_path>.gcs_upload.json`).
+        max_retries (int): The maximum number of consecutive failed chunks
+        before giving up. Defaults to 5.
+
+    Returns:
+        bool: True if the upload completed, False otherwise. On failure the
+        checkpoint is kept so the upload can be resumed.
+    """
+    logger = logging.getLogger("primary_logger")
+    session = get_google_authorized_session(secret_name)
+    if session is None:
+        logger.error(f"Failed to get Google Cloud credentials with {secret_name}")
+        return False
+    checkpoint_path = checkpoint_path or f"{file_path}.gcs_upload.json"
+    file_size = os.path.getsize(file_path)
+    file_mtime = os.path.getmtime(file_path)
+    chunk_size = max(
+        GCS_CHUNK_SIZE_MULTIPLE,
+        chunk_size // GCS_CHUNK_SIZE_MULTIPLE * GCS_CHUNK_SIZE_MULTIPLE,
+    )
+    target = {
+        "bucket_name": bucket_name,
+        "blob_name": blob_name,
+        "file_size": file_size,
+        "file_mtime": file_mtime,
+    }
+
+    session_uri = None
+    offset = 0
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if all(checkpoint.get(k) == v for k, v in target.items()):
+            session_uri = checkpoint["session_uri"]
+            try:
+                offset = get_resumable_upload_offset(session, session_uri, file_size)
+            except Exception:
+                offset = checkpoint["offset"]
+            if offset is None:
+                logger.warning("Resumable upload session expired. Starting over.")
+                session_uri = None
+                offset = 0
+            else:
+                logger.info(f"Resuming upload of {file_path} from byte {offset}")
+
+    def write_checkpoint():
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({**target, "session_uri": session_uri, "offset": offset}, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    retries = 0
+    with open(file_path, "rb") as f:
+        while True:
+            try:
+                if session_uri is None:
+                    response = session.post(
+                        GCS_RESUMABLE_UPLOAD_URL.format(bucket_name=bucket_name),
+                        params={"uploadType": "resumable", "name": blob_name},
+                        headers={"X-Upload-Content-Length": str(file_size)},
+                    )
+                    response.raise_for_status()
+                    session_uri = response.headers["Location"]
+                    offset = 0
+                    write_checkpoint()
+                if offset >= file_size and file_size > 0:
+                    break
+                f.seek(offset)
+                data = f.read(chunk_size)
+                if data:
+                    end = offset + len(data) - 1
+                    content_range = f"bytes {offset}-{end}/{file_size}"
+                else:
+                    content_range = f"bytes */{file_size}"
+                start_time = time.monotonic()
+                response = session.put(
+                    session_uri,
+                    data=data,
+                    headers={
+                        "Content-Range": content_range,
+                        "Content-Length": str(len(data)),
+                    },
+                )
+                seconds = time.monotonic() - start_time
+                if response.status_code in (200, 201):
+                    break
+                if response.status_code != 308:
+                    response.raise_for_status()
+                committed = response.headers.get("Range")
+                new_offset = int(committed.split("-")[-1]) + 1 if committed else 0
+                if adaptive_chunk_size:
+                    chunk_size = get_next_chunk_size(
+                        chunk_size, new_offset - offset, seconds
+                    )
+                offset = new_offset
+                retries = 0
+                write_checkpoint()
+            except Exception as e:
+                retries += 1
+                if retries > max_retries:
+                    logger.exception(
+                        f"Resumable upload to Google Cloud Storage error after "
+                        f"{max_retries} retries at byte {offset}: {str(e)}"
+                    )
+                    return False
+                logger.warning(
+                    f"Resumable upload chunk error: {str(e)}. Retry in "
+                    f"{2 ** retries} seconds..."
+                )
+                time.sleep(2**retries)
+                if session_uri is None:
+                    continue
+                try:
+                    committed_offset = get_resumable_upload_offset(
+                        session, session_uri, file_size
+                    )
+                except Exception:
+                    continue
+                if committed_offset is None:
+                    session_uri = None
+                    offset = 0
+                else:
+                    offset = committed_offset
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    logger.info(
+        f"Uploaded file to Google Cloud Storage: gs://{bucket_name}/{blob_name}"
+    )
+    return True
+
+
+def get_dtypes_from_schema(
+    schema_json: List[Dict], engine: Optional[str] = None
+) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Maps a BigQuery schema to pandas dtypes and date columns for read_csv().
+
+    This function converts the schema fields returned by
+    `get_schema_from_bigquery()` to the `dtype` and `parse_dates` arguments
+    of `pd.read_csv()`. Nullable pandas dtypes are used by default, and
+    Arrow-backed dtypes are used when the pyarrow engine is selected.
+    Date and time fields are returned as columns to parse as dates, and
+    nested or repeated fields are skipped.
+
+    Args:
+        schema_json (List[Dict]): A list of dictionaries in json format
+        containing the BigQuery schema fields.
+        engine (str, optional): The CSV parser engine. If "pyarrow", Arrow
+        dtypes are used. Defaults to None.
+
+    Returns:
+        Tuple[Dict[str, str], List[str]]: A dictionary of column names to
+        pandas dtypes and a list of columns to parse as dates.
+    """
+    if engine == "pyarrow":
+        type_map = {
+            "STRING": "string[pyarrow]",
+            "INTEGER": "int64[pyarrow]",
+            "INT64": "int64[pyarrow]",
+            "FLOAT": "double[pyarrow]",
+            "FLOAT64": "double[pyarrow]",
+            "BOOLEAN": "bool[pyarrow]",
+            "BOOL": "bool[pyarrow]",
+        }
+    else:
+        type_map = {
+            "STRING": "string",
+            "INTEGER": "Int64",
+            "INT64": "Int64",
+            "FLOAT": "Float64",
+            "FLOAT64": "Float64",
+            "BOOLEAN": "boolean",
+            "BOOL": "boolean",
+        }
+    date_types = ("TIMESTAMP", "DATETIME", "DATE")
+    dtype = {}
+    parse_dates = []
+    for field in schema_json:
+        if field.get("mode") == "REPEATED":
+            continue
+        field_type = field.get("type", "").upper()
+        if field_type in type_map:
+            dtype[field["name"]] = type_map[field_type]
+        elif field_type in date_types:
+            parse_dates.append(field["name"])
+    return dtype, parse_dates
+
+
 def download_from_gcs_as_dataframe(
-    bucket_name, blob_name, secret_name: str
+    bucket_name,
+    blob_name,
+    secret_name: str,
+    usecols: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, Any]] = None,
+    parse_dates: Optional[List[str]] = None,
+    engine: Optional[str] = None,
+    schema_json: Optional[List[Dict]] = None,
 ) -> Union[pd.DataFrame, None]:
     """
     Downloads a file from a Google Cloud Storage bucket.
 
     This function downloads a file from the specified Google Cloud Storage
     bucket with the specified name. The function logs a message indicating
-    whether the download succeeded or failed.
+    whether the download succeeded or failed. The CSV parsing options are
+    passed through to `pd.read_csv()`. If `schema_json` is provided, the
+    dtypes and date columns are derived from it, and any `dtype` or
+    `parse_dates` passed explicitly take precedence.
 
     Args:
         bucket_name (str): The name of the Google Cloud Storage bucket to
@@ -60,6 +414,17 @@ def download_from_gcs_as_dataframe(
         blob_name (str): The name of the file to download from the bucket.
         secret_name (str): The name of the environment variable to retrieve
         the Google Cloud credentials.
+        usecols (List[str], optional): The columns to parse. Other columns
+        are skipped. Defaults to None (all columns).
+        dtype (Dict[str, Any], optional): A dictionary of column names to
+        dtypes. Defaults to None.
+        parse_dates (List[str], optional): The columns to parse as dates.
+        Defaults to None.
+        engine (str, optional): The CSV parser engine, such as "c" or
+        "pyarrow". Defaults to None (pandas default).
+        schema_json (List[Dict], optional): A BigQuery schema as returned by
+        `get_schema_from_bigquery()` used to derive dtypes and date columns.
+        Defaults to None.
 
     Returns:
         pd.DataFrame: The contents of the file as a pandas DataFrame.
@@ -70,12 +435,29 @@ def download_from_gcs_as_dataframe(
     if credentials is None:
         logger.error(f"Failed to get Google Cloud credentials with {secret_name}")
         return None
+    read_csv_kwargs = {}
+    if schema_json:
+        schema_dtype, schema_parse_dates = get_dtypes_from_schema(schema_json, engine)
+        if usecols is not None:
+            schema_dtype = {k: v for k, v in schema_dtype.items() if k in usecols}
+            schema_parse_dates = [c for c in schema_parse_dates if c in usecols]
+        dtype = {**schema_dtype, **(dtype or {})}
+        if parse_dates is None:
+            parse_dates = [c for c in schema_parse_dates if c not in dtype]
+    if usecols is not None:
+        read_csv_kwargs["usecols"] = usecols
+    if dtype:
+        read_csv_kwargs["dtype"] = dtype
+    if parse_dates:
+        read_csv_kwargs["parse_dates"] = parse_dates
+    if engine is not None:
+        read_csv_kwargs["engine"] = engine
     client = storage.Client(credentials=credentials)
     bucket = client.bucket(bucket_name)
     blob = bucket.blob(blob_name)
     try:
         contents = blob.download_as_string()
-        df = pd.read_csv(io.BytesIO(contents))
+        df = pd.read_csv(io.BytesIO(contents), **read_csv_kwargs)
         logger.info(f"Downloaded data from gs://{bucket_name}/{blob_name}")
         return df
     except Exception as e:
@@ -116,3 +498,227 @@ def upload_dataframe_to_gcs(
         logger.info(f"Uploaded data to gs://{bucket_name}/{blob_name}")
     except Exception as e:
         logger.exception(f"Upload to Google Cloud Storage error: {str(e)}")
+
+
+def upload_dataframe_shards_to_gcs(
+    bucket_name: str,
+    prefix: str,
+    df: pd.DataFrame,
+    secret_name: str,
+    chunk_rows: int = 1_000_000,
+    max_workers: int = 8,
+) -> Optional[List[str]]:
+    """
+    Uploads a pandas DataFrame to Google Cloud Storage as Parquet shards.
+
+    This function splits the DataFrame into chunks of `chunk_rows` rows,
+    serializes each chunk to Parquet and uploads the shards in parallel
+    with a thread pool sharing one storage client. The shards are named
+    `<prefix>/part-00000.parquet`, `<prefix>/part-00001.parquet` and so on.
+    The function logs a message indicating whether the upload succeeded or
+    failed.
+
+    Args:
+        bucket_name (str): The name of the Google Cloud Storage bucket to
+        upload the shards to.
+        prefix (str): The prefix of the shard names in the bucket.
+        df (pd.DataFrame): The pandas DataFrame to upload.
+        secret_name (str): The name of the environment variable to retrieve
+        the Google Cloud credentials.
+        chunk_rows (int): The number of rows per shard. Defaults to
+        1000000.
+        max_workers (int): The maximum number of concurrent uploads.
+        Defaults to 8.
+
+    Returns:
+        List[str]: The gs:// URIs of the uploaded shards.
+        None: If the upload failed.
+    """
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error(f"Failed to get Google Cloud credentials with {secret_name}")
+        return None
+    client = storage.Client(credentials=credentials)
+    bucket = client.bucket(bucket_name)
+    prefix = prefix.rstrip("/")
+
+    def upload_shard(index):
+        chunk = df.iloc[index * chunk_rows : (index + 1) * chunk_rows]
+        buffer = io.BytesIO()
+        chunk.to_parquet(buffer, index=False)
+        blob_name = f"{prefix}/part-{index:05d}.parquet"
+        bucket.blob(blob_name).upload_from_string(
+            buffer.getvalue(), "application/octet-stream"
+        )
+        return f"gs://{bucket_name}/{blob_name}"
+
+    shard_count = max(1, -(-len(df) // chunk_rows))
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            uris = list(pool.map(upload_shard, range(shard_count)))
+        logger.info(
+            f"Uploaded {shard_count} Parquet shards to gs://{bucket_name}/{prefix}/"
+        )
+        return uris
+    except Exception as e:
+        logger.exception(f"Upload to Google Cloud Storage error: {str(e)}")
+        return None
+
+
+def validate_shard_format(file_format: str) -> None:
+    """
+    Checks that shards in a file format can be read.
+
+    Args:
+        file_format (str): "PARQUET" or "AVRO".
+
+    Raises:
+        ValueError: If `file_format` is not supported or the package needed
+        to read it is not installed.
+    """
+    if file_format not in ("PARQUET", "AVRO"):
+        raise ValueError(f"Unsupported file format: {file_format}")
+    if pa is None:
+        raise ValueError("Reading shards requires pyarrow")
+    if file_format == "AVRO" and fastavro is None:
+        raise ValueError("Reading Avro shards requires fastavro")
+
+
+def read_avro_shard(data: io.BytesIO) -> "pa.Table":
+    """
+    Reads an Avro shard into an Arrow table.
+
+    A shard without rows gets one null column per Avro field, so that it
+    keeps the column names of the export.
+
+    Args:
+        data (io.BytesIO): The content of the Avro file.
+
+    Returns:
+        pa.Table: The rows of the shard.
+    """
+    reader = fastavro.reader(data)
+    records = list(reader)
+    if records:
+        return pa.Table.from_pylist(records)
+    fields = reader.writer_schema.get("fields", [])
+    return pa.table({f["name"]: pa.array([], type=pa.null()) for f in fields})
+
+
+def download_shards_from_gcs_as_arrow(
+    bucket_name: str,
+    prefix: str,
+    secret_name: str,
+    file_format: str = "PARQUET",
+    max_workers: int = 8,
+    pattern: Optional[str] = None,
+) -> Optional["pa.Table"]:
+    """
+    Downloads Parquet or Avro shards from Google Cloud Storage as one Arrow
+    table.
+
+    This function lists the files under the prefix, such as the shards
+    written by a BigQuery extract job, downloads and decodes them in
+    parallel with a thread pool sharing one storage client, and
+    concatenates them in name order. The function logs a message indicating
+    whether the download succeeded or failed.
+
+    Args:
+        bucket_name (str): The name of the Google Cloud Storage bucket.
+        prefix (str): The prefix of the shard names in the bucket.
+        secret_name (str): The name of the environment variable to retrieve
+        the Google Cloud credentials.
+        file_format (str): "PARQUET" or "AVRO". Reading Avro requires
+        fastavro. Defaults to "PARQUET".
+        max_workers (int): The maximum number of concurrent downloads.
+        Defaults to 8.
+        pattern (str, optional): A glob pattern, such as "part-*.avro",
+        that the rest of the file name after the prefix must match.
+        Defaults to None (read every file under the prefix).
+
+    Returns:
+        pa.Table: The rows of all shards. Avro shards without rows are
+        skipped unless every shard is empty.
+        None: If the download failed.
+
+    Raises:
+        ValueError: If `file_format` is not supported or the package needed
+        to read it is not installed.
+    """
+    validate_shard_format(file_format)
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error(f"Failed to get Google Cloud credentials with {secret_name}")
+        return None
+    client = storage.Client(credentials=credentials)
+
+    def read_shard(blob):
+        data = io.BytesIO(blob.download_as_bytes())
+        if file_format == "PARQUET":
+            return pq.read_table(data)
+        return read_avro_shard(data)
+
+    try:
+        blobs = sorted(
+            client.list_blobs(bucket_name, prefix=prefix), key=lambda b: b.name
+        )
+        if pattern is not None:
+            blobs = [
+                b for b in blobs if fnmatch.fnmatch(b.name[len(prefix) :], pattern)
+            ]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            tables = list(pool.map(read_shard, blobs))
+        if file_format == "AVRO":
+            tables = [t for t in tables if t.num_rows] or tables[:1]
+        table = pa.concat_tables(tables)
+        logger.info(
+            f"Downloaded {len(blobs)} shards, {table.num_rows} rows, from "
+            f"gs://{bucket_name}/{prefix}"
+        )
+        return table
+    except Exception as e:
+        logger.exception(f"Download from Google Cloud Storage error: {str(e)}")
+        return None
+
+
+def delete_from_gcs(
+    bucket_name: str, prefix: str, secret_name: str, pattern: Optional[str] = None
+) -> None:
+    """
+    Deletes all files under a prefix in a Google Cloud Storage bucket.
+
+    This function lists the files whose names start with the specified
+    prefix and deletes them. The function logs a message indicating whether
+    the deletion succeeded or failed.
+
+    Args:
+        bucket_name (str): The name of the Google Cloud Storage bucket.
+        prefix (str): The prefix of the files to delete. End it with "/" to
+        delete a folder without touching names that merely start alike.
+        secret_name (str): The name of the environment variable to retrieve
+        the Google Cloud credentials.
+        pattern (str, optional): A glob pattern, such as "part-*.parquet",
+        that the rest of the file name after the prefix must match.
+        Defaults to None (delete every file under the prefix).
+
+    Returns:
+        None
+    """
+    logger = logging.getLogger("primary_logger")
+    credentials = get_google_credentials(secret_name)
+    if credentials is None:
+        logger.error(f"Failed to get Google Cloud credentials with {secret_name}")
+        return None
+    client = storage.Client(credentials=credentials)
+    try:
+        blobs = list(client.list_blobs(bucket_name, prefix=prefix))
+        if pattern is not None:
+            blobs = [
+                b for b in blobs if fnmatch.fnmatch(b.name[len(prefix) :], pattern)
+            ]
+        client.bucket(bucket_name).delete_blobs(blobs)
+        logger.info(f"Deleted {len(blobs)} files from gs://{bucket_name}/{prefix}")
+    except Exception as e:
+        logger.exception(f"Delete from Google Cloud Storage error: {str(e)}")
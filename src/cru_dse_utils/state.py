@@ -0,0 +1,138 @@
+from typing import List, Dict, Any, Optional, Union
+import os
+import json
+import sqlite3
+import datetime
+import threading
+
+
+class JsonWatermarkStore:
+    """
+    Stores watermarks, such as the last extracted timestamp of a table, in
+    a local JSON file.
+
+    Every update rewrites the file to a temporary path and renames it over
+    the original, so a crash never leaves a partially written file.
+
+    Args:
+        path (str): The path of the JSON file. It is created on the first
+        update.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def read_all(self) -> Dict[str, Any]:
+        """
+        Returns all stored watermarks keyed by name.
+        """
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the watermark stored under a key, or None if there is none.
+
+        Args:
+            key (str): The name of the watermark.
+
+        Returns:
+            Any or None: The stored watermark value.
+        """
+        with self.lock:
+            return self.read_all().get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a watermark under a key.
+
+        Args:
+            key (str): The name of the watermark.
+            value (Any): A JSON serializable watermark value.
+        """
+        with self.lock:
+            data = self.read_all()
+            data[key] = value
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+
+class SqliteWatermarkStore:
+    """
+    Stores watermarks, such as the last extracted timestamp of a table, in
+    a local SQLite database.
+
+    Each update is a single transaction, so concurrent processes sharing
+    the database never see a partially written watermark.
+
+    Args:
+        path (str): The path of the SQLite database file. It is created if
+        it does not exist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self.connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the database.
+        """
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the watermark stored under a key, or None if there is none.
+
+        Args:
+            key (str): The name of the watermark.
+
+        Returns:
+            Any or None: The stored watermark value.
+        """
+        connection = self.connect()
+        try:
+            row = connection.execute(
+                "SELECT value FROM watermarks WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            connection.close()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a watermark under a key.
+
+        Args:
+            key (str): The name of the watermark.
+            value (Any): A JSON serializable watermark value.
+        """
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO watermarks (key, value, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                    "updated_at = excluded.updated_at",
+                    (
+                        key,
+                        json.dumps(value),
+                        datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    ),
+                )
+        finally:
+            connection.close()
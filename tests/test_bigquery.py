@@ -1,3 +1,5 @@
+import os
+import datetime
 from unittest.mock import Mock, MagicMock, patch
 import pytest
 from google.cloud import bigquery
@@ -7,7 +9,37 @@ from cru_dse_utils import (
     upload_dataframe_to_bigquery,
     download_from_bigquery_as_dataframe,
     query_bigquery_as_dataframe,
+    iter_bigquery_batches,
+    QueryResultCache,
+    get_schemas,
+    incremental_download_from_bigquery,
+    JsonWatermarkStore,
+    run_queries,
+    dry_run_query,
+    load_gcs_to_bigquery,
+    export_bigquery_to_gcs,
+    download_from_bigquery_via_export,
+    align_dataframe_to_schema,
 )
+import pyarrow as pa
+import pyarrow.parquet as pq
+from cru_dse_utils.bigquery import (
+    SCHEMA_CACHE,
+    rows_to_dataframe,
+    read_table_with_bqstorage,
+    build_select_query,
+    prefetch_iterator,
+    rebatch_record_batches,
+    read_bqstorage_stream_in_process,
+    append_dataframe_with_storage_write,
+    build_merge_query,
+    split_dataframe_by_partition,
+    format_watermark_literal,
+    arrow_table_to_dataframe,
+    optimize_dataframe_memory,
+)
+from google.api_core.exceptions import NotFound
+from google.cloud.bigquery_storage import types as bqstorage_types
 
 
 # Test upload_dataframe_to_bigquery for a successful request where everything works as expected.
@@ -36,7 +68,7 @@ def test_get_schema_from_bigquery_success(mock_get_session):
 
     # Ensure the session get method was called with the right argument
     url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/datasets/{dataset_id}/tables/{table_id}"
-    session.get.assert_called_once_with(url)
+    session.get.assert_called_once_with(url, params={"fields": "schema,etag"})
 
     assert result == mock_response["schema"]["fields"]
 
@@ -76,6 +108,70 @@ def test_get_schema_from_bigquery_auth_error(mock_get_session):
     assert result is None
 
 
+# Test get_schema_from_bigquery serves cached schemas and revalidates them with the ETag.
+@patch("cru_dse_utils.bigquery.time.time")
+@patch("cru_dse_utils.bigquery.get_google_authorized_session")
+def test_get_schema_from_bigquery_cache(mock_get_session, mock_time, tmp_path):
+    # Arrange
+    SCHEMA_CACHE.clear()
+    fields = [{"name": "field1", "type": "STRING"}]
+    session = MagicMock()
+    session.get.side_effect = [
+        MagicMock(
+            status_code=200,
+            json=MagicMock(return_value={"schema": {"fields": fields}, "etag": "e1"}),
+        ),
+        MagicMock(status_code=304),
+    ]
+    mock_get_session.return_value = session
+    args = ("p", "d", "cached_table", "MY_SECRET")
+
+    # Act
+    mock_time.return_value = 1000
+    first = get_schema_from_bigquery(*args, cache_ttl=60, cache_dir=str(tmp_path))
+    mock_time.return_value = 1030
+    second = get_schema_from_bigquery(*args, cache_ttl=60, cache_dir=str(tmp_path))
+    SCHEMA_CACHE.clear()
+    mock_time.return_value = 1100
+    third = get_schema_from_bigquery(*args, cache_ttl=60, cache_dir=str(tmp_path))
+
+    # Assert
+    assert first == second == third == fields
+    assert session.get.call_count == 2
+    assert session.get.call_args.kwargs["headers"] == {"If-None-Match": "e1"}
+    assert (tmp_path / "p.d.cached_table.json").exists()
+
+
+# Test get_schemas fetches many schemas over one session.
+@patch("cru_dse_utils.bigquery.get_google_authorized_session")
+def test_get_schemas(mock_get_session):
+    # Arrange
+    def get(url, params=None):
+        table_id = url.rsplit("/", 1)[-1]
+        if table_id == "missing":
+            return MagicMock(status_code=404)
+        fields = [{"name": table_id, "type": "STRING"}]
+        return MagicMock(
+            status_code=200, json=MagicMock(return_value={"schema": {"fields": fields}})
+        )
+
+    session = MagicMock()
+    session.get.side_effect = get
+    mock_get_session.return_value = session
+
+    # Act
+    result = get_schemas(["p.d.t1", "p.d.t2", "p.d.missing"], "MY_SECRET")
+
+    # Assert
+    mock_get_session.assert_called_once_with("MY_SECRET")
+    session.mount.assert_called_once()
+    assert result == {
+        "p.d.t1": [{"name": "t1", "type": "STRING"}],
+        "p.d.t2": [{"name": "t2", "type": "STRING"}],
+        "p.d.missing": None,
+    }
+
+
 # Test upload_dataframe_to_bigquery for a successful request where everything works as expected.
 @patch("cru_dse_utils.bigquery.bigquery.Client")
 @patch("cru_dse_utils.bigquery.get_google_credentials")
@@ -147,6 +243,321 @@ def test_upload_dataframe_to_bigquery_with_config_override(
     )
 
 
+# Build a fake Storage Write API client that records the appended batches.
+def make_fake_write_client():
+    client = Mock()
+    client.table_path.return_value = "projects/p/datasets/d/tables/t"
+    client.create_write_stream.return_value = Mock(name="stream")
+    client.create_write_stream.return_value.name = "stream0"
+    client.batch_commit_write_streams.return_value.stream_errors = []
+    client.appended = []
+
+    def append_rows(requests):
+        for request in requests:
+            client.appended.append(request)
+            yield bqstorage_types.AppendRowsResponse()
+
+    client.append_rows.side_effect = append_rows
+    return client
+
+
+# Test append_dataframe_with_storage_write appends Arrow batches to a pending stream and commits.
+def test_append_dataframe_with_storage_write():
+    # Arrange
+    client = make_fake_write_client()
+    df = pd.DataFrame({"id": list(range(100)), "name": ["x"] * 100})
+
+    # Act
+    stats = append_dataframe_with_storage_write(
+        client, "p", "d", "t", df, stream_type="pending", batch_target_bytes=500
+    )
+
+    # Assert
+    stream = client.create_write_stream.call_args.kwargs["write_stream"]
+    assert stream.type_ == bqstorage_types.WriteStream.Type.PENDING
+    assert stats["rows"] == 100
+    assert stats["batches"] == len(client.appended) > 1
+    assert len(stats["batch_latencies"]) == stats["batches"]
+    first, second = client.appended[0], client.appended[1]
+    assert first.write_stream == "stream0"
+    assert first.arrow_rows.writer_schema.serialized_schema
+    assert not second.write_stream
+    assert second.offset == (
+        pa.ipc.read_record_batch(
+            pa.py_buffer(first.arrow_rows.rows.serialized_record_batch),
+            pa.Schema.from_pandas(df, preserve_index=False),
+        ).num_rows
+    )
+    client.finalize_write_stream.assert_called_once_with(name="stream0")
+    client.batch_commit_write_streams.assert_called_once()
+
+
+# Test upload_dataframe_to_bigquery uses the Storage Write API instead of a load job.
+@patch("cru_dse_utils.bigquery.append_dataframe_with_storage_write")
+@patch("cru_dse_utils.bigquery.bigquery_storage")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_upload_dataframe_to_bigquery_storage_write(
+    mock_get_google_credentials,
+    mock_bigquery_client,
+    mock_bigquery_storage,
+    mock_append,
+):
+    # Arrange
+    df = pd.DataFrame({"id": [1]})
+    mock_append.return_value = {
+        "rows": 1,
+        "batches": 1,
+        "seconds": 0.1,
+        "rows_per_second": 10.0,
+        "batch_latencies": [0.05],
+    }
+
+    # Act
+    upload_dataframe_to_bigquery(
+        "project_id",
+        "dataset_id",
+        "table_id",
+        "secret_name",
+        df,
+        write_disposition="WRITE_APPEND",
+        method="storage_write",
+    )
+
+    # Assert
+    mock_bigquery_client.return_value.load_table_from_dataframe.assert_not_called()
+    mock_append.assert_called_once_with(
+        mock_bigquery_storage.BigQueryWriteClient.return_value,
+        "project_id",
+        "dataset_id",
+        "table_id",
+        df,
+        stream_type="committed",
+        batch_target_bytes=8 * 1024 * 1024,
+    )
+
+
+# Test upload_dataframe_to_bigquery stages Parquet shards on GCS and loads them with one job.
+@patch("cru_dse_utils.bigquery.delete_from_gcs")
+@patch("cru_dse_utils.bigquery.upload_dataframe_shards_to_gcs")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_upload_dataframe_to_bigquery_gcs_staged(
+    mock_get_google_credentials,
+    mock_bigquery_client,
+    mock_upload_shards,
+    mock_delete_from_gcs,
+):
+    # Arrange
+    df = pd.DataFrame({"id": [1, 2, 3]})
+    mock_client = mock_bigquery_client.return_value
+    mock_upload_shards.return_value = ["gs://bucket/stage/part-00000.parquet"]
+    mock_client.load_table_from_uri.return_value.result.side_effect = Exception(
+        "load failed"
+    )
+    job_config_override = bigquery.LoadJobConfig(source_format="CSV")
+
+    # Act
+    with pytest.raises(Exception, match="load failed"):
+        upload_dataframe_to_bigquery(
+            "project_id",
+            "dataset_id",
+            "table_id",
+            "secret_name",
+            df,
+            job_config_override=job_config_override,
+            method="gcs_staged",
+            staging_bucket_name="bucket",
+            staging_prefix="stage",
+            chunk_rows=2,
+        )
+
+    # Assert
+    mock_upload_shards.assert_called_once_with(
+        "bucket", "stage", df, "secret_name", chunk_rows=2, max_workers=8
+    )
+    args, kwargs = mock_client.load_table_from_uri.call_args
+    assert args == (
+        "gs://bucket/stage/part-*.parquet",
+        "project_id.dataset_id.table_id",
+    )
+    assert kwargs["job_config"].source_format == bigquery.SourceFormat.PARQUET
+    assert job_config_override.source_format == "CSV"
+    mock_client.load_table_from_dataframe.assert_not_called()
+    mock_delete_from_gcs.assert_called_once_with(
+        "bucket", "stage/", "secret_name", pattern="part-*.parquet"
+    )
+
+
+# Test upload_dataframe_to_bigquery merges through a staging table and drops it.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_upload_dataframe_to_bigquery_merge(
+    mock_get_google_credentials, mock_bigquery_client
+):
+    # Arrange
+    df = pd.DataFrame({"id": [1], "value": ["a"]})
+    mock_client = mock_bigquery_client.return_value
+
+    # Act
+    upload_dataframe_to_bigquery(
+        "project_id",
+        "dataset_id",
+        "table_id",
+        "secret_name",
+        df,
+        write_disposition="MERGE",
+        merge_keys=["id"],
+        maximum_bytes_billed=10**9,
+    )
+
+    # Assert
+    staging_table_id = mock_client.load_table_from_dataframe.call_args.args[1]
+    job_config = mock_client.load_table_from_dataframe.call_args.kwargs["job_config"]
+    assert staging_table_id.startswith("project_id.dataset_id.table_id__staging_")
+    assert job_config.write_disposition == "WRITE_TRUNCATE"
+    query = mock_client.query.call_args.args[0]
+    assert query.startswith(
+        f"MERGE `project_id.dataset_id.table_id` T USING `{staging_table_id}` S"
+    )
+    query_config = mock_client.query.call_args.kwargs["job_config"]
+    assert query_config.maximum_bytes_billed == 10**9
+    mock_client.delete_table.assert_called_once_with(
+        staging_table_id, not_found_ok=True
+    )
+
+
+# Test upload_dataframe_to_bigquery creates a missing target table from the staging table.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_upload_dataframe_to_bigquery_merge_new_table(
+    mock_get_google_credentials, mock_bigquery_client
+):
+    # Arrange
+    df = pd.DataFrame({"id": [1], "deleted": [False]})
+    mock_client = mock_bigquery_client.return_value
+    mock_client.get_table.side_effect = [Mock(), NotFound("missing")]
+
+    # Act
+    upload_dataframe_to_bigquery(
+        "project_id",
+        "dataset_id",
+        "table_id",
+        "secret_name",
+        df,
+        write_disposition="MERGE",
+        merge_keys=["id"],
+        merge_delete_column="deleted",
+    )
+
+    # Assert
+    query = mock_client.query.call_args.args[0]
+    assert query.startswith(
+        "CREATE TABLE `project_id.dataset_id.table_id` AS SELECT `id` FROM"
+    )
+    assert query.endswith("WHERE NOT COALESCE(`deleted`, FALSE)")
+
+
+# Test upload_dataframe_to_bigquery requires merge keys for a merge.
+def test_upload_dataframe_to_bigquery_merge_without_keys():
+    with pytest.raises(ValueError, match="merge_keys"):
+        upload_dataframe_to_bigquery(
+            "project_id",
+            "dataset_id",
+            "table_id",
+            "secret_name",
+            pd.DataFrame({"id": [1]}),
+            write_disposition="MERGE",
+        )
+
+
+# Test build_merge_query generates update, insert and delete clauses.
+def test_build_merge_query():
+    query = build_merge_query(
+        "p.d.target",
+        "p.d.staging",
+        ["id", "name", "is_deleted"],
+        ["id"],
+        delete_column="is_deleted",
+        delete_unmatched=True,
+    )
+
+    assert query == (
+        "MERGE `p.d.target` T USING `p.d.staging` S "
+        "ON T.`id` IS NOT DISTINCT FROM S.`id` "
+        "WHEN MATCHED AND S.`is_deleted` THEN DELETE "
+        "WHEN MATCHED THEN UPDATE SET `name` = S.`name` "
+        "WHEN NOT MATCHED BY TARGET AND NOT COALESCE(S.`is_deleted`, FALSE) THEN "
+        "INSERT (`id`, `name`) VALUES (S.`id`, S.`name`) "
+        "WHEN NOT MATCHED BY SOURCE THEN DELETE"
+    )
+
+
+# Test upload_dataframe_to_bigquery replaces only the partitions present in the DataFrame.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_upload_dataframe_to_bigquery_replace_partitions(
+    mock_get_google_credentials, mock_bigquery_client
+):
+    # Arrange
+    df = pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "event_date": pd.to_datetime(["2024-01-02", "2024-01-01", "2024-01-02"]),
+        }
+    )
+    mock_client = mock_bigquery_client.return_value
+    mock_client.get_table.side_effect = NotFound("missing")
+    job_config_override = bigquery.LoadJobConfig(write_disposition="WRITE_APPEND")
+
+    # Act
+    upload_dataframe_to_bigquery(
+        "project_id",
+        "dataset_id",
+        "table_id",
+        "secret_name",
+        df,
+        job_config_override=job_config_override,
+        write_disposition="REPLACE_PARTITIONS",
+        partition_column="event_date",
+        clustering_fields=["id"],
+    )
+
+    # Assert
+    calls = mock_client.load_table_from_dataframe.call_args_list
+    assert [c.args[1] for c in calls] == [
+        "project_id.dataset_id.table_id$20240101",
+        "project_id.dataset_id.table_id$20240102",
+    ]
+    assert calls[1].args[0]["id"].tolist() == [1, 3]
+    job_config = calls[0].kwargs["job_config"]
+    assert job_config.write_disposition == "WRITE_TRUNCATE"
+    assert job_config.time_partitioning.field == "event_date"
+    assert job_config.time_partitioning.type_ == "DAY"
+    assert job_config.clustering_fields == ["id"]
+    assert job_config_override.write_disposition == "WRITE_APPEND"
+    assert job_config_override.time_partitioning is None
+
+
+# Test split_dataframe_by_partition converts time zones and keeps rows without a value.
+def test_split_dataframe_by_partition():
+    df = pd.DataFrame(
+        {
+            "ts": pd.to_datetime(
+                ["2024-01-01 23:30:00-02:00", None, "2024-01-02 01:00:00+00:00"],
+                utc=True,
+            )
+        }
+    )
+
+    result = split_dataframe_by_partition(df, "ts", "MONTH")
+    daily = split_dataframe_by_partition(df, "ts")
+
+    assert list(result) == ["202401", "__NULL__"]
+    assert list(daily) == ["20240102", "__NULL__"]
+    assert len(daily["20240102"]) == 2
+
+
 # Test upload_dataframe_to_bigquery for an unsuccessful attempt to get the credentials.
 @patch("cru_dse_utils.bigquery.get_google_credentials")
 @patch("cru_dse_utils.bigquery.logging.getLogger")
@@ -216,6 +627,243 @@ def test_download_from_bigquery_as_dataframe(
     assert isinstance(result, pd.DataFrame)
 
 
+# Test download_from_bigquery_as_dataframe reads with the BigQuery Storage Read API.
+@patch("cru_dse_utils.bigquery.get_bqstorage_client")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_download_from_bigquery_as_dataframe_bqstorage(
+    mock_get_google_credentials, mock_bigquery_client, mock_get_bqstorage_client
+):
+    # Arrange
+    mock_bqstorage_client = Mock()
+    mock_get_bqstorage_client.return_value = mock_bqstorage_client
+    mock_rows = mock_bigquery_client.return_value.list_rows.return_value
+    mock_rows.to_dataframe.return_value = pd.DataFrame({"a": [1]})
+
+    # Act
+    result = download_from_bigquery_as_dataframe(
+        "project_id", "dataset_id", "table_id", "secret_name"
+    )
+
+    # Assert
+    mock_rows.to_dataframe.assert_called_once_with(
+        bqstorage_client=mock_bqstorage_client
+    )
+    assert result.equals(pd.DataFrame({"a": [1]}))
+
+
+# Test rows_to_dataframe falls back to the REST API when the Storage read fails.
+@patch("cru_dse_utils.bigquery.logging")
+def test_rows_to_dataframe_falls_back_to_rest(mock_logging):
+    # Arrange
+    mock_rows = Mock()
+    mock_rows.to_dataframe.side_effect = [Exception("permission denied"), "df"]
+
+    # Act
+    result = rows_to_dataframe(mock_rows, Mock())
+
+    # Assert
+    assert result == "df"
+    mock_rows.to_dataframe.assert_called_with(create_bqstorage_client=False)
+    mock_logging.getLogger.return_value.warning.assert_called_once()
+
+
+# Build a fake Storage Read API client that serves the given Arrow table.
+def make_fake_bqstorage_client(table, batch_size=2, streams=1):
+    client = Mock()
+    session = Mock()
+    session.arrow_schema.serialized_schema = table.schema.serialize().to_pybytes()
+    session.streams = [Mock(name=f"stream{i}") for i in range(streams)]
+    client.create_read_session.return_value = session
+    shards = [
+        table.slice(i * len(table) // streams, len(table) // streams)
+        for i in range(streams)
+    ]
+
+    def read_rows(name):
+        index = [s.name for s in session.streams].index(name)
+        reader = Mock()
+        pages = [
+            Mock(to_arrow=Mock(return_value=b))
+            for b in shards[index].to_batches(batch_size)
+        ]
+        reader.rows.return_value.pages = pages
+        reader.to_arrow.return_value = shards[index]
+        return reader
+
+    client.read_rows.side_effect = read_rows
+    return client
+
+
+# Test read_table_with_bqstorage pushes down columns, filter and sampling.
+def test_read_table_with_bqstorage():
+    # Arrange
+    table = pa.table({"id": [1, 2, 3, 4, 5], "name": list("abcde")})
+    client = make_fake_bqstorage_client(table)
+
+    # Act
+    result = read_table_with_bqstorage(
+        client,
+        "billing",
+        "project",
+        "dataset",
+        "table",
+        columns=["id"],
+        row_filter="id > 0",
+        sample_percent=10.0,
+        max_results=3,
+    )
+
+    # Assert
+    kwargs = client.create_read_session.call_args.kwargs
+    assert kwargs["parent"] == "projects/billing"
+    read_session = kwargs["read_session"]
+    assert read_session.table == "projects/project/datasets/dataset/tables/table"
+    assert list(read_session.read_options.selected_fields) == ["id"]
+    assert read_session.read_options.row_restriction == "id > 0"
+    assert read_session.read_options.sample_percentage == 10.0
+    assert result.num_rows == 3
+
+
+# Test read_table_with_bqstorage decodes several streams in parallel and keeps their order.
+def test_read_table_with_bqstorage_parallel_streams():
+    # Arrange
+    table = pa.table({"id": list(range(9))})
+    client = make_fake_bqstorage_client(table, streams=3)
+
+    # Act
+    result = read_table_with_bqstorage(
+        client, "billing", "project", "dataset", "table", max_streams=3
+    )
+
+    # Assert
+    assert client.create_read_session.call_args.kwargs["max_stream_count"] == 3
+    assert client.read_rows.call_count == 3
+    assert result.column("id").to_pylist() == list(range(9))
+
+
+# Test read_table_with_bqstorage decodes streams in spawned worker processes.
+@patch("cru_dse_utils.bigquery.ProcessPoolExecutor")
+@patch("cru_dse_utils.bigquery.bigquery_storage")
+def test_read_table_with_bqstorage_process_executor(
+    mock_bigquery_storage, mock_process_pool
+):
+    # Arrange
+    table = pa.table({"id": list(range(4))})
+    client = make_fake_bqstorage_client(table, streams=2)
+    pool = mock_process_pool.return_value.__enter__.return_value
+    pool.map.return_value = iter([table.slice(0, 2), table.slice(2, 2)])
+
+    # Act
+    result = read_table_with_bqstorage(
+        client,
+        "billing",
+        "project",
+        "dataset",
+        "table",
+        max_streams=2,
+        executor="process",
+        secret_name="MY_SECRET",
+    )
+
+    # Assert
+    mp_context = mock_process_pool.call_args.kwargs["mp_context"]
+    assert mp_context.get_start_method() == "spawn"
+    assert pool.map.call_args.args[1] == ["MY_SECRET", "MY_SECRET"]
+    assert result.column("id").to_pylist() == [0, 1, 2, 3]
+
+
+# Test read_bqstorage_stream_in_process builds its own client and session.
+@patch("cru_dse_utils.bigquery.bigquery_storage")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_read_bqstorage_stream_in_process(mock_get_credentials, mock_bigquery_storage):
+    # Arrange
+    mock_get_credentials.return_value = "fake_credentials"
+    mock_client = mock_bigquery_storage.BigQueryReadClient.return_value
+    mock_session = mock_bigquery_storage.types.ReadSession.deserialize.return_value
+
+    # Act
+    result = read_bqstorage_stream_in_process("MY_SECRET", "stream0", b"session")
+
+    # Assert
+    mock_bigquery_storage.BigQueryReadClient.assert_called_once_with(
+        credentials="fake_credentials"
+    )
+    mock_client.read_rows.assert_called_once_with("stream0")
+    mock_client.read_rows.return_value.to_arrow.assert_called_once_with(mock_session)
+    assert result == mock_client.read_rows.return_value.to_arrow.return_value
+
+
+# Test download_from_bigquery_as_dataframe applies a row filter with a query without the Storage Read API.
+@patch("cru_dse_utils.bigquery.get_bqstorage_client")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_download_from_bigquery_as_dataframe_row_filter_fallback(
+    mock_get_google_credentials, mock_bigquery_client, mock_get_bqstorage_client
+):
+    # Arrange
+    mock_get_bqstorage_client.return_value = None
+    mock_client = mock_bigquery_client.return_value
+    mock_client.query.return_value.result.return_value.to_dataframe.return_value = (
+        pd.DataFrame({"id": [1]})
+    )
+
+    # Act
+    result = download_from_bigquery_as_dataframe(
+        "project_id",
+        "dataset_id",
+        "table_id",
+        "secret_name",
+        columns=["id"],
+        row_filter="id = 1",
+        max_results=10,
+        maximum_bytes_billed=10**9,
+    )
+
+    # Assert
+    mock_client.query.assert_called_once()
+    query = mock_client.query.call_args.args[0]
+    job_config = mock_client.query.call_args.kwargs["job_config"]
+    assert query == (
+        "SELECT `id` FROM `project_id.dataset_id.table_id` WHERE id = 1 LIMIT 10"
+    )
+    assert job_config.maximum_bytes_billed == 10**9
+    mock_client.list_rows.assert_not_called()
+    assert len(result) == 1
+
+
+# Test download_from_bigquery_as_dataframe passes selected fields to list_rows.
+@patch("cru_dse_utils.bigquery.get_bqstorage_client")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_download_from_bigquery_as_dataframe_columns(
+    mock_get_google_credentials, mock_bigquery_client, mock_get_bqstorage_client
+):
+    # Arrange
+    mock_get_bqstorage_client.return_value = None
+    mock_client = mock_bigquery_client.return_value
+    id_field = bigquery.SchemaField("id", "INTEGER")
+    name_field = bigquery.SchemaField("name", "STRING")
+    mock_client.get_table.return_value.schema = [id_field, name_field]
+
+    # Act
+    download_from_bigquery_as_dataframe(
+        "project_id", "dataset_id", "table_id", "secret_name", columns=["name"]
+    )
+
+    # Assert
+    mock_client.list_rows.assert_called_once_with(
+        "project_id.dataset_id.table_id", selected_fields=[name_field], max_results=None
+    )
+
+
+# Test build_select_query adds sampling to the generated query.
+def test_build_select_query_sample():
+    query = build_select_query("p.d.t", sample_percent=1.5)
+
+    assert query == "SELECT * FROM `p.d.t` TABLESAMPLE SYSTEM (1.5 PERCENT)"
+
+
 # Test download_from_bigquery_as_dataframe for an unsuccessful attempt to get the credentials.
 @patch("cru_dse_utils.bigquery.get_google_credentials")
 @patch("cru_dse_utils.bigquery.logging.getLogger")
@@ -313,3 +961,577 @@ def test_query_bigquery_as_dataframe_query_error(
     mock_client_instance.query.assert_called_once_with(query)
     mock_logging.getLogger.return_value.exception.assert_called_once()
     assert result is None
+
+
+# Test iter_bigquery_batches yields fixed-size DataFrames from query results.
+@patch("cru_dse_utils.bigquery.get_bqstorage_client")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_iter_bigquery_batches(
+    mock_get_google_credentials, mock_bigquery_client, mock_get_bqstorage_client
+):
+    # Arrange
+    mock_get_bqstorage_client.return_value = None
+    table = pa.table({"id": list(range(10))})
+    mock_rows = mock_bigquery_client.return_value.query.return_value.result.return_value
+    mock_rows.to_arrow_iterable.return_value = iter(table.to_batches(max_chunksize=3))
+
+    # Act
+    batches = list(iter_bigquery_batches("secret_name", query="SELECT 1", batch_size=4))
+
+    # Assert
+    mock_bigquery_client.return_value.query.return_value.result.assert_called_once_with(
+        page_size=4
+    )
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert all(isinstance(b, pd.DataFrame) for b in batches)
+    assert pd.concat(batches)["id"].tolist() == list(range(10))
+
+
+# Test iter_bigquery_batches requires either a query or a table.
+def test_iter_bigquery_batches_invalid_arguments():
+    with pytest.raises(ValueError):
+        next(iter_bigquery_batches("secret_name"))
+
+
+# Test prefetch_iterator keeps order and re-raises errors from the source.
+def test_prefetch_iterator():
+    def source():
+        yield 1
+        yield 2
+        raise RuntimeError("page failed")
+
+    results = []
+    with pytest.raises(RuntimeError, match="page failed"):
+        for item in prefetch_iterator(source(), max_prefetch=1):
+            results.append(item)
+
+    assert results == [1, 2]
+
+
+# Test rebatch_record_batches regroups Arrow batches to the requested size.
+def test_rebatch_record_batches():
+    batches = pa.table({"id": list(range(7))}).to_batches(max_chunksize=2)
+
+    result = list(rebatch_record_batches(batches, 5))
+
+    assert [b.num_rows for b in result] == [5, 2]
+    assert result[1].column(0).to_pylist() == [5, 6]
+
+
+# Test query_bigquery_as_dataframe serves a repeated query from the cache.
+@patch("cru_dse_utils.bigquery.get_bqstorage_client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.logging")
+def test_query_bigquery_as_dataframe_cache(
+    mock_logging, mock_client, mock_get_credentials, mock_get_bqstorage, tmp_path
+):
+    # Arrange
+    cache = QueryResultCache(str(tmp_path))
+    mock_get_bqstorage.return_value = None
+    mock_client_instance = mock_client.return_value
+    mock_query_job = MagicMock()
+    mock_query_job.referenced_tables = ["p.d.t"]
+    mock_query_job.result.return_value.to_dataframe.return_value = pd.DataFrame(
+        {"a": [1, 2]}
+    )
+    mock_client_instance.query.return_value = mock_query_job
+    mock_table = mock_client_instance.get_table.return_value
+    mock_table.project, mock_table.dataset_id, mock_table.table_id = "p", "d", "t"
+    mock_table.modified = datetime.datetime(2024, 1, 1)
+
+    # Act
+    first = query_bigquery_as_dataframe("SELECT a FROM t", "MY_SECRET", cache=cache)
+    second = query_bigquery_as_dataframe(
+        "SELECT a\n  FROM t;", "MY_SECRET", cache=cache
+    )
+    mock_table.modified = datetime.datetime(2024, 1, 2)
+    third = query_bigquery_as_dataframe("SELECT a FROM t", "MY_SECRET", cache=cache)
+    fourth = query_bigquery_as_dataframe(
+        "SELECT a FROM t", "MY_SECRET", cache=cache, dtype_backend="nullable"
+    )
+    fifth = query_bigquery_as_dataframe(
+        "SELECT a FROM t", "MY_SECRET", cache=cache, optimize_memory=True
+    )
+
+    # Assert
+    assert mock_query_job.result.call_count == 4
+    assert first.equals(second) and first.equals(third)
+    assert fourth["a"].tolist() == fifth["a"].tolist() == [1, 2]
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 4
+    assert cache.stats["entries"] == 4
+
+
+# Test QueryResultCache expires entries after the TTL and evicts over the size limit.
+def test_query_result_cache_ttl_and_eviction(tmp_path):
+    # Arrange
+    cache = QueryResultCache(str(tmp_path), ttl_seconds=60)
+    df = pd.DataFrame({"a": list(range(100))})
+    cache.put("old", df)
+    cache.put("new", df)
+    old_path = os.path.join(str(tmp_path), "old.parquet")
+
+    # Act
+    os.utime(old_path, (0, 0))
+    expired = cache.get("old")
+    cache.max_bytes = os.path.getsize(os.path.join(str(tmp_path), "new.parquet"))
+    cache.put("newer", df)
+
+    # Assert
+    assert expired is None
+    assert not os.path.exists(old_path)
+    assert cache.stats["entries"] == 1
+    assert cache.get("newer").equals(df)
+
+
+# Test incremental_download_from_bigquery filters on the stored watermark and advances it on success.
+@patch("cru_dse_utils.bigquery.download_from_bigquery_as_dataframe")
+@patch("cru_dse_utils.bigquery.get_schema_from_bigquery")
+def test_incremental_download_from_bigquery(mock_get_schema, mock_download, tmp_path):
+    # Arrange
+    store = JsonWatermarkStore(str(tmp_path / "watermarks.json"))
+    key = "project.dataset.table.updated_at"
+    store.set(key, "2024-01-01T00:00:00+00:00")
+    mock_get_schema.return_value = [{"name": "updated_at", "type": "TIMESTAMP"}]
+    mock_download.return_value = pd.DataFrame(
+        {
+            "id": [1, 2],
+            "updated_at": pd.to_datetime(
+                ["2024-01-02T00:00:00Z", "2024-01-03T00:00:00Z"]
+            ),
+        }
+    )
+
+    # Act
+    with incremental_download_from_bigquery(
+        "project", "dataset", "table", "SECRET", "updated_at", store, columns=["id"]
+    ) as df:
+        rows = len(df)
+
+    # Assert
+    assert rows == 2
+    kwargs = mock_download.call_args.kwargs
+    assert kwargs["row_filter"] == (
+        "`updated_at` > TIMESTAMP '2024-01-01T00:00:00+00:00'"
+    )
+    assert kwargs["columns"] == ["id", "updated_at"]
+    assert store.get(key) == "2024-01-03T00:00:00+00:00"
+
+
+# Test incremental_download_from_bigquery keeps the watermark when the consumer fails.
+@patch("cru_dse_utils.bigquery.download_from_bigquery_as_dataframe")
+def test_incremental_download_from_bigquery_failure(mock_download, tmp_path):
+    # Arrange
+    store = JsonWatermarkStore(str(tmp_path / "watermarks.json"))
+    mock_download.return_value = pd.DataFrame({"id": [1, 2]})
+
+    # Act
+    with pytest.raises(KeyError):
+        with incremental_download_from_bigquery(
+            "project", "dataset", "table", "SECRET", "id", store
+        ):
+            raise KeyError("consumer failed")
+
+    # Assert
+    assert mock_download.call_args.kwargs["row_filter"] is None
+    assert store.get("project.dataset.table.id") is None
+
+
+# Test format_watermark_literal types the literal from the column type.
+def test_format_watermark_literal():
+    assert format_watermark_literal(5, "INTEGER") == "5"
+    assert format_watermark_literal("2024-01-01", "DATE") == "DATE '2024-01-01'"
+    assert format_watermark_literal("it's", "STRING") == "'it\\'s'"
+
+
+# Test run_queries runs queries concurrently and returns results and job stats.
+@patch("cru_dse_utils.bigquery.get_bqstorage_client")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_run_queries(mock_get_credentials, mock_client, mock_get_bqstorage_client):
+    # Arrange
+    mock_get_bqstorage_client.return_value = None
+
+    def make_job(query):
+        job = MagicMock()
+        if query == "BAD":
+            job.result.side_effect = Exception("syntax error")
+        job.done.return_value = True
+        job.job_id = f"job_{query}"
+        job.total_bytes_processed = 100
+        job.slot_millis = 5
+        job.cache_hit = False
+        job.started = datetime.datetime(2024, 1, 1, 0, 0, 0)
+        job.ended = datetime.datetime(2024, 1, 1, 0, 0, 2)
+        rows = job.result.return_value
+        rows.to_dataframe.return_value = pd.DataFrame({"q": [query]})
+        return job
+
+    mock_client.return_value.query.side_effect = make_job
+
+    # Act
+    result = run_queries(
+        {"a": "SELECT 1", "b": "BAD", "c": "SELECT 2"},
+        "MY_SECRET",
+        max_concurrent=2,
+        poll_interval=0,
+    )
+
+    # Assert
+    assert list(result) == ["a", "b", "c"]
+    assert result["a"]["dataframe"]["q"].tolist() == ["SELECT 1"]
+    assert result["a"]["stats"]["total_bytes_processed"] == 100
+    assert result["a"]["stats"]["elapsed_seconds"] == 2
+    assert result["b"]["dataframe"] is None
+    assert result["b"]["stats"]["error"] == "syntax error"
+    assert result["c"]["stats"]["job_id"] == "job_SELECT 2"
+    assert mock_client.call_count == 1
+
+
+# Test dry_run_query returns the estimated bytes and the referenced tables.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_dry_run_query(mock_get_credentials, mock_client):
+    # Arrange
+    dry_run_job = mock_client.return_value.query.return_value
+    dry_run_job.total_bytes_processed = 1024
+    table_ref = bigquery.TableReference.from_string("project.dataset.table")
+    dry_run_job.referenced_tables = [table_ref]
+
+    # Act
+    result = dry_run_query("SELECT * FROM `project.dataset.table`", "MY_SECRET")
+
+    # Assert
+    job_config = mock_client.return_value.query.call_args.kwargs["job_config"]
+    assert job_config.dry_run is True
+    assert result == {
+        "total_bytes_processed": 1024,
+        "referenced_tables": ["project.dataset.table"],
+    }
+
+
+# Test query_bigquery_as_dataframe caps the bytes billed by the query job.
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+def test_query_bigquery_as_dataframe_maximum_bytes_billed(
+    mock_client, mock_get_credentials
+):
+    # Arrange
+    mock_query = mock_client.return_value.query
+    mock_query.return_value.result.side_effect = Exception("bytesBilledLimitExceeded")
+
+    # Act
+    result = query_bigquery_as_dataframe(
+        "SELECT 1", "MY_SECRET", use_bqstorage=False, maximum_bytes_billed=10**9
+    )
+
+    # Assert
+    assert result is None
+    job_config = mock_query.call_args.kwargs["job_config"]
+    assert job_config.maximum_bytes_billed == 10**9
+
+
+# Test arrow_table_to_dataframe maps columns to the requested dtype backend.
+def test_arrow_table_to_dataframe_dtype_backends():
+    # Arrange
+    table = pa.table({"id": [1, None], "name": ["a", None], "ok": [True, None]})
+
+    # Act
+    numpy_df = arrow_table_to_dataframe(table, "numpy")
+    nullable_df = arrow_table_to_dataframe(table, "nullable")
+    arrow_df = arrow_table_to_dataframe(table, "pyarrow")
+
+    # Assert
+    assert numpy_df["id"].dtype == "float64"
+    assert nullable_df["id"].dtype == "Int64"
+    assert nullable_df["ok"].dtype == "boolean"
+    assert arrow_df["name"].dtype == pd.ArrowDtype(pa.string())
+    with pytest.raises(ValueError):
+        arrow_table_to_dataframe(table, "polars")
+
+
+# Test optimize_dataframe_memory downcasts integers and categorizes repeated strings.
+def test_optimize_dataframe_memory():
+    # Arrange
+    df = pd.DataFrame(
+        {
+            "id": pd.array(range(1000), dtype="Int64"),
+            "big": [2**40] * 1000,
+            "country": ["US", "CA"] * 500,
+            "name": [f"user_{i}" for i in range(1000)],
+        }
+    )
+    schema = [
+        bigquery.SchemaField("id", "INTEGER"),
+        bigquery.SchemaField("big", "INTEGER"),
+        bigquery.SchemaField("country", "STRING"),
+        bigquery.SchemaField("name", "STRING"),
+    ]
+    bytes_before = df.memory_usage(deep=True).sum()
+
+    # Act
+    result = optimize_dataframe_memory(df, schema)
+
+    # Assert
+    assert result["id"].dtype == "Int16"
+    assert result["big"].dtype == "int64"
+    assert result["country"].dtype == "category"
+    assert result["name"].dtype != "category"
+    assert result.memory_usage(deep=True).sum() < bytes_before
+
+
+# Test query_bigquery_as_dataframe returns Arrow and Polars results without pandas.
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+def test_query_bigquery_as_dataframe_arrow_and_polars_output(
+    mock_client, mock_get_credentials
+):
+    # Arrange
+    table = pa.table({"a": [1, 2]})
+    mock_results = mock_client.return_value.query.return_value.result.return_value
+    mock_results.to_arrow.return_value = table
+
+    # Act
+    arrow_result = query_bigquery_as_dataframe(
+        "SELECT a", "MY_SECRET", use_bqstorage=False, output="arrow"
+    )
+    polars_result = query_bigquery_as_dataframe(
+        "SELECT a", "MY_SECRET", use_bqstorage=False, output="polars"
+    )
+
+    # Assert
+    assert arrow_result is table
+    assert polars_result["a"].to_list() == [1, 2]
+    mock_results.to_dataframe.assert_not_called()
+    mock_results.to_arrow.assert_called_with(create_bqstorage_client=False)
+    with pytest.raises(ValueError):
+        query_bigquery_as_dataframe("SELECT a", "MY_SECRET", output="numpy")
+
+
+# Test upload_dataframe_to_bigquery loads a pyarrow Table as Parquet.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_upload_dataframe_to_bigquery_arrow_table(mock_get_credentials, mock_client):
+    # Arrange
+    table = pa.table({"a": [1, 2]})
+    mock_load = mock_client.return_value.load_table_from_file
+
+    # Act
+    upload_dataframe_to_bigquery("project", "dataset", "table", "SECRET", table)
+
+    # Assert
+    buffer, table_id_full = mock_load.call_args.args
+    job_config = mock_load.call_args.kwargs["job_config"]
+    assert table_id_full == "project.dataset.table"
+    assert job_config.source_format == bigquery.SourceFormat.PARQUET
+    assert pq.read_table(buffer).equals(table)
+    mock_client.return_value.load_table_from_dataframe.assert_not_called()
+
+
+# Test download_from_bigquery_as_dataframe exports tables above the size threshold.
+@patch("cru_dse_utils.bigquery.delete_from_gcs")
+@patch("cru_dse_utils.bigquery.download_shards_from_gcs_as_arrow")
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_download_from_bigquery_as_dataframe_via_export(
+    mock_get_credentials, mock_client, mock_download_shards, mock_delete
+):
+    # Arrange
+    mock_client_instance = mock_client.return_value
+    mock_client_instance.get_table.return_value.num_bytes = 20 * 1024**3
+    mock_download_shards.return_value = pa.table({"a": [1, 2]})
+
+    # Act
+    result = download_from_bigquery_as_dataframe(
+        "project", "dataset", "table", "SECRET", staging_bucket_name="bucket"
+    )
+
+    # Assert
+    table_id_full, destination_uri = mock_client_instance.extract_table.call_args.args
+    job_config = mock_client_instance.extract_table.call_args.kwargs["job_config"]
+    assert table_id_full == "project.dataset.table"
+    assert destination_uri.startswith("gs://bucket/bigquery_export/")
+    assert destination_uri.endswith("/part-*.parquet")
+    assert job_config.destination_format == "PARQUET"
+    prefix = mock_download_shards.call_args.args[1]
+    assert mock_download_shards.call_args.kwargs["pattern"] == "part-*.parquet"
+    mock_delete.assert_called_once_with(
+        "bucket", prefix, "SECRET", pattern="part-*.parquet"
+    )
+    mock_client_instance.list_rows.assert_not_called()
+    assert result["a"].tolist() == [1, 2]
+
+
+# Test download_from_bigquery_via_export checks for fastavro before exporting.
+@patch("cru_dse_utils.gcs.fastavro", None)
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_download_from_bigquery_via_export_avro_missing(
+    mock_get_credentials, mock_client
+):
+    with pytest.raises(ValueError, match="fastavro"):
+        download_from_bigquery_via_export(
+            "project", "dataset", "table", "SECRET", "bucket", file_format="AVRO"
+        )
+    mock_client.return_value.extract_table.assert_not_called()
+
+
+# Test load_gcs_to_bigquery loads files server-side with the schema and reports stats.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_load_gcs_to_bigquery(mock_get_credentials, mock_client):
+    # Arrange
+    job = mock_client.return_value.load_table_from_uri.return_value
+    job.job_id = "load_1"
+    job.input_files = 3
+    job.input_file_bytes = 300
+    job.output_rows = 30
+    job.started = datetime.datetime(2024, 1, 1, 0, 0, 0)
+    job.ended = datetime.datetime(2024, 1, 1, 0, 0, 5)
+    schema_json = [{"name": "a", "type": "INTEGER"}]
+
+    # Act
+    stats = load_gcs_to_bigquery(
+        "gs://bucket/data/*.csv",
+        "project",
+        "dataset",
+        "table",
+        "SECRET",
+        schema_json=schema_json,
+        write_disposition="WRITE_APPEND",
+    )
+
+    # Assert
+    uris, table_id_full = mock_client.return_value.load_table_from_uri.call_args.args
+    job_config = mock_client.return_value.load_table_from_uri.call_args.kwargs[
+        "job_config"
+    ]
+    assert uris == "gs://bucket/data/*.csv"
+    assert table_id_full == "project.dataset.table"
+    assert job_config.source_format == "CSV"
+    assert job_config.skip_leading_rows == 1
+    assert job_config.write_disposition == "WRITE_APPEND"
+    assert [field.name for field in job_config.schema] == ["a"]
+    assert stats == {
+        "job_id": "load_1",
+        "input_files": 3,
+        "input_file_bytes": 300,
+        "output_rows": 30,
+        "elapsed_seconds": 5.0,
+    }
+
+
+# Test export_bigquery_to_gcs runs an extract job and re-raises job errors.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_export_bigquery_to_gcs(mock_get_credentials, mock_client):
+    # Arrange
+    job = mock_client.return_value.extract_table.return_value
+    job.destination_uri_file_counts = [4]
+    job.started = None
+    table = mock_client.return_value.get_table.return_value
+    table.num_rows, table.num_bytes = 1000, 64000
+
+    # Act
+    stats = export_bigquery_to_gcs(
+        "project",
+        "dataset",
+        "table",
+        "SECRET",
+        "gs://bucket/export/part-*.avro",
+        file_format="AVRO",
+    )
+    job.result.side_effect = Exception("access denied")
+
+    # Assert
+    job_config = mock_client.return_value.extract_table.call_args.kwargs["job_config"]
+    assert job_config.destination_format == "AVRO"
+    assert job_config.use_avro_logical_types is True
+    assert stats["destination_files"] == 4
+    assert stats["source_rows"] == 1000
+    assert stats["source_bytes"] == 64000
+    mock_client.return_value.get_table.assert_called_once_with("project.dataset.table")
+    assert stats["elapsed_seconds"] is None
+    with pytest.raises(Exception, match="access denied"):
+        export_bigquery_to_gcs(
+            "project", "dataset", "table", "SECRET", "gs://bucket/export/*.avro"
+        )
+
+
+# Test align_dataframe_to_schema casts, orders, drops and adds columns.
+def test_align_dataframe_to_schema():
+    # Arrange
+    df = pd.DataFrame(
+        {
+            "extra": [1, 2],
+            "created_at": ["2024-01-01 10:00:00", "2024-01-02 11:00:00"],
+            "flag": ["true", "False"],
+            "id": ["1", "2"],
+            "amount": [1, None],
+        }
+    )
+    schema_json = [
+        {"name": "id", "type": "INTEGER", "mode": "REQUIRED"},
+        {"name": "amount", "type": "FLOAT"},
+        {"name": "flag", "type": "BOOLEAN"},
+        {"name": "created_at", "type": "TIMESTAMP"},
+        {"name": "note", "type": "STRING"},
+    ]
+
+    # Act
+    result = align_dataframe_to_schema(df, schema_json)
+
+    # Assert
+    assert list(result.columns) == ["id", "amount", "flag", "created_at", "note"]
+    assert result["id"].dtype == "Int64"
+    assert result["amount"].dtype == "float64"
+    assert result["flag"].tolist() == [True, False]
+    assert str(result["created_at"].dt.tz) == "UTC"
+    assert result["note"].isna().all()
+
+
+# Test align_dataframe_to_schema reports every incompatible column at once.
+def test_align_dataframe_to_schema_incompatible():
+    # Arrange
+    df = pd.DataFrame({"id": [1.5, 2.0], "flag": ["yes", "no"]})
+    schema_json = [
+        {"name": "id", "type": "INTEGER"},
+        {"name": "flag", "type": "BOOLEAN"},
+        {"name": "key", "type": "STRING", "mode": "REQUIRED"},
+    ]
+
+    # Act
+    with pytest.raises(ValueError) as error:
+        align_dataframe_to_schema(df, schema_json)
+
+    # Assert
+    message = str(error.value)
+    assert "'id'" in message and "'flag'" in message and "'key'" in message
+
+
+# Test upload_dataframe_to_bigquery fails before uploading when alignment fails.
+@patch("cru_dse_utils.bigquery.bigquery.Client")
+@patch("cru_dse_utils.bigquery.get_google_credentials")
+def test_upload_dataframe_to_bigquery_align_to_schema(
+    mock_get_credentials, mock_client
+):
+    # Arrange
+    df = pd.DataFrame({"id": ["a"]})
+    schema_json = [{"name": "id", "type": "INTEGER"}]
+
+    # Act
+    with pytest.raises(ValueError):
+        upload_dataframe_to_bigquery(
+            "project",
+            "dataset",
+            "table",
+            "SECRET",
+            df,
+            schema_json=schema_json,
+            align_to_schema=True,
+        )
+
+    # Assert
+    mock_client.assert_not_called()
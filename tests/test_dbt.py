@@ -1,7 +1,24 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 import pytest
 from unittest.mock import patch, MagicMock
 import requests
-from cru_dse_utils import get_dbt_job_list, trigger_dbt_job, get_dbt_run_status, dbt_run
+from cru_dse_utils import (
+    get_dbt_job_list,
+    trigger_dbt_job,
+    get_dbt_run_status,
+    dbt_run,
+    dbt_run_async,
+    dbt_run_many,
+    get_dbt_run_statuses,
+    get_dbt_run_artifact,
+    parse_dbt_run_results,
+    get_dbt_run_timings,
+)
+from cru_dse_utils.dbt import get_next_poll_interval, get_dbt_model_critical_path
 
 
 # Fixture to setup variables for get_dbt_job_list
@@ -139,10 +156,12 @@ def test_get_dbt_run_status(mock_logging, mock_get, setup_variables):
     mock_get.return_value = mock_response
 
     # Act
-    result = get_dbt_run_status(run_id, token)
+    result = get_dbt_run_status(run_id, token, account_id)
 
     # Assert
-    mock_get.assert_called_once()
+    assert mock_get.call_args.args[0] == (
+        f"https://cloud.getdbt.com/api/v2/accounts/{account_id}/runs/{run_id}/"
+    )
     assert result == 10
 
 
@@ -176,3 +195,659 @@ def test_dbt_run(
     mock_logging.getLogger.return_value.info.assert_called_with(
         f"dbt job run completed successfully."
     )
+
+
+# Test dbt_run_async returns a handle that reports the final status.
+@patch("cru_dse_utils.dbt.time.sleep")
+@patch("cru_dse_utils.dbt.get_dbt_job_average_duration")
+@patch("cru_dse_utils.dbt.get_dbt_run_status")
+@patch("cru_dse_utils.dbt.trigger_dbt_job")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_async(
+    mock_get_credentials,
+    mock_trigger_dbt_job,
+    mock_get_dbt_run_status,
+    mock_get_average_duration,
+    mock_sleep,
+    setup_variables,
+):
+    # Arrange
+    account_id, job_id, secret_name, token, run_id = setup_variables
+    mock_get_credentials.return_value = token
+    mock_trigger_dbt_job.return_value = run_id
+    mock_get_dbt_run_status.side_effect = [1, 3, 3, 10]
+    mock_get_average_duration.return_value = 600.0
+
+    # Act
+    handle = dbt_run_async(account_id, job_id, secret_name)
+    status = handle.result(timeout=5)
+
+    # Assert
+    assert handle.done()
+    assert status == 10
+    assert handle.run_id == run_id
+    mock_get_average_duration.assert_called_once_with(account_id, job_id, token)
+    assert mock_sleep.call_count == 4
+
+
+# Test DbtRunHandle.cancel cancels the run in dbt Cloud and stops retries.
+@patch("cru_dse_utils.dbt.requests.post")
+@patch("cru_dse_utils.dbt.get_dbt_job_average_duration")
+@patch("cru_dse_utils.dbt.get_dbt_run_status")
+@patch("cru_dse_utils.dbt.trigger_dbt_job")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_async_cancel(
+    mock_get_credentials,
+    mock_trigger_dbt_job,
+    mock_get_dbt_run_status,
+    mock_get_average_duration,
+    mock_post,
+    setup_variables,
+):
+    # Arrange
+    account_id, job_id, secret_name, token, run_id = setup_variables
+    mock_get_credentials.return_value = token
+    mock_trigger_dbt_job.return_value = run_id
+    mock_get_dbt_run_status.return_value = 3
+    mock_get_average_duration.return_value = None
+    handle = dbt_run_async(
+        account_id, job_id, secret_name, min_poll_interval=0.01, max_poll_interval=0.01
+    )
+
+    # Act
+    not_finished = handle.wait(timeout=0.05)
+    accepted = handle.cancel()
+    mock_get_dbt_run_status.return_value = 30
+    finished = handle.wait(timeout=5)
+
+    # Assert
+    assert not_finished is False
+    assert accepted is True
+    assert finished is True
+    assert handle.status == 30
+    assert mock_post.call_args.args[0] == (
+        f"https://cloud.getdbt.com/api/v2/accounts/{account_id}/runs/{run_id}/cancel/"
+    )
+    mock_trigger_dbt_job.assert_called_once()
+
+
+# Test DbtRunHandle.cancel during the trigger cancels the run once it starts.
+@patch("cru_dse_utils.dbt.requests.post")
+@patch("cru_dse_utils.dbt.get_dbt_run_status")
+@patch("cru_dse_utils.dbt.trigger_dbt_job")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_async_cancel_during_trigger(
+    mock_get_credentials,
+    mock_trigger_dbt_job,
+    mock_get_dbt_run_status,
+    mock_post,
+    setup_variables,
+):
+    # Arrange
+    account_id, job_id, secret_name, token, run_id = setup_variables
+    mock_get_credentials.return_value = token
+    triggered = threading.Event()
+    mock_trigger_dbt_job.side_effect = lambda *args: triggered.wait(5) and run_id
+    mock_get_dbt_run_status.return_value = 30
+    handle = dbt_run_async(
+        account_id, job_id, secret_name, min_poll_interval=0.01, max_poll_interval=0.01
+    )
+
+    # Act
+    accepted = handle.cancel()
+    triggered.set()
+    finished = handle.wait(timeout=5)
+
+    # Assert
+    assert accepted is True
+    assert finished is True
+    assert handle.status == 30
+    mock_post.assert_called_once()
+    assert mock_post.call_args.args[0] == (
+        f"https://cloud.getdbt.com/api/v2/accounts/{account_id}/runs/{run_id}/cancel/"
+    )
+
+
+# Test get_next_poll_interval adapts to the elapsed and expected duration.
+def test_get_next_poll_interval():
+    assert get_next_poll_interval(1, 10) == 5
+    assert get_next_poll_interval(3, 300) == 30
+    assert get_next_poll_interval(3, 3000) == 60
+    assert get_next_poll_interval(3, 100, expected_seconds=300) == 50
+    assert get_next_poll_interval(3, 290, expected_seconds=300) == 5
+
+
+# Fake dbt Cloud API server. Each run succeeds after `polls` status checks,
+# or fails if its job is in `failing_jobs`.
+@pytest.fixture
+def fake_dbt_cloud():
+    state = {"runs": {}, "triggered": [], "polls": 2, "failing_jobs": set()}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            match = re.match(r"/api/v2/accounts/\w+/jobs/(\w+)/run/$", self.path)
+            with lock:
+                run_id = len(state["runs"]) + 1
+                state["runs"][run_id] = {"job_id": match.group(1), "checks": 0}
+                state["triggered"].append(match.group(1))
+            self.send_json({"data": {"id": run_id}})
+
+        def check(self, run_id):
+            run = state["runs"][run_id]
+            run["checks"] += 1
+            if run["checks"] < state["polls"]:
+                return 3
+            return 20 if run["job_id"] in state["failing_jobs"] else 10
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            match = re.match(r"/api/v2/accounts/\w+/runs/(\d+)/$", url.path)
+            with lock:
+                if match:
+                    run_id = int(match.group(1))
+                    self.send_json(
+                        {"data": {"id": run_id, "status": self.check(run_id)}}
+                    )
+                    return
+                query = parse_qs(url.query)
+                offset = int(query["offset"][0])
+                limit = int(query["limit"][0])
+                run_ids = sorted(state["runs"], reverse=True)[offset : offset + limit]
+                runs = [{"id": r, "status": self.check(r)} for r in run_ids]
+            self.send_json({"data": runs})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v2"
+    with patch("cru_dse_utils.dbt.DBT_CLOUD_API_BASE_URL", base_url):
+        yield state
+    server.shutdown()
+    server.server_close()
+
+
+# Test dbt_run_many runs independent jobs together and dependents after upstreams.
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_many(mock_get_credentials, fake_dbt_cloud):
+    # Arrange
+    mock_get_credentials.return_value = "fake_token"
+    dependencies = {"marts": ["staging"], "exports": ["marts"]}
+
+    # Act
+    result = dbt_run_many(
+        "10206",
+        ["staging", "marts", "exports", "docs"],
+        "MY_SECRET",
+        dependencies=dependencies,
+        poll_interval=0.01,
+    )
+
+    # Assert
+    triggered = fake_dbt_cloud["triggered"]
+    assert set(triggered[:2]) == {"staging", "docs"}
+    assert triggered.index("staging") < triggered.index("marts")
+    assert triggered.index("marts") < triggered.index("exports")
+    assert all(job["status"] == "success" for job in result["jobs"].values())
+    assert result["critical_path"] == ["staging", "marts", "exports"]
+    assert result["critical_path_seconds"] <= result["wall_clock_seconds"]
+
+
+# Test dbt_run_many skips the downstream branch of a failed job only.
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_many_failure(mock_get_credentials, fake_dbt_cloud):
+    # Arrange
+    mock_get_credentials.return_value = "fake_token"
+    fake_dbt_cloud["failing_jobs"].add("staging")
+
+    # Act
+    result = dbt_run_many(
+        "10206",
+        ["staging", "marts", "exports", "docs"],
+        "MY_SECRET",
+        dependencies={"marts": ["staging"], "exports": ["marts"]},
+        max_concurrent=1,
+        poll_interval=0.01,
+    )
+
+    # Assert
+    statuses = {job_id: job["status"] for job_id, job in result["jobs"].items()}
+    assert statuses == {
+        "staging": "failed",
+        "marts": "skipped",
+        "exports": "skipped",
+        "docs": "success",
+    }
+    assert sorted(fake_dbt_cloud["triggered"]) == ["docs", "staging"]
+
+
+# Test dbt_run_many gives up on a job whose status cannot be read.
+@patch("cru_dse_utils.dbt.time.sleep")
+@patch("cru_dse_utils.dbt.get_dbt_run_statuses")
+@patch("cru_dse_utils.dbt.trigger_dbt_job")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_many_failed_checks(
+    mock_get_credentials, mock_trigger_dbt_job, mock_get_dbt_run_statuses, mock_sleep
+):
+    # Arrange
+    mock_get_credentials.return_value = "fake_token"
+    mock_trigger_dbt_job.side_effect = lambda account, job_id, token: {
+        "staging": 1,
+        "docs": 2,
+    }[job_id]
+    mock_get_dbt_run_statuses.return_value = {"2": 10}
+
+    # Act
+    result = dbt_run_many(
+        "10206",
+        ["staging", "marts", "docs"],
+        "MY_SECRET",
+        dependencies={"marts": ["staging"]},
+        max_failed_checks=3,
+    )
+
+    # Assert
+    statuses = {job_id: job["status"] for job_id, job in result["jobs"].items()}
+    assert statuses == {"staging": "unknown", "marts": "skipped", "docs": "success"}
+    assert mock_get_dbt_run_statuses.call_count == 3
+
+
+# Test dbt_run_many stops waiting for running jobs after the timeout.
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_many_timeout(mock_get_credentials, fake_dbt_cloud):
+    # Arrange
+    mock_get_credentials.return_value = "fake_token"
+    fake_dbt_cloud["polls"] = 10**6
+
+    # Act
+    result = dbt_run_many(
+        "10206",
+        ["staging", "marts", "docs"],
+        "MY_SECRET",
+        dependencies={"marts": ["staging"]},
+        max_concurrent=1,
+        poll_interval=0.01,
+        timeout=0.05,
+    )
+
+    # Assert
+    statuses = {job_id: job["status"] for job_id, job in result["jobs"].items()}
+    assert statuses == {"staging": "unknown", "marts": "skipped", "docs": "skipped"}
+    assert fake_dbt_cloud["triggered"] == ["staging"]
+
+
+# Test dbt_run_many rejects cyclic dependencies.
+def test_dbt_run_many_cycle():
+    with pytest.raises(ValueError):
+        dbt_run_many(
+            "10206", ["a", "b"], "MY_SECRET", dependencies={"a": ["b"], "b": ["a"]}
+        )
+
+
+# Test dbt_run retries a failed run from the point of failure.
+@patch("cru_dse_utils.dbt.time.sleep")
+@patch("cru_dse_utils.dbt.get_dbt_run_steps")
+@patch("cru_dse_utils.dbt.rerun_dbt_job")
+@patch("cru_dse_utils.dbt.get_dbt_run_status")
+@patch("cru_dse_utils.dbt.trigger_dbt_job")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+@patch("cru_dse_utils.dbt.logging")
+def test_dbt_run_rerun_from_failure(
+    mock_logging,
+    mock_get_credentials,
+    mock_trigger_dbt_job,
+    mock_get_dbt_run_status,
+    mock_rerun_dbt_job,
+    mock_get_dbt_run_steps,
+    mock_sleep,
+    setup_variables,
+):
+    # Arrange
+    account_id, job_id, secret_name, token, run_id = setup_variables
+    mock_get_credentials.return_value = token
+    mock_trigger_dbt_job.return_value = run_id
+    mock_rerun_dbt_job.return_value = "run456"
+    mock_get_dbt_run_status.side_effect = [20, 10]
+    mock_get_dbt_run_steps.return_value = [
+        {"name": "dbt deps", "status": 10},
+        {"name": "dbt build", "status": 20},
+    ]
+
+    # Act
+    dbt_run(account_id, job_id, secret_name)
+
+    # Assert
+    mock_trigger_dbt_job.assert_called_once_with(account_id, job_id, token)
+    mock_get_dbt_run_steps.assert_called_once_with(account_id, run_id, token)
+    mock_rerun_dbt_job.assert_called_once_with(account_id, job_id, token)
+    assert mock_get_dbt_run_status.call_args.args == ("run456", token, account_id)
+    mock_logging.getLogger.return_value.info.assert_any_call(
+        f"Rerunning dbt job from the failure of run {run_id}. "
+        f"Skipping 1 succeeded steps: ['dbt deps']"
+    )
+
+
+# Test dbt_run falls back to a full trigger when the rerun endpoint fails.
+@patch("cru_dse_utils.dbt.time.sleep")
+@patch("cru_dse_utils.dbt.get_dbt_run_steps")
+@patch("cru_dse_utils.dbt.rerun_dbt_job")
+@patch("cru_dse_utils.dbt.get_dbt_run_status")
+@patch("cru_dse_utils.dbt.trigger_dbt_job")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_dbt_run_rerun_fallback(
+    mock_get_credentials,
+    mock_trigger_dbt_job,
+    mock_get_dbt_run_status,
+    mock_rerun_dbt_job,
+    mock_get_dbt_run_steps,
+    mock_sleep,
+    setup_variables,
+):
+    # Arrange
+    account_id, job_id, secret_name, token, run_id = setup_variables
+    mock_get_credentials.return_value = token
+    mock_trigger_dbt_job.return_value = run_id
+    mock_rerun_dbt_job.return_value = None
+    mock_get_dbt_run_status.side_effect = [20, 10]
+    mock_get_dbt_run_steps.return_value = []
+
+    # Act
+    dbt_run(account_id, job_id, secret_name)
+
+    # Assert
+    mock_rerun_dbt_job.assert_called_once()
+    assert mock_trigger_dbt_job.call_count == 2
+
+
+# Test get_dbt_run_statuses pages through the runs until all requested ids are found.
+def test_get_dbt_run_statuses_pagination():
+    # Arrange
+    session = MagicMock()
+    pages = [
+        [{"id": 105, "status": 3}, {"id": 104, "status": 10}],
+        [{"id": 103, "status": 20}, {"id": 102, "status": 1}],
+        [{"id": 101, "status": 10}, {"id": 100, "status": 10}],
+    ]
+    params_seen = []
+
+    def get(url, params):
+        params_seen.append(dict(params))
+        response = MagicMock()
+        response.json.return_value = {"data": pages[params["offset"] // 2]}
+        return response
+
+    session.get.side_effect = get
+
+    # Act
+    result = get_dbt_run_statuses(
+        "10206", "fake_token", run_ids=["105", 103], session=session, page_size=2
+    )
+
+    # Assert
+    assert result == {"105": 3, "103": 20}
+    assert [p["offset"] for p in params_seen] == [0, 2]
+    assert session.get.call_args.args[0] == (
+        "https://cloud.getdbt.com/api/v2/accounts/10206/runs/"
+    )
+    assert params_seen[0]["order_by"] == "-id"
+
+
+# Test get_dbt_run_statuses stops at the oldest requested id when a run is missing.
+def test_get_dbt_run_statuses_stops_at_oldest_id():
+    # Arrange
+    session = MagicMock()
+    session.get.return_value.json.return_value = {
+        "data": [{"id": 12, "status": 10}, {"id": 10, "status": 10}]
+    }
+
+    # Act
+    result = get_dbt_run_statuses(
+        "10206", "fake_token", run_ids=[12, 11], session=session, page_size=2
+    )
+
+    # Assert
+    assert result == {"12": 10}
+    session.get.assert_called_once()
+
+
+# Test get_dbt_run_statuses filters by status.
+def test_get_dbt_run_statuses_status_filter():
+    # Arrange
+    session = MagicMock()
+    session.get.return_value.json.return_value = {"data": [{"id": 7, "status": 3}]}
+
+    # Act
+    result = get_dbt_run_statuses(
+        "10206", "fake_token", status=[1, 2, 3], session=session
+    )
+
+    # Assert
+    assert result == {"7": 3}
+    assert session.get.call_args.kwargs["params"]["status__in"] == "[1, 2, 3]"
+
+
+# Test get_dbt_run_statuses returns an empty map when the request fails.
+@patch("cru_dse_utils.dbt.logging")
+def test_get_dbt_run_statuses_error(mock_logging):
+    # Arrange
+    session = MagicMock()
+    session.get.return_value.raise_for_status.side_effect = (
+        requests.exceptions.HTTPError("Request failed")
+    )
+
+    # Act
+    result = get_dbt_run_statuses("10206", "fake_token", run_ids=[1], session=session)
+
+    # Assert
+    assert result == {}
+    mock_logging.getLogger.return_value.exception.assert_called_once()
+
+
+# Fixture with the run_results.json and manifest.json artifacts of a dbt run.
+@pytest.fixture
+def dbt_artifacts():
+    run_results = {
+        "metadata": {"generated_at": "2024-01-01T06:00:00Z"},
+        "results": [
+            {
+                "unique_id": "model.proj.stg_orders",
+                "status": "success",
+                "execution_time": 120.0,
+                "adapter_response": {"rows_affected": 1000},
+            },
+            {
+                "unique_id": "model.proj.stg_customers",
+                "status": "success",
+                "execution_time": 30.0,
+                "adapter_response": {"rows_affected": 50},
+            },
+            {
+                "unique_id": "model.proj.orders",
+                "status": "success",
+                "execution_time": 600.0,
+                "adapter_response": {"rows_affected": 900},
+            },
+            {
+                "unique_id": "test.proj.not_null_orders_id",
+                "status": "pass",
+                "execution_time": 5.0,
+                "adapter_response": {},
+            },
+        ],
+    }
+    manifest = {
+        "nodes": {
+            "model.proj.stg_orders": {
+                "name": "stg_orders",
+                "resource_type": "model",
+                "depends_on": {"nodes": ["source.proj.raw.orders"]},
+            },
+            "model.proj.stg_customers": {
+                "name": "stg_customers",
+                "resource_type": "model",
+                "depends_on": {"nodes": []},
+            },
+            "model.proj.orders": {
+                "name": "orders",
+                "resource_type": "model",
+                "depends_on": {
+                    "nodes": ["model.proj.stg_orders", "model.proj.stg_customers"]
+                },
+            },
+            "test.proj.not_null_orders_id": {
+                "name": "not_null_orders_id",
+                "resource_type": "test",
+                "depends_on": {"nodes": ["model.proj.orders"]},
+            },
+        }
+    }
+    return run_results, manifest
+
+
+# Test get_dbt_run_artifact fetches an artifact of a run.
+@patch("cru_dse_utils.dbt.requests.get")
+def test_get_dbt_run_artifact(mock_get):
+    # Arrange
+    mock_get.return_value.json.return_value = {"results": []}
+
+    # Act
+    result = get_dbt_run_artifact("10206", "123", "run_results.json", "fake_token")
+
+    # Assert
+    assert result == {"results": []}
+    assert mock_get.call_args.args[0] == (
+        "https://cloud.getdbt.com/api/v2/accounts/10206/runs/123/"
+        "artifacts/run_results.json"
+    )
+
+
+# Test get_dbt_run_artifact returns None when the request fails.
+@patch("cru_dse_utils.dbt.requests.get")
+@patch("cru_dse_utils.dbt.logging")
+def test_get_dbt_run_artifact_error(mock_logging, mock_get):
+    # Arrange
+    mock_get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        "Not found"
+    )
+
+    # Act
+    result = get_dbt_run_artifact("10206", "123", "manifest.json", "fake_token")
+
+    # Assert
+    assert result is None
+    mock_logging.getLogger.return_value.exception.assert_called_once()
+
+
+# Test parse_dbt_run_results builds one row per node, slowest first.
+def test_parse_dbt_run_results(dbt_artifacts):
+    # Arrange
+    run_results, manifest = dbt_artifacts
+
+    # Act
+    result = parse_dbt_run_results(run_results, manifest)
+
+    # Assert
+    assert list(result["model"]) == [
+        "orders",
+        "stg_orders",
+        "stg_customers",
+        "not_null_orders_id",
+    ]
+    assert list(result["resource_type"]) == ["model", "model", "model", "test"]
+    assert result["rows_affected"].tolist()[:3] == [900, 1000, 50]
+    assert result["rows_affected"].isna().iloc[3]
+    assert str(result["generated_at"].iloc[0]) == "2024-01-01 06:00:00+00:00"
+
+
+# Test get_dbt_model_critical_path follows the slowest chain of dependencies.
+def test_get_dbt_model_critical_path(dbt_artifacts):
+    # Arrange
+    run_results, manifest = dbt_artifacts
+    timings = parse_dbt_run_results(run_results, manifest)
+
+    # Act
+    path, seconds = get_dbt_model_critical_path(timings, manifest)
+
+    # Assert
+    assert path == [
+        "model.proj.stg_orders",
+        "model.proj.orders",
+        "test.proj.not_null_orders_id",
+    ]
+    assert seconds == 725.0
+
+
+# Test get_dbt_run_timings reports the timings and uploads them to BigQuery.
+@patch("cru_dse_utils.dbt.upload_dataframe_to_bigquery")
+@patch("cru_dse_utils.dbt.get_dbt_run_artifact")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_get_dbt_run_timings(
+    mock_get_credentials, mock_get_artifact, mock_upload, dbt_artifacts
+):
+    # Arrange
+    run_results, manifest = dbt_artifacts
+    mock_get_credentials.return_value = "fake_token"
+    mock_get_artifact.side_effect = lambda account, run, path, token: {
+        "run_results.json": run_results,
+        "manifest.json": manifest,
+    }[path]
+
+    # Act
+    result = get_dbt_run_timings(
+        "10206",
+        "123",
+        "MY_SECRET",
+        top_n=2,
+        project_id="project",
+        dataset_id="dataset",
+        table_id="timings",
+        bigquery_secret_name="GOOGLE_SECRET",
+    )
+
+    # Assert
+    assert list(result["slowest_models"]["model"]) == ["orders", "stg_orders"]
+    assert (result["timings"]["run_id"] == "123").all()
+    assert result["critical_path_seconds"] == 725.0
+    args, kwargs = mock_upload.call_args
+    assert args[:4] == ("project", "dataset", "timings", "GOOGLE_SECRET")
+    assert args[4] is result["timings"]
+    assert kwargs["write_disposition"] == "WRITE_APPEND"
+
+
+# Test get_dbt_run_timings returns None without uploading if an artifact is missing.
+@patch("cru_dse_utils.dbt.upload_dataframe_to_bigquery")
+@patch("cru_dse_utils.dbt.get_dbt_run_artifact")
+@patch("cru_dse_utils.dbt.get_general_credentials")
+def test_get_dbt_run_timings_missing_artifact(
+    mock_get_credentials, mock_get_artifact, mock_upload
+):
+    # Arrange
+    mock_get_credentials.return_value = "fake_token"
+    mock_get_artifact.return_value = None
+
+    # Act
+    result = get_dbt_run_timings(
+        "10206",
+        "123",
+        "MY_SECRET",
+        project_id="project",
+        dataset_id="dataset",
+        table_id="timings",
+        bigquery_secret_name="GOOGLE_SECRET",
+    )
+
+    # Assert
+    assert result is None
+    mock_upload.assert_not_called()
@@ -1,10 +1,20 @@
+import json
 from unittest.mock import Mock, MagicMock, patch
 import pytest
 import pandas as pd
+import pyarrow as pa
 from cru_dse_utils import (
     upload_to_gcs,
     download_from_gcs_as_dataframe,
     upload_dataframe_to_gcs,
+    upload_dataframe_shards_to_gcs,
+    download_shards_from_gcs_as_arrow,
+    delete_from_gcs,
+)
+from cru_dse_utils.gcs import (
+    get_dtypes_from_schema,
+    get_next_chunk_size,
+    resumable_upload_to_gcs,
 )
 
 
@@ -97,6 +107,137 @@ def test_upload_to_gcs_upload_error(
     assert result is None
 
 
+# Fake resumable upload endpoint that stores the bytes it receives.
+class FakeResumableSession:
+    def __init__(self, fail_on_put=None):
+        self.received = b""
+        self.puts = 0
+        self.posts = 0
+        self.fail_on_put = fail_on_put or []
+
+    def post(self, url, params=None, headers=None):
+        self.posts += 1
+        return MagicMock(
+            status_code=200, headers={"Location": "https://upload/session"}
+        )
+
+    def put(self, url, data=None, headers=None):
+        self.puts += 1
+        if self.puts in self.fail_on_put:
+            raise ConnectionError("network blip")
+        content_range = headers["Content-Range"]
+        total = int(content_range.split("/")[-1])
+        if data:
+            start = int(content_range.split(" ")[1].split("-")[0])
+            self.received = self.received[:start] + data
+        if len(self.received) == total:
+            return MagicMock(status_code=200, headers={})
+        range_header = f"bytes=0-{len(self.received) - 1}" if self.received else None
+        return MagicMock(
+            status_code=308, headers={"Range": range_header} if range_header else {}
+        )
+
+
+# Test resumable_upload_to_gcs recovers from a failed chunk and removes the checkpoint.
+@patch("cru_dse_utils.gcs.time.sleep")
+@patch("cru_dse_utils.gcs.get_google_authorized_session")
+@patch("cru_dse_utils.gcs.logging")
+def test_resumable_upload_to_gcs_retries_chunk(
+    mock_logging, mock_get_session, mock_sleep, tmp_path
+):
+    # Arrange
+    content = bytes(range(256)) * 4096  # 1 MiB
+    file_path = tmp_path / "data.csv"
+    file_path.write_bytes(content)
+    session = FakeResumableSession(fail_on_put=[2])
+    mock_get_session.return_value = session
+
+    # Act
+    result = resumable_upload_to_gcs(
+        str(file_path), "my-bucket", "my-blob", "MY_SECRET", chunk_size=256 * 1024
+    )
+
+    # Assert
+    assert result is True
+    assert session.received == content
+    assert session.posts == 1
+    assert not (tmp_path / "data.csv.gcs_upload.json").exists()
+
+
+# Test upload_to_gcs returns the result of a resumable upload.
+@patch("cru_dse_utils.gcs.resumable_upload_to_gcs")
+def test_upload_to_gcs_resumable(mock_resumable_upload, setup_variables):
+    # Arrange
+    file_path, bucket_name, blob_name, secret_name = setup_variables
+    mock_resumable_upload.return_value = False
+
+    # Act
+    result = upload_to_gcs(
+        file_path, bucket_name, blob_name, secret_name, resumable=True
+    )
+
+    # Assert
+    assert result is False
+    mock_resumable_upload.assert_called_once_with(
+        file_path,
+        bucket_name,
+        blob_name,
+        secret_name,
+        chunk_size=8 * 1024 * 1024,
+        checkpoint_path=None,
+    )
+
+
+# Test resumable_upload_to_gcs resumes an upload session from its checkpoint.
+@patch("cru_dse_utils.gcs.time.sleep")
+@patch("cru_dse_utils.gcs.get_google_authorized_session")
+@patch("cru_dse_utils.gcs.logging")
+def test_resumable_upload_to_gcs_resumes_from_checkpoint(
+    mock_logging, mock_get_session, mock_sleep, tmp_path
+):
+    # Arrange
+    content = b"x" * (512 * 1024)
+    file_path = tmp_path / "data.csv"
+    file_path.write_bytes(content)
+    session = FakeResumableSession(fail_on_put=[2])
+    mock_get_session.return_value = session
+
+    # Act
+    first = resumable_upload_to_gcs(
+        str(file_path),
+        "my-bucket",
+        "my-blob",
+        "MY_SECRET",
+        chunk_size=256 * 1024,
+        max_retries=0,
+    )
+    checkpoint = json.loads((tmp_path / "data.csv.gcs_upload.json").read_text())
+    second = resumable_upload_to_gcs(
+        str(file_path), "my-bucket", "my-blob", "MY_SECRET", chunk_size=256 * 1024
+    )
+
+    # Assert
+    assert first is False
+    assert checkpoint["offset"] == 256 * 1024
+    assert checkpoint["session_uri"] == "https://upload/session"
+    assert second is True
+    assert session.posts == 1
+    assert session.received == content
+
+
+# Test get_next_chunk_size follows throughput within bounds and 256 KiB multiples.
+def test_get_next_chunk_size():
+    chunk_size = 8 * 1024 * 1024
+
+    faster = get_next_chunk_size(chunk_size, chunk_size, 1.0)
+    slower = get_next_chunk_size(chunk_size, chunk_size, 100.0)
+
+    assert faster == chunk_size * 2
+    assert slower == chunk_size // 2
+    assert faster % (256 * 1024) == 0
+    assert get_next_chunk_size(chunk_size, 0, 0) == chunk_size
+
+
 # Test download_from_gcs_as_dataframe for a successful request where everything works as expected.
 @patch("cru_dse_utils.gcs.get_google_credentials")
 @patch("cru_dse_utils.gcs.storage.Client")
@@ -139,6 +280,60 @@ def test_download_from_gcs_as_dataframe(
     assert isinstance(returned_df, pd.DataFrame)
 
 
+# Test download_from_gcs_as_dataframe with typed and column-pruned parsing options.
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+@patch("cru_dse_utils.gcs.logging")
+def test_download_from_gcs_as_dataframe_with_schema(
+    mock_logging, mock_client, mock_get_credentials, setup_variables
+):
+    # Arrange
+    file_path, bucket_name, blob_name, secret_name = setup_variables
+    mock_get_credentials.return_value = "fake_credentials"
+    mock_blob = mock_client.return_value.bucket.return_value.blob.return_value
+    mock_blob.download_as_string.return_value = (
+        b"id,name,created_at,extra\n1,a,2024-01-01,x\n,b,2024-01-02,y\n"
+    )
+    schema_json = [
+        {"name": "id", "type": "INTEGER"},
+        {"name": "name", "type": "STRING"},
+        {"name": "created_at", "type": "TIMESTAMP"},
+        {"name": "extra", "type": "STRING"},
+    ]
+
+    # Act
+    df = download_from_gcs_as_dataframe(
+        bucket_name,
+        blob_name,
+        secret_name,
+        usecols=["id", "name", "created_at"],
+        schema_json=schema_json,
+    )
+
+    # Assert
+    assert list(df.columns) == ["id", "name", "created_at"]
+    assert str(df["id"].dtype) == "Int64"
+    assert df["id"].isna().sum() == 1
+    assert pd.api.types.is_datetime64_any_dtype(df["created_at"])
+
+
+# Test get_dtypes_from_schema maps BigQuery types for both parser engines.
+def test_get_dtypes_from_schema():
+    schema_json = [
+        {"name": "id", "type": "INTEGER"},
+        {"name": "score", "type": "FLOAT"},
+        {"name": "day", "type": "DATE"},
+        {"name": "tags", "type": "STRING", "mode": "REPEATED"},
+    ]
+
+    dtype, parse_dates = get_dtypes_from_schema(schema_json)
+    arrow_dtype, _ = get_dtypes_from_schema(schema_json, engine="pyarrow")
+
+    assert dtype == {"id": "Int64", "score": "Float64"}
+    assert parse_dates == ["day"]
+    assert arrow_dtype == {"id": "int64[pyarrow]", "score": "double[pyarrow]"}
+
+
 # Test download_from_gcs_as_dataframe for an unsuccessful attempt to retrieve credentials.
 @patch("cru_dse_utils.gcs.get_google_credentials")
 @patch("cru_dse_utils.gcs.storage.Client")
@@ -259,3 +454,210 @@ def test_upload_dataframe_to_gcs_fail(
     mock_logger.exception.assert_called_once_with(
         "Upload to Google Cloud Storage error: fake exception"
     )
+
+
+# Test upload_dataframe_shards_to_gcs uploads one Parquet shard per chunk of rows.
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+@patch("cru_dse_utils.gcs.logging")
+def test_upload_dataframe_shards_to_gcs(
+    mock_logging, mock_client, mock_get_credentials, setup_variables
+):
+    # Arrange
+    file_path, bucket_name, blob_name, secret_name = setup_variables
+    mock_get_credentials.return_value = "fake_credentials"
+    mock_bucket = mock_client.return_value.bucket.return_value
+    df = pd.DataFrame({"col1": list(range(5))})
+
+    # Act
+    uris = upload_dataframe_shards_to_gcs(
+        bucket_name, "staging/run1/", df, secret_name, chunk_rows=2
+    )
+
+    # Assert
+    mock_client.assert_called_once_with(credentials="fake_credentials")
+    assert uris == [
+        f"gs://{bucket_name}/staging/run1/part-00000.parquet",
+        f"gs://{bucket_name}/staging/run1/part-00001.parquet",
+        f"gs://{bucket_name}/staging/run1/part-00002.parquet",
+    ]
+    assert mock_bucket.blob.return_value.upload_from_string.call_count == 3
+
+
+# Test upload_dataframe_shards_to_gcs returns None when a shard upload fails.
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+@patch("cru_dse_utils.gcs.logging")
+def test_upload_dataframe_shards_to_gcs_error(
+    mock_logging, mock_client, mock_get_credentials, setup_variables
+):
+    # Arrange
+    file_path, bucket_name, blob_name, secret_name = setup_variables
+    mock_get_credentials.return_value = "fake_credentials"
+    mock_blob = mock_client.return_value.bucket.return_value.blob.return_value
+    mock_blob.upload_from_string.side_effect = Exception("Upload failed")
+
+    # Act
+    result = upload_dataframe_shards_to_gcs(
+        bucket_name, "staging", pd.DataFrame({"col1": [1]}), secret_name
+    )
+
+    # Assert
+    assert result is None
+    mock_logging.getLogger.return_value.exception.assert_called_once()
+
+
+# Test delete_from_gcs deletes every file under the prefix.
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+@patch("cru_dse_utils.gcs.logging")
+def test_delete_from_gcs(
+    mock_logging, mock_client, mock_get_credentials, setup_variables
+):
+    # Arrange
+    file_path, bucket_name, blob_name, secret_name = setup_variables
+    mock_get_credentials.return_value = "fake_credentials"
+    mock_client_instance = mock_client.return_value
+    blobs = [MagicMock(), MagicMock()]
+    mock_client_instance.list_blobs.return_value = iter(blobs)
+
+    # Act
+    delete_from_gcs(bucket_name, "staging/run1", secret_name)
+
+    # Assert
+    mock_client_instance.list_blobs.assert_called_once_with(
+        bucket_name, prefix="staging/run1"
+    )
+    mock_client_instance.bucket.return_value.delete_blobs.assert_called_once_with(blobs)
+
+
+# Test delete_from_gcs only deletes the files matching the pattern.
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+@patch("cru_dse_utils.gcs.logging")
+def test_delete_from_gcs_pattern(
+    mock_logging, mock_client, mock_get_credentials, setup_variables
+):
+    # Arrange
+    file_path, bucket_name, blob_name, secret_name = setup_variables
+    mock_get_credentials.return_value = "fake_credentials"
+    mock_client_instance = mock_client.return_value
+    blobs = []
+    for name in ["stage/part-00000.parquet", "stage/keep.csv", "stage/sub/part-0.csv"]:
+        blob = MagicMock()
+        blob.name = name
+        blobs.append(blob)
+    mock_client_instance.list_blobs.return_value = iter(blobs)
+
+    # Act
+    delete_from_gcs(bucket_name, "stage/", secret_name, pattern="part-*.parquet")
+
+    # Assert
+    mock_client_instance.bucket.return_value.delete_blobs.assert_called_once_with(
+        blobs[:1]
+    )
+
+
+# Test download_shards_from_gcs_as_arrow reads Parquet shards in name order.
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+def test_download_shards_from_gcs_as_arrow(mock_client, mock_get_credentials):
+    # Arrange
+    blobs = []
+    for name, values in [
+        ("export/part-1.parquet", [3]),
+        ("export/part-0.parquet", [1, 2]),
+    ]:
+        blob = MagicMock()
+        blob.name = name
+        blob.download_as_bytes.return_value = pd.DataFrame({"a": values}).to_parquet(
+            index=False
+        )
+        blobs.append(blob)
+    mock_client.return_value.list_blobs.return_value = iter(blobs)
+
+    # Act
+    result = download_shards_from_gcs_as_arrow("my-bucket", "export/", "MY_SECRET")
+
+    # Assert
+    mock_client.return_value.list_blobs.assert_called_once_with(
+        "my-bucket", prefix="export/"
+    )
+    assert isinstance(result, pa.Table)
+    assert result.column("a").to_pylist() == [1, 2, 3]
+
+
+# Test download_shards_from_gcs_as_arrow reads only matching shards and skips empty Avro shards.
+@patch("cru_dse_utils.gcs.fastavro")
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+def test_download_shards_from_gcs_as_arrow_avro(
+    mock_client, mock_get_credentials, mock_fastavro
+):
+    # Arrange
+    shards = {
+        b"part-0": [{"a": 1}, {"a": 2}],
+        b"part-1": [],
+        b"part-2": [{"a": 3}],
+    }
+
+    def reader(data):
+        avro_reader = MagicMock()
+        avro_reader.__iter__.return_value = iter(shards[data.getvalue()])
+        avro_reader.writer_schema = {"fields": [{"name": "a", "type": "long"}]}
+        return avro_reader
+
+    mock_fastavro.reader.side_effect = reader
+    blobs = []
+    for name in ["export/part-0.avro", "export/part-1.avro", "export/part-2.avro"]:
+        blob = MagicMock()
+        blob.name = name
+        blob.download_as_bytes.return_value = name[7:13].encode()
+        blobs.append(blob)
+    other = MagicMock()
+    other.name = "export/_SUCCESS"
+    mock_client.return_value.list_blobs.return_value = iter(blobs + [other])
+
+    # Act
+    result = download_shards_from_gcs_as_arrow(
+        "my-bucket", "export/", "MY_SECRET", file_format="AVRO", pattern="part-*.avro"
+    )
+
+    # Assert
+    assert result.column("a").to_pylist() == [1, 2, 3]
+    other.download_as_bytes.assert_not_called()
+
+
+# Test download_shards_from_gcs_as_arrow keeps the columns when every Avro shard is empty.
+@patch("cru_dse_utils.gcs.fastavro")
+@patch("cru_dse_utils.gcs.get_google_credentials")
+@patch("cru_dse_utils.gcs.storage.Client")
+def test_download_shards_from_gcs_as_arrow_empty_avro(
+    mock_client, mock_get_credentials, mock_fastavro
+):
+    # Arrange
+    avro_reader = mock_fastavro.reader.return_value
+    avro_reader.__iter__.return_value = iter([])
+    avro_reader.writer_schema = {"fields": [{"name": "a", "type": "long"}]}
+    blob = MagicMock()
+    blob.name = "export/part-0.avro"
+    blob.download_as_bytes.return_value = b""
+    mock_client.return_value.list_blobs.return_value = iter([blob])
+
+    # Act
+    result = download_shards_from_gcs_as_arrow(
+        "my-bucket", "export/", "MY_SECRET", file_format="AVRO"
+    )
+
+    # Assert
+    assert result.column_names == ["a"]
+    assert result.num_rows == 0
+
+
+# Test download_shards_from_gcs_as_arrow requires fastavro for Avro shards.
+@patch("cru_dse_utils.gcs.fastavro", None)
+def test_download_shards_from_gcs_as_arrow_avro_missing():
+    with pytest.raises(ValueError, match="fastavro"):
+        download_shards_from_gcs_as_arrow(
+            "my-bucket", "export/", "MY_SECRET", file_format="AVRO"
+        )
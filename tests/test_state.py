@@ -0,0 +1,38 @@
+import json
+from cru_dse_utils import JsonWatermarkStore, SqliteWatermarkStore
+
+
+# Test JsonWatermarkStore persists watermarks across instances.
+def test_json_watermark_store(tmp_path):
+    # Arrange
+    path = str(tmp_path / "state" / "watermarks.json")
+    store = JsonWatermarkStore(path)
+
+    # Act
+    missing = store.get("events")
+    store.set("events", "2024-01-01T00:00:00+00:00")
+    store.set("orders", 42)
+
+    # Assert
+    assert missing is None
+    reopened = JsonWatermarkStore(path)
+    assert reopened.get("events") == "2024-01-01T00:00:00+00:00"
+    assert reopened.get("orders") == 42
+    with open(path) as f:
+        assert json.load(f) == {"events": "2024-01-01T00:00:00+00:00", "orders": 42}
+
+
+# Test SqliteWatermarkStore upserts watermarks.
+def test_sqlite_watermark_store(tmp_path):
+    # Arrange
+    path = str(tmp_path / "watermarks.db")
+    store = SqliteWatermarkStore(path)
+
+    # Act
+    missing = store.get("events")
+    store.set("events", 1)
+    store.set("events", 2)
+
+    # Assert
+    assert missing is None
+    assert SqliteWatermarkStore(path).get("events") == 2